@@ -0,0 +1,177 @@
+"""
+Constant-memory statistics for the resource samples of a game.
+
+`StreamingStats` keeps the count, mean, min, max and an approximate 95th percentile of a
+stream of values. The percentile uses the P² algorithm (Jain & Chlamtac), which tracks it
+with five markers instead of storing the values. The state lives in a plain dict so that it
+can be stored as is in the stats snapshot.
+"""
+
+
+DEFAULT_QUANTILE = 0.95
+SAMPLE_BUFFER_SIZE = 120
+
+
+class StreamingStats:
+    """
+    Streaming count, mean, min, max and quantile over a dict holding the state.
+
+    Args:
+        state (dict, optional): The state to update in place. A new one is created if omitted.
+        quantile (float): The quantile to track, used when the state is new.
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, state=None, quantile=DEFAULT_QUANTILE):
+        if state is None:
+            state = {}
+        if "count" not in state:
+            state.update({"count": 0, "mean": 0.0, "min": None, "max": None, "p": quantile, "q": [], "n": [], "np": []})
+        self.state = state
+
+    @property
+    def count(self):
+        return self.state["count"]
+
+    @property
+    def mean(self):
+        return self.state["mean"]
+
+    @property
+    def min(self):
+        return self.state["min"]
+
+    @property
+    def max(self):
+        return self.state["max"]
+
+    def add(self, value):
+        """
+        Adds a value to the stream.
+
+        Args:
+            value (float): The value to add.
+        """
+        state = self.state
+        state["count"] += 1
+        state["mean"] += (value - state["mean"]) / state["count"]
+        state["min"] = value if state["min"] is None else min(state["min"], value)
+        state["max"] = value if state["max"] is None else max(state["max"], value)
+        self._add_quantile(value)
+
+    def _add_quantile(self, value):
+        state = self.state
+        p = state["p"]
+        q, n, np_ = state["q"], state["n"], state["np"]
+
+        if len(q) < 5:
+            q.append(value)
+            q.sort()
+            if len(q) == 5:
+                n[:] = [1, 2, 3, 4, 5]
+                np_[:] = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+            return
+
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        increments = (0, p / 2, p, (1 + p) / 2, 1)
+        for i in range(5):
+            np_[i] += increments[i]
+
+        for i in range(1, 4):
+            d = np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    @property
+    def quantile(self):
+        """
+        Returns the approximate tracked quantile (95th percentile by default).
+
+        Returns:
+            float or None: The quantile estimate, or None if no value was added.
+        """
+        q = self.state["q"]
+        if not q:
+            return None
+        if len(q) < 5 or self.state["count"] < 5:
+            return q[min(len(q) - 1, int(round(self.state["p"] * (len(q) - 1))))]
+        return q[2]
+
+    def summary(self):
+        """
+        Returns the statistics as a dict.
+
+        Returns:
+            dict: count, mean, min, max and p95.
+        """
+        return {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max, "p95": self.quantile}
+
+
+class SessionAggregator:
+    """
+    Resource statistics of one game session, with a bounded buffer of the raw samples.
+
+    Args:
+        state (dict, optional): The session state to update in place. A new one is created if omitted.
+        buffer_size (int): The maximum number of raw samples kept.
+    """
+
+    __slots__ = ("state", "buffer_size")
+
+    def __init__(self, state=None, buffer_size=SAMPLE_BUFFER_SIZE):
+        if state is None:
+            state = {}
+        state.setdefault("samples", [])
+        state.setdefault("metrics", {})
+        self.state = state
+        self.buffer_size = buffer_size
+
+    def metric(self, name):
+        """
+        Returns the streaming statistics of a metric.
+
+        Args:
+            name (str): The metric name, e.g. "cpu" or "gpu".
+
+        Returns:
+            StreamingStats: The statistics, updated in place in the session state.
+        """
+        return StreamingStats(self.state["metrics"].setdefault(name, {}))
+
+    def add(self, timestamp, **values):
+        """
+        Adds a sample to the session.
+
+        Args:
+            timestamp (str): The time of the sample.
+            **values (float): The metric values of the sample, e.g. cpu=12.5, gpu=40.
+        """
+        for name, value in values.items():
+            if value is not None:
+                self.metric(name).add(value)
+        samples = self.state["samples"]
+        samples.append(dict(values, time=timestamp))
+        if len(samples) > self.buffer_size:
+            del samples[:len(samples) - self.buffer_size]
@@ -0,0 +1,289 @@
+"""
+Game catalog loading and lookup.
+
+The catalog maps every game key (the executable name) to its list of aliases, the
+first alias being the display name and the last one the executable itself. The
+`CatalogIndex` is built once when the catalog is loaded and turns every normalized
+alias into a single dictionary lookup.
+"""
+
+
+import hashlib
+import json
+import marshal
+import os
+from types import MappingProxyType
+
+
+CACHE_VERSION = 2
+
+
+def normalize(name):
+    """
+    Normalizes an alias or executable name for lookups.
+
+    Args:
+        name (str): The name to normalize.
+
+    Returns:
+        str: The normalized name.
+    """
+    return name.strip().lower()
+
+
+def choose_owner(alias, keys, display_names):
+    """
+    Chooses the game an alias shared by several games resolves to, whatever the order of the catalog.
+
+    The game whose executable name is the alias wins, then the game whose display name is the alias,
+    then the first key in sorted order.
+
+    Args:
+        alias (str): The normalized alias.
+        keys (Iterable[str]): The keys of the games using the alias.
+        display_names (dict[str, str]): The normalized display name of every key.
+
+    Returns:
+        str: The key the alias resolves to.
+    """
+    return min(keys, key=lambda key: (normalize(key) != alias, display_names.get(key) != alias, key))
+
+
+def capitalize_first_letters(text):
+    """
+    Capitalizes the first letter of each word in the given text.
+
+    Args:
+        text (str): The input text to capitalize.
+
+    Returns:
+        str: The input text with the first letter of each word capitalized.
+    """
+    words = text.split()
+    capitalized_words = [word.capitalize() for word in words]
+    return ' '.join(capitalized_words)
+
+
+class CatalogIndex:
+    """
+    Immutable inverted index over the game catalog.
+
+    Every normalized alias and executable name points to its canonical key. When the same
+    alias is used by several games, `choose_owner` picks the game, so the result does not
+    depend on the order of the catalog file, and the conflict is recorded in `collisions`
+    with the chosen key first.
+
+    Args:
+        mapping (dict[str, list[str]]): The catalog as loaded from the JSON file.
+    """
+
+    __slots__ = ("mapping", "collisions", "_alias_to_key", "_display_names")
+
+    def __init__(self, mapping):
+        self._set_parts(self.build_parts(mapping))
+
+    @staticmethod
+    def build_parts(mapping):
+        """
+        Normalizes the catalog and builds the lookup tables of the index.
+
+        Args:
+            mapping (dict[str, list[str]]): The catalog as loaded from the JSON file.
+
+        Returns:
+            dict: The normalized mapping and the derived tables, made of plain builtin types only
+            so that it can be stored in the catalog cache.
+        """
+        normalized = {key: tuple(normalize(name) for name in names) for key, names in mapping.items()}
+        alias_to_key = {}
+        collisions = {}
+
+        for key in normalized:
+            alias_to_key.setdefault(normalize(key), key)
+
+        for key, names in normalized.items():
+            for name in names:
+                owner = alias_to_key.setdefault(name, key)
+                if owner != key:
+                    collisions.setdefault(name, [owner])
+                    if key not in collisions[name]:
+                        collisions[name].append(key)
+
+        display_names = {key: names[0] if names else normalize(key) for key, names in normalized.items()}
+        for name, keys in collisions.items():
+            owner = alias_to_key[name] = choose_owner(name, keys, display_names)
+            collisions[name] = (owner, *sorted(key for key in keys if key != owner))
+
+        return {
+            "mapping": normalized,
+            "collisions": collisions,
+            "alias_to_key": alias_to_key,
+            "display_names": display_names,
+        }
+
+    @classmethod
+    def from_parts(cls, parts):
+        """
+        Creates an index from tables previously returned by `build_parts`, skipping normalization.
+
+        Args:
+            parts (dict): The normalized mapping and derived tables.
+
+        Returns:
+            CatalogIndex: The lookup index.
+        """
+        index = cls.__new__(cls)
+        index._set_parts(parts)
+        return index
+
+    def _set_parts(self, parts):
+        object.__setattr__(self, "mapping", MappingProxyType(parts["mapping"]))
+        object.__setattr__(self, "collisions", MappingProxyType(parts["collisions"]))
+        object.__setattr__(self, "_alias_to_key", parts["alias_to_key"])
+        object.__setattr__(self, "_display_names", parts["display_names"])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CatalogIndex is immutable")
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def __contains__(self, name):
+        return normalize(name) in self._alias_to_key
+
+    def key_for(self, name):
+        """
+        Returns the canonical key for an alias or executable name.
+
+        Args:
+            name (str): The alias or executable name to look up (case insensitive).
+
+        Returns:
+            str or None: The canonical key, or None if the name is not in the catalog.
+        """
+        return self._alias_to_key.get(normalize(name))
+
+    def display_name(self, key):
+        """
+        Returns the display name of a game key.
+
+        Args:
+            key (str): The canonical game key.
+
+        Returns:
+            str or None: The normalized display name, or None if the key is not in the catalog.
+        """
+        return self._display_names.get(key)
+
+    def aliases(self):
+        """
+        Returns every normalized alias and executable name with its canonical key.
+
+        Returns:
+            ItemsView[str, str]: The (alias, key) pairs.
+        """
+        return self._alias_to_key.items()
+
+    def lookup(self, name):
+        """
+        Resolves an alias or executable name to its canonical key and display name.
+
+        Args:
+            name (str): The alias or executable name to look up (case insensitive).
+
+        Returns:
+            tuple[str, str] or None: The canonical key and display name, or None if not found.
+        """
+        key = self.key_for(name)
+        if key is None:
+            return None
+        return key, self._display_names[key]
+
+
+def cache_path_for(file_path):
+    """
+    Returns the path of the compiled cache that belongs to a catalog JSON file.
+
+    Args:
+        file_path (str): The path to the process mapping JSON file.
+
+    Returns:
+        str: The cache path, next to the JSON file.
+    """
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, "." + name + ".cache")
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as file:
+            cache = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    return cache
+
+
+def _write_cache(cache_path, cache):
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(marshal.dumps(cache))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_catalog(file_path, use_cache=True):
+    """
+    Loads the game catalog and its lookup index, going through the compiled catalog cache.
+
+    The cache stores the normalized mapping and the derived tables with `marshal`. It is used
+    as is when the modification time and size of the JSON file did not change. When they did,
+    the SHA-256 of the file decides whether the cache is still valid, and the cache is rebuilt
+    transparently if the content changed.
+
+    A compact catalog (see compact_catalog.py) is memory-mapped instead and needs no cache.
+
+    Args:
+        file_path (str): The path to the process mapping JSON file, or to a compact catalog.
+        use_cache (bool): Whether to read and write the compiled cache.
+
+    Returns:
+        CatalogIndex or CompactCatalog: The lookup index of the catalog.
+    """
+    import compact_catalog
+    if compact_catalog.is_compact_catalog(file_path):
+        return compact_catalog.CompactCatalog(file_path)
+
+    if not use_cache:
+        with open(file_path, 'r') as file:
+            return CatalogIndex(json.load(file))
+
+    cache_path = cache_path_for(file_path)
+    stat = os.stat(file_path)
+    cache = _read_cache(cache_path)
+    if cache is not None and cache["mtime_ns"] == stat.st_mtime_ns and cache["size"] == stat.st_size:
+        return CatalogIndex.from_parts(cache["parts"])
+
+    with open(file_path, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if cache is not None and cache["sha256"] == digest:
+        parts = cache["parts"]
+    else:
+        parts = CatalogIndex.build_parts(json.loads(raw))
+
+    _write_cache(cache_path, {
+        "version": CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+        "parts": parts,
+    })
+    return CatalogIndex.from_parts(parts)
@@ -0,0 +1,432 @@
+"""
+Build pipeline of the game catalog.
+
+Validates a process mapping JSON file and emits, from the same pass, the sorted JSON, the CSV
+list of games published in the README and the compact lookup index (see compact_catalog.py):
+
+    python catalog_build.py
+    python catalog_build.py games/process_mapping.json --csv games/games.csv --index games/process_mapping.gcat
+
+Without arguments the Windows and Linux catalogs of the repository are built. Every entry is
+checked for empty names and for its executable name being its last alias, which are errors.
+An alias used by several games is a warning, since builds of the same game (DX11 and DX12 for
+instance) share their names, and an error with --strict.
+
+A small build state file next to the source keeps a signature of every entry, the problems
+of the invalid ones and the games using every alias, so a rebuild only validates and formats
+the entries that were added, changed or removed: the lines of the other ones are reused from
+the source and the previous CSV. The compact index is only generated again when a normalized
+name changed, and an output is only written when its content changed. A source that did not
+change since the last build is not processed at all, but its shared aliases are still
+reported, and fail the build with --strict.
+"""
+
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import zlib
+from array import array
+
+from catalog import choose_owner, normalize
+from compact_catalog import compact_catalog_bytes
+
+
+BUILD_VERSION = 4
+CSV_HEADER = "Executable Names,Game Name,Keyword 1,Keyword 2,Keyword 3,Keyword 4"
+KEYWORD_COLUMNS = 4
+CSV_SPECIAL = re.compile('[,"\n]')
+CATALOGS = (
+    ("games/process_mapping.json", "games/games.csv", "games/process_mapping.gcat"),
+    ("games/process_mapping_linux.json", "games/games_linux.csv", "games/process_mapping_linux.gcat"),
+)
+
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def validate_entry(key, names):
+    """
+    Checks one entry of the catalog.
+
+    Args:
+        key (str): The executable name of the game.
+        names (list[str]): Its aliases, the display name first and the executable name last.
+
+    Returns:
+        list[str]: The problems found, empty if the entry is valid.
+    """
+    if not key.strip():
+        return ["empty executable name"]
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        return [f"{key}: the aliases must be a list of strings"]
+    if not names:
+        return [f"{key}: no aliases"]
+    problems = []
+    if any(not name.strip() for name in names):
+        problems.append(f"{key}: empty alias")
+    if names[-1] != key:
+        problems.append(f"{key}: the executable name must be the last alias, not {names[-1]!r}")
+    return problems
+
+
+def _csv_field(text):
+    if CSV_SPECIAL.search(text):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def csv_row(key, names):
+    """
+    Formats the CSV row of a game: its executable, its display name and up to four keywords.
+
+    Args:
+        key (str): The executable name of the game.
+        names (list[str]): Its aliases.
+
+    Returns:
+        str: The row, without line terminator. Missing keywords are written as "-".
+    """
+    keywords = names[1:-1] + ["-"] * KEYWORD_COLUMNS
+    return ",".join(_csv_field(field) for field in [key, names[0] if names else "", *keywords[:KEYWORD_COLUMNS]])
+
+
+def json_line(key, names):
+    """
+    Formats the line of a game in the sorted JSON file.
+
+    Args:
+        key (str): The executable name of the game.
+        names (list[str]): Its aliases.
+
+    Returns:
+        str: The indented "key": [aliases] line, without separator.
+    """
+    return "    " + _encode(key) + ": " + _encode(names)
+
+
+def state_path_for(file_path):
+    """
+    Returns the path of the build state of a catalog JSON file.
+
+    Args:
+        file_path (str): The path to the process mapping JSON file.
+
+    Returns:
+        str: The state path, next to the JSON file.
+    """
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, "." + name + ".build")
+
+
+def _empty_state():
+    return {"version": BUILD_VERSION, "sha256": None, "outputs": None, "duplicates": [], "index_digest": None, "csv_crc": None, "signatures": {}, "problems": {}, "owners": {}}
+
+
+def _read_state(state_path, summary_only=False):
+    """
+    Reads the build state. The state file holds a small summary (version, source digest, outputs and
+    the aliases shared by several games) followed by the per-entry tables, so checking whether a catalog is up to date does not load them.
+    """
+    try:
+        with open(state_path, 'rb') as file:
+            state = marshal.load(file)
+            if not isinstance(state, dict) or state.get("version") != BUILD_VERSION:
+                return _empty_state()
+            if not summary_only:
+                state["signatures"], state["problems"], state["owners"] = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return _empty_state()
+    return state
+
+
+def _write_state(state_path, state):
+    summary = {name: state[name] for name in ("version", "sha256", "outputs", "duplicates", "index_digest", "csv_crc")}
+    try:
+        _write_atomic(state_path, marshal.dumps(summary) + marshal.dumps((state["signatures"], state["problems"], state["owners"])))
+    except OSError:
+        pass
+
+
+def _write_atomic(file_path, content):
+    temp_path = file_path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(content)
+    os.replace(temp_path, file_path)
+
+
+def _write_if_changed(file_path, content):
+    """Writes a file atomically, unless it already holds this content. Returns True if it was written."""
+    try:
+        if os.path.getsize(file_path) == len(content):
+            with open(file_path, 'rb') as file:
+                if file.read() == content:
+                    return False
+    except OSError:
+        pass
+    _write_atomic(file_path, content)
+    return True
+
+
+def _release(owners, released):
+    """Removes the given keys from the owners of every alias."""
+    for alias, owner in list(owners.items()):
+        if isinstance(owner, str):
+            if owner in released:
+                del owners[alias]
+            continue
+        kept = [key for key in owner if key not in released]
+        if len(kept) == len(owner):
+            continue
+        if not kept:
+            del owners[alias]
+        else:
+            owners[alias] = kept[0] if len(kept) == 1 else kept
+
+
+def _signature(line, names):
+    """
+    Returns the signature of an entry: the CRC-32 of its encoded JSON line in the high 32 bits, and the
+    CRC-32 of its normalized names, which is all the compact index depends on, in the low 32 bits.
+    """
+    valid = isinstance(names, list) and all(isinstance(name, str) for name in names)
+    names_crc = zlib.crc32("\0".join(map(normalize, names)).encode("utf-8")) if valid else 0
+    return zlib.crc32(line) << 32 | names_crc
+
+
+def _entry_lines(raw, mapping, keys, signatures):
+    """
+    Returns the encoded JSON line and the signature of every entry, in sorted order.
+
+    The lines of a source written by the previous build are reused when their CRC-32 is unchanged,
+    which also proves they are in the sorted format. The others are formatted again.
+    """
+    source_lines = raw.rstrip().split(b"\n")
+    candidates = {}
+    if len(source_lines) == len(mapping) + 2:
+        candidates = dict(zip(mapping, (line[:-1] if line.endswith(b",") else line for line in source_lines[1:-1])))
+    lines = {}
+    line_signatures = {}
+    for key in keys:
+        line = candidates.get(key)
+        signature = signatures.get(key)
+        if line is None or signature is None or zlib.crc32(line) != signature >> 32:
+            line = json_line(key, mapping[key]).encode("utf-8")
+            if signature is None or zlib.crc32(line) != signature >> 32:
+                signature = _signature(line, mapping[key])
+        lines[key] = line
+        line_signatures[key] = signature
+    return lines, line_signatures
+
+
+def _csv_rows(csv_output, csv_crc, signatures, keys, mapping, unchanged):
+    """
+    Returns the encoded CSV rows of the catalog. The rows of the unchanged entries are read from the
+    previous CSV output, when it still holds what the previous build wrote.
+    """
+    previous = {}
+    try:
+        with open(csv_output, 'rb') as file:
+            content = file.read()
+        if csv_crc == zlib.crc32(content):
+            rows = content.split(b"\n")[1:-1]
+            if len(rows) == len(signatures):
+                previous = dict(zip(signatures, rows))
+    except OSError:
+        pass
+    return [previous[key] if key in unchanged and key in previous else csv_row(key, mapping[key]).encode("utf-8") for key in keys]
+
+
+def _update_entries(state, mapping, line_signatures):
+    """
+    Validates the new and changed entries, and drops the removed ones. Returns the keys of the unchanged entries.
+
+    Only the signature of every entry (see `_signature`), the problems of the invalid entries and
+    the owners of every alias (a key, or the sorted keys when several games use it) are kept between builds.
+    """
+    signatures, problems, owners = state["signatures"], state["problems"], state["owners"]
+    changed = [key for key, signature in line_signatures.items() if signatures.get(key) != signature]
+    released = [key for key in signatures if key not in mapping] + [key for key in changed if key in signatures]
+    if released:
+        _release(owners, set(released))
+    for key in released:
+        problems.pop(key, None)
+
+    for key in changed:
+        names = mapping[key]
+        entry_problems = validate_entry(key, names)
+        if entry_problems:
+            problems[key] = tuple(entry_problems)
+        valid_names = names if isinstance(names, list) and all(isinstance(name, str) for name in names) else []
+        for alias in {normalize(name) for name in valid_names} - {""}:
+            owner = owners.get(alias)
+            if owner is None:
+                owners[alias] = key
+            elif isinstance(owner, str):
+                owners[alias] = sorted((owner, key))
+            else:
+                owner.append(key)
+                owner.sort()
+    return line_signatures.keys() - set(changed)
+
+
+def _index_parts(state, normalized):
+    """Returns the tables of `CatalogIndex.build_parts` for the sorted, normalized catalog, from the build state."""
+    alias_to_key = {}
+    collisions = {}
+    display_names = None
+    for alias, owners in state["owners"].items():
+        if isinstance(owners, str):
+            alias_to_key[alias] = owners
+            continue
+        if display_names is None:
+            display_names = {key: names[0] for key, names in normalized.items()}
+        owner = choose_owner(alias, owners, display_names)
+        alias_to_key[alias] = owner
+        collisions[alias] = (owner, *(key for key in owners if key != owner))
+    return {
+        "mapping": normalized,
+        "alias_to_key": alias_to_key,
+        "collisions": collisions,
+    }
+
+
+def build_catalog(source, json_output=None, csv_output=None, index_output=None, strict=False, incremental=True):
+    """
+    Validates a catalog and writes its sorted JSON, CSV and compact index.
+
+    The outputs are only written when the catalog is valid, and an output that already holds the
+    new content is not written again.
+
+    Args:
+        source (str): The path to the process mapping JSON file.
+        json_output (str, optional): Where to write the sorted JSON. Defaults to the source itself.
+        csv_output (str, optional): Where to write the CSV list of games. Not written if None.
+        index_output (str, optional): Where to write the compact index. Not written if None.
+        strict (bool): Report the aliases shared by several games as errors instead of warnings.
+        incremental (bool): Reuse the build state of the previous build.
+
+    Returns:
+        dict: The number of `entries` (None when up to date), the number of entries `processed`, the `errors` and `warnings`,
+        whether the outputs were already `up_to_date`, and the outputs `written`.
+    """
+    json_output = json_output or source
+    outputs = [path for path in (json_output, csv_output, index_output) if path]
+    state_path = state_path_for(source)
+    with open(source, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if incremental:
+        summary = _read_state(state_path, summary_only=True)
+        if summary["sha256"] == digest and summary["outputs"] == outputs and all(os.path.exists(path) for path in outputs):
+            duplicates = summary["duplicates"]
+            errors, warnings = (duplicates, []) if strict else ([], duplicates)
+            return {"entries": None, "processed": 0, "errors": errors, "warnings": warnings, "up_to_date": not errors, "written": []}
+    state = _read_state(state_path) if incremental else _empty_state()
+
+    mapping = json.loads(raw)
+    keys = sorted(mapping)
+    lines, line_signatures = _entry_lines(raw, mapping, keys, state["signatures"])
+    unchanged = _update_entries(state, mapping, line_signatures)
+    processed = len(mapping) - len(unchanged)
+
+    problems = state["problems"]
+    errors = [problem for key in keys for problem in problems.get(key, ())]
+    shared = sorted((alias, owners) for alias, owners in state["owners"].items() if not isinstance(owners, str))
+    duplicates = [f"{alias!r} is used by {', '.join(owners)}" for alias, owners in shared]
+    warnings = []
+    if strict:
+        errors.extend(duplicates)
+    else:
+        warnings.extend(duplicates)
+
+    if state["outputs"] != outputs:
+        state["index_digest"] = None
+    state["sha256"] = state["outputs"] = None
+    csv_crc, state["csv_crc"] = state["csv_crc"], None
+    state["duplicates"] = duplicates
+    written = []
+    if not errors:
+        sorted_json = b"{\n" + b",\n".join(lines.values()) + b"\n}"
+        if _write_if_changed(json_output, sorted_json):
+            written.append(json_output)
+        if csv_output:
+            rows = _csv_rows(csv_output, csv_crc, state["signatures"], keys, mapping, unchanged)
+            csv_content = (CSV_HEADER + "\n").encode("utf-8") + b"".join(row + b"\n" for row in rows)
+            if _write_if_changed(csv_output, csv_content):
+                written.append(csv_output)
+            state["csv_crc"] = zlib.crc32(csv_content)
+        if index_output:
+            index_digest = hashlib.sha256("\0".join(keys).encode("utf-8") + array('I', (signature & 0xFFFFFFFF for signature in line_signatures.values())).tobytes()).hexdigest()
+            if index_digest != state["index_digest"] or not os.path.exists(index_output):
+                normalized = {key: tuple(map(normalize, mapping[key])) for key in keys}
+                if _write_if_changed(index_output, compact_catalog_bytes(mapping, _index_parts(state, normalized))):
+                    written.append(index_output)
+            state["index_digest"] = index_digest
+        if json_output == source:
+            digest = hashlib.sha256(sorted_json).hexdigest()
+        state["sha256"], state["outputs"] = digest, outputs
+    state["signatures"] = line_signatures
+    _write_state(state_path, state)
+    return {"entries": len(mapping), "processed": processed, "errors": errors, "warnings": warnings, "up_to_date": False, "written": written}
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line of the catalog build.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Validate the game catalog and build its sorted JSON, CSV and compact index.")
+    parser.add_argument("source", nargs="?", help="The process mapping JSON file. Defaults to the Windows and Linux catalogs.")
+    parser.add_argument("--output", help="Where to write the sorted JSON. Defaults to the source file.")
+    parser.add_argument("--csv", help="Where to write the CSV list of games.")
+    parser.add_argument("--index", help="Where to write the compact index.")
+    parser.add_argument("--strict", action="store_true", help="Fail on aliases shared by several games.")
+    parser.add_argument("--full", action="store_true", help="Ignore the previous build and process every entry.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Builds the catalogs given on the command line.
+
+    Args:
+        argv (list[str], optional): The command line arguments.
+
+    Returns:
+        int: The exit status, 1 if a catalog is invalid.
+    """
+    args = parse_args(argv)
+    if args.source:
+        targets = [(args.source, args.output, args.csv, args.index)]
+    else:
+        root = os.path.dirname(os.path.abspath(__file__))
+        targets = [(os.path.join(root, source), None, os.path.join(root, csv), os.path.join(root, index)) for source, csv, index in CATALOGS]
+
+    status = 0
+    for source, json_output, csv_output, index_output in targets:
+        result = build_catalog(source, json_output, csv_output, index_output, args.strict, incremental=not args.full)
+        for warning in result["warnings"]:
+            print(f"warning: {warning}", file=sys.stderr)
+        for error in result["errors"]:
+            print(f"error: {error}", file=sys.stderr)
+        if result["errors"]:
+            status = 1
+            print(f"{source}: {len(result['errors'])} errors, nothing written")
+        elif result["up_to_date"]:
+            print(f"{source}: up to date")
+        else:
+            print(f"{source}: {result['entries']} games, {result['processed']} processed, {len(result['written'])} outputs written")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Compact, memory-mapped game catalog.
+
+A `CatalogIndex` holds every key and alias as Python objects, which is fine for the shipped
+catalogs but grows to hundreds of megabytes with catalogs of hundreds of thousands of games.
+The compact format keeps the catalog in a single file that is memory-mapped and read in place:
+a lookup touches a handful of pages and only decodes the strings it returns, so opening a
+catalog costs the same whatever its size.
+
+File layout, all integers being little-endian unsigned 32-bit words:
+
+    header     magic "GCAT", version, string count, key count, name count, slot count, data size
+    strings    string count + 1 offsets into the data section, string i being data[offsets[i]:offsets[i + 1]]
+    keys       per key, sorted: string id of the key, first name, number of names
+    names      string ids of the normalized names of every key, the display name first
+    slots      open addressing hash table of the normalized aliases: string id + 1 (0 when empty), key index
+    data       the interned UTF-8 strings, every distinct string stored once
+
+The slots are addressed with the CRC-32 of the alias and probed linearly. Aliases resolve to
+the same keys as with `CatalogIndex`, which decides the owner of shared aliases.
+"""
+
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from catalog import CatalogIndex, normalize
+
+
+MAGIC = b"GCAT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIIIII")
+HEADER_SIZE = 32
+KEY_WORDS = 3
+SLOT_WORDS = 2
+
+
+def is_compact_catalog(file_path):
+    """
+    Tells whether a file is a compact catalog, from its magic number.
+
+    Args:
+        file_path (str): The path to the catalog file.
+
+    Returns:
+        bool: True if the file starts with the compact catalog magic number.
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _slot_count(alias_count):
+    count = 8
+    while count < alias_count * 2:
+        count *= 2
+    return count
+
+
+def compact_catalog_bytes(mapping, parts=None):
+    """
+    Encodes a catalog in the compact format.
+
+    Args:
+        mapping (dict[str, list[str]]): The catalog as loaded from the JSON file.
+        parts (dict, optional): The tables returned by `CatalogIndex.build_parts` for this catalog, when
+            they are already known. Only the mapping and alias_to_key tables are used.
+
+    Returns:
+        bytes: The content of the compact catalog file. It only depends on the content of the catalog,
+        not on the order of its entries.
+    """
+    if parts is None:
+        parts = CatalogIndex.build_parts(mapping)
+    normalized = parts["mapping"]
+    alias_to_key = parts["alias_to_key"]
+
+    keys = sorted(normalized)
+    string_ids = {}
+    for key in keys:
+        string_ids.setdefault(key, len(string_ids))
+        for name in normalized[key]:
+            string_ids.setdefault(name, len(string_ids))
+    for alias in sorted(alias_to_key.keys() - string_ids.keys()):
+        string_ids[alias] = len(string_ids)
+    encoded = [text.encode("utf-8") for text in string_ids]
+    data = b"".join(encoded)
+    offsets = array('I', [0])
+    position = 0
+    for text in encoded:
+        position += len(text)
+        offsets.append(position)
+
+    key_ids = {key: i for i, key in enumerate(keys)}
+    key_records = array('I')
+    names = array('I')
+    for key in keys:
+        key_records.extend((string_ids[key], len(names), len(normalized[key])))
+        names.extend(string_ids[name] for name in normalized[key])
+
+    slot_count = _slot_count(len(alias_to_key))
+    slots = array('I', bytes(4 * SLOT_WORDS * slot_count))
+    mask = slot_count - 1
+    hashes = list(map(zlib.crc32, encoded))
+    for string_id, alias in enumerate(string_ids):
+        key = alias_to_key.get(alias)
+        if key is None:
+            continue
+        slot = hashes[string_id] & mask
+        while slots[slot * SLOT_WORDS]:
+            slot = (slot + 1) & mask
+        slots[slot * SLOT_WORDS] = string_id + 1
+        slots[slot * SLOT_WORDS + 1] = key_ids[key]
+
+    words = offsets + key_records + names + slots
+    if sys.byteorder != "little":
+        words.byteswap()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(string_ids), len(keys), len(names), slot_count, len(data))
+    return header.ljust(HEADER_SIZE, b"\0") + words.tobytes() + data
+
+
+def write_compact_catalog(mapping, file_path, parts=None):
+    """
+    Writes a catalog in the compact format, replacing the file atomically.
+
+    Args:
+        mapping (dict[str, list[str]]): The catalog as loaded from the JSON file.
+        file_path (str): The path of the compact catalog to write.
+        parts (dict, optional): The tables returned by `CatalogIndex.build_parts` for this catalog, when
+            they are already known. Only the mapping, alias_to_key and collisions tables are used.
+
+    Returns:
+        dict[str, tuple[str]]: The aliases shared by several games, with the games using them, the
+        owner first. The compact catalog does not store them.
+    """
+    if parts is None:
+        parts = CatalogIndex.build_parts(mapping)
+    temp_path = file_path + ".tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(compact_catalog_bytes(mapping, parts))
+    os.replace(temp_path, file_path)
+    return parts["collisions"]
+
+
+class CompactMapping(Mapping):
+    """
+    Read-only view of a compact catalog as a mapping of game keys to normalized names.
+
+    Args:
+        catalog (CompactCatalog): The catalog.
+    """
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __len__(self):
+        return self._catalog.key_count
+
+    def __iter__(self):
+        catalog = self._catalog
+        return (catalog._key_at(i) for i in range(catalog.key_count))
+
+    def __contains__(self, key):
+        return self._catalog._find_key(key) is not None
+
+    def __getitem__(self, key):
+        index = self._catalog._find_key(key)
+        if index is None:
+            raise KeyError(key)
+        return self._catalog._names_at(index)
+
+
+class CompactCatalog:
+    """
+    Game catalog read in place from a memory-mapped compact catalog file.
+
+    It offers the lookups of `CatalogIndex`, so both can be used by the monitor and the GUI.
+    Shared aliases are reported by `write_compact_catalog` and `collisions` is always empty.
+
+    Args:
+        file_path (str): The path to the compact catalog file.
+
+    Raises:
+        ValueError: If the file is not a compact catalog of a supported version.
+    """
+
+    def __init__(self, file_path):
+        with open(file_path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER_SIZE:
+            raise ValueError(f"Not a compact catalog: {file_path}")
+        magic, version, string_count, key_count, name_count, slot_count, data_size = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a compact catalog of version {FORMAT_VERSION}: {file_path}")
+
+        self.key_count = key_count
+        self._keys_base = string_count + 1
+        self._names_base = self._keys_base + KEY_WORDS * key_count
+        self._slots_base = self._names_base + name_count
+        self._mask = slot_count - 1
+        data_start = HEADER_SIZE + 4 * (self._slots_base + SLOT_WORDS * slot_count)
+        if len(self._map) != data_start + data_size:
+            raise ValueError(f"Truncated compact catalog: {file_path}")
+
+        view = memoryview(self._map)
+        if sys.byteorder == "little":
+            self._words = view[HEADER_SIZE:data_start].cast('I')
+        else:
+            self._words = array('I', view[HEADER_SIZE:data_start])
+            self._words.byteswap()
+        self._data = view[data_start:]
+        self.mapping = CompactMapping(self)
+        self.collisions = MappingProxyType({})
+
+    def close(self):
+        """Releases the memory map. The catalog cannot be used afterwards."""
+        self._words = self._data = None
+        self._map.close()
+
+    def __len__(self):
+        return self.key_count
+
+    def __contains__(self, name):
+        return self._find_alias(normalize(name)) is not None
+
+    def _string(self, string_id):
+        words = self._words
+        return str(self._data[words[string_id]:words[string_id + 1]], "utf-8")
+
+    def _key_at(self, index):
+        return self._string(self._words[self._keys_base + KEY_WORDS * index])
+
+    def _names_at(self, index):
+        words = self._words
+        record = self._keys_base + KEY_WORDS * index
+        start = self._names_base + words[record + 1]
+        return tuple(self._string(words[i]) for i in range(start, start + words[record + 2]))
+
+    def _find_alias(self, alias):
+        encoded = alias.encode("utf-8")
+        words, data = self._words, self._data
+        mask, base = self._mask, self._slots_base
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            string_id = words[base + SLOT_WORDS * slot]
+            if not string_id:
+                return None
+            if data[words[string_id - 1]:words[string_id]] == encoded:
+                return words[base + SLOT_WORDS * slot + 1]
+            slot = (slot + 1) & mask
+
+    def _find_key(self, key):
+        low, high = 0, self.key_count
+        while low < high:
+            middle = (low + high) // 2
+            found = self._key_at(middle)
+            if found == key:
+                return middle
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def key_for(self, name):
+        """
+        Returns the canonical key for an alias or executable name.
+
+        Args:
+            name (str): The alias or executable name to look up (case insensitive).
+
+        Returns:
+            str or None: The canonical key, or None if the name is not in the catalog.
+        """
+        index = self._find_alias(normalize(name))
+        return None if index is None else self._key_at(index)
+
+    def display_name(self, key):
+        """
+        Returns the display name of a game key.
+
+        Args:
+            key (str): The canonical game key.
+
+        Returns:
+            str or None: The normalized display name, or None if the key is not in the catalog.
+        """
+        index = self._find_key(key)
+        if index is None:
+            return None
+        names = self._names_at(index)
+        return names[0] if names else normalize(key)
+
+    def aliases(self):
+        """
+        Returns every normalized alias and executable name with its canonical key.
+
+        Returns:
+            Iterator[tuple[str, str]]: The (alias, key) pairs.
+        """
+        words, base = self._words, self._slots_base
+        for slot in range(self._mask + 1):
+            string_id = words[base + SLOT_WORDS * slot]
+            if string_id:
+                yield self._string(string_id - 1), self._key_at(words[base + SLOT_WORDS * slot + 1])
+
+    def lookup(self, name):
+        """
+        Resolves an alias or executable name to its canonical key and display name.
+
+        Args:
+            name (str): The alias or executable name to look up (case insensitive).
+
+        Returns:
+            tuple[str, str] or None: The canonical key and display name, or None if not found.
+        """
+        index = self._find_alias(normalize(name))
+        if index is None:
+            return None
+        key = self._key_at(index)
+        names = self._names_at(index)
+        return key, names[0] if names else normalize(key)
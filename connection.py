@@ -0,0 +1,156 @@
+"""
+Long-lived connection handling for the Telegram client.
+
+The monitor used to connect and disconnect around every tick, paying a full MTProto
+handshake each time. The `ConnectionManager` keeps one connection open, pings it at its
+own interval and reconnects with jittered exponential backoff when it drops. The
+connection state and counters are exposed for monitoring.
+"""
+
+
+import asyncio
+import logging
+import random
+import time
+
+from telethon.tl.functions import PingRequest
+
+
+logger = logging.getLogger(__name__)
+
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+BACKOFF = "backoff"
+
+
+class ConnectionManager:
+    """
+    Keeps a single Telegram connection open and reconnects it when needed.
+
+    Args:
+        client (TelegramClient): The Telegram client to manage.
+        health_check_interval (float): Seconds between two pings of an open connection.
+        health_check_timeout (float): Seconds to wait for a ping answer before reconnecting.
+        backoff_base (float): The base delay of the exponential backoff, in seconds.
+        backoff_max (float): The maximum delay between two reconnection attempts, in seconds.
+        metrics (MonitorMetrics, optional): Records the round trip time of the health check pings.
+    """
+
+    def __init__(self, client, health_check_interval=300, health_check_timeout=10, backoff_base=1, backoff_max=300, metrics=None):
+        self.client = client
+        self.metrics = metrics
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.state = CONNECTED if client.is_connected() else DISCONNECTED
+        self.connects = 1 if self.state == CONNECTED else 0
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.failed_health_checks = 0
+        self.last_error = None
+        self.connected_since = time.time() if self.state == CONNECTED else None
+        self._last_health_check = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def backoff_delay(self, attempt):
+        """
+        Returns the delay before a reconnection attempt, using exponential backoff with full jitter.
+
+        Args:
+            attempt (int): The number of failed attempts so far.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def health_check(self):
+        """
+        Pings Telegram over the open connection.
+
+        Returns:
+            bool: True if the connection answered in time.
+        """
+        self._last_health_check = time.monotonic()
+        try:
+            await asyncio.wait_for(self.client(PingRequest(ping_id=random.getrandbits(63))), self.health_check_timeout)
+            if self.metrics is not None:
+                self.metrics.observe("telegram_rtt_seconds", time.monotonic() - self._last_health_check, method="ping")
+            return True
+        except Exception as e:
+            self.failed_health_checks += 1
+            self.last_error = repr(e)
+            logger.warning(f"Telegram health check failed: {e}")
+            return False
+
+    async def _connect(self):
+        attempt = 0
+        while True:
+            self.state = CONNECTING
+            try:
+                await self.client.connect()
+                if self.client.is_connected():
+                    break
+            except Exception as e:
+                self.last_error = repr(e)
+                logger.warning(f"Telegram connection attempt {attempt + 1} failed: {e}")
+            self.failed_attempts += 1
+            self.state = BACKOFF
+            await asyncio.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+        self.state = CONNECTED
+        self.connected_since = time.time()
+        self._last_health_check = time.monotonic()
+        if self.connects:
+            self.reconnects += 1
+            logger.info(f"Telegram connection restored (reconnects: {self.reconnects})")
+        self.connects += 1
+
+    async def ensure_connected(self):
+        """
+        Makes sure the connection is open, checking its health when the interval has elapsed.
+
+        Waits, retrying with backoff, until the connection is established.
+        """
+        async with self._lock:
+            if self.client.is_connected():
+                if time.monotonic() - self._last_health_check < self.health_check_interval:
+                    return
+                if await self.health_check():
+                    return
+                try:
+                    await self.client.disconnect()
+                except Exception:
+                    pass
+            self.state = DISCONNECTED
+            self.connected_since = None
+            await self._connect()
+
+    async def close(self):
+        """Disconnects the client."""
+        async with self._lock:
+            try:
+                await self.client.disconnect()
+            finally:
+                self.state = DISCONNECTED
+                self.connected_since = None
+
+    def stats(self):
+        """
+        Returns the connection state and counters.
+
+        Returns:
+            dict: The state, connect and reconnect counts, failures and the last error.
+        """
+        return {
+            "state": self.state,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "failed_health_checks": self.failed_health_checks,
+            "connected_since": self.connected_since,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,146 @@
+"""
+Headless entry point of the game monitor.
+
+The daemon reads the watched games, the default bio and the notification settings from the
+settings file that the GUI writes when monitoring is started (settings.json next to STATS_FILE),
+and goes straight to the monitoring loop. It never imports tkinter, PIL, sv_ttk or matplotlib,
+so it starts faster, uses less memory and can run as a service, e.g. under systemd.
+
+Usage:
+    python daemon.py [--games GAME [GAME ...]] [--bio BIO]
+    python gui.py --daemon [--games GAME [GAME ...]] [--bio BIO]
+
+The Telegram session has to be authorized once, either from the GUI or by running the daemon
+in a terminal, before it can run unattended.
+"""
+
+
+import argparse
+import atexit
+import logging
+import os
+import signal
+import sys
+
+from startup import StartupTimer
+startup_timer = StartupTimer()
+
+# Telethon imports Pillow when it is installed, only to resize uploaded photos. The daemon
+# never uploads any, so Pillow is kept out of the process.
+sys.modules.setdefault("PIL", None)
+
+from dotenv import load_dotenv
+from telethon import TelegramClient
+
+from monitor import GameMonitor, setup_logging, is_supported_os, mapping_file_for_os, load_process_mapping
+from stats_store import StatsStore
+startup_timer.mark("imports")
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line of the daemon.
+
+    Args:
+        argv (list[str], optional): The arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Run the game monitor without the window.")
+    parser.add_argument("--games", nargs="+", help="The games to watch, by name, alias or executable. Defaults to the games last started from the GUI.")
+    parser.add_argument("--bio", help="The bio shown while no game is running. Defaults to the saved default bio.")
+    return parser.parse_args(argv)
+
+
+def resolve_games(catalog_index, names):
+    """
+    Resolves the watched game names to catalog keys, skipping the unknown ones.
+
+    Args:
+        catalog_index (CatalogIndex): The game catalog.
+        names (list[str]): The game names, aliases or executable names.
+
+    Returns:
+        list[tuple[str]]: The watched games, in the format the monitor uses.
+    """
+    games = []
+    for name in names:
+        key = catalog_index.key_for(name)
+        if key is None:
+            logger.warning(os.getenv("NOT_IN_DATABASE") + " - " + name)
+        elif (key,) not in games:
+            games.append((key,))
+    return games
+
+
+def main(argv=None):
+    """
+    Runs the game monitor without the window.
+
+    Args:
+        argv (list[str], optional): The command line arguments.
+
+    Returns:
+        int: The exit status.
+    """
+    args = parse_args(argv)
+    load_dotenv()
+    setup_logging()
+    logger.setLevel(logging.DEBUG)
+
+    api_id = os.getenv("API_ID")
+    api_hash = os.getenv("API_HASH")
+    if not api_id:
+        logger.critical(os.getenv("APP_ID_MISSING"))
+        return 1
+    if not api_hash:
+        logger.critical(os.getenv("APP_HASH_MISSING"))
+        return 1
+
+    mapping_file_path = mapping_file_for_os(is_supported_os())
+    if mapping_file_path is None:
+        logger.critical(os.getenv("UNSUPPORTED_OS"))
+        return 1
+
+    stats_store = StatsStore(os.getenv("STATS_FILE"))
+    atexit.register(stats_store.close)
+    settings = stats_store.settings
+    startup_timer.mark("settings")
+
+    default_bio = args.bio or settings.get("default_bio") or os.getenv("DEFAULT_BIO")
+    if not default_bio:
+        logger.critical(os.getenv("DEFAULT_BIO_MISSING"))
+        return 1
+    if len(default_bio) > 70:
+        logger.critical(os.getenv("DEFAULT_BIO_MAX_LENGTH"))
+        return 1
+
+    catalog_index = load_process_mapping(mapping_file_path)
+    games = resolve_games(catalog_index, args.games or settings.get("watched_games", []))
+    if not games:
+        logger.critical(os.getenv("ADD_AT_LEAST_ONE_GAME"))
+        return 1
+    startup_timer.mark("catalog")
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    client = TelegramClient(os.getenv("SESSION_NAME"), int(api_id), api_hash)
+    client.start()
+    startup_timer.mark("telegram")
+    startup_timer.report()
+    monitor = GameMonitor(client, catalog_index, stats_store, default_bio, settings.get("notification_usernames", []), settings.get("notification_message"), os.getenv("VERSION"))
+    logger.info(os.getenv("CONSOLE_START_MESSAGE"))
+    try:
+        monitor.run(games)
+    except KeyboardInterrupt:
+        pass
+    logger.info(os.getenv("DEBUG_LOGOUT") + (os.getenv("VERSION") or "")) if os.getenv("DEBUG") == "true" else None
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
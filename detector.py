@@ -0,0 +1,281 @@
+"""
+Incremental process detector used by the game monitor.
+
+Instead of walking every running process on each tick, the detector keeps a cached
+pid -> process name table. Every scan only resolves the PIDs that appeared since the
+previous tick and drops the ones that disappeared, so the per-tick cost is a single
+`psutil.pids()` call plus a handful of name lookups. Watched games are answered with
+dictionary lookups against the cached names.
+
+The detector also keeps `psutil.Process` handles for the processes of the running games
+and their children, so that CPU, memory and I/O can be sampled for each game. Several games
+can be sampled side by side: each one keeps its own process tree, handles, I/O counters and
+sampling time, so a child process shared by two games is measured in full for both of them.
+"""
+
+
+import time
+
+import psutil
+
+
+class ProcessDetector:
+    """
+    Keeps track of the running processes and answers which watched games are running.
+
+    Args:
+        games (list[tuple[str]]): The watched games, in the same format as the monitor uses
+            (each entry is a tuple of process names, the first one being the game key).
+        full_scan_every (int): Re-resolve every PID after this many scans to pick up PIDs
+            that were reused by a different process between two ticks. 0 disables it.
+        children_refresh_every (int): Look up the child processes of a sampled game again after
+            this many samples of the game. 0 only looks them up when the game processes change.
+    """
+
+    def __init__(self, games=(), full_scan_every=60, children_refresh_every=10):
+        self.full_scan_every = full_scan_every
+        self.children_refresh_every = children_refresh_every
+        self._pid_names = {}
+        self._name_pids = {}
+        self._alias_to_game = {}
+        self._game_aliases = {}
+        self._game_order = {}
+        self._sampling = {}
+        self._games = None
+        self._scans = 0
+        self.set_games(games)
+
+    def set_games(self, games):
+        """
+        Sets the watched games. The alias table is only rebuilt when the list changes.
+
+        Args:
+            games (list[tuple[str]]): The watched games.
+        """
+        games = tuple(tuple(game) for game in games)
+        if games == self._games:
+            return
+        self._games = games
+        self._alias_to_game = {}
+        self._game_aliases = {}
+        self._game_order = {}
+        for order, game in enumerate(games):
+            if not game:
+                continue
+            self._game_order.setdefault(game[0], order)
+            for name in game:
+                self._alias_to_game.setdefault(name.lower(), []).append(game[0])
+                self._game_aliases.setdefault(game[0], set()).add(name.lower())
+
+    def _resolve(self, pid):
+        try:
+            return psutil.Process(pid).name().lower()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    def _add(self, pid, name):
+        self._pid_names[pid] = name
+        if name:
+            self._name_pids.setdefault(name, set()).add(pid)
+
+    def _remove(self, pid):
+        name = self._pid_names.pop(pid, None)
+        if name:
+            pids = self._name_pids.get(name)
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self._name_pids[name]
+
+    def scan(self):
+        """
+        Updates the cached process table with the PIDs that appeared or disappeared since the last scan.
+
+        Returns:
+            tuple[set[int], set[int]]: The PIDs that were added and the PIDs that were removed.
+        """
+        self._scans += 1
+        if self.full_scan_every and self._scans % self.full_scan_every == 0:
+            self._pid_names.clear()
+            self._name_pids.clear()
+
+        current = set(psutil.pids())
+        known = self._pid_names.keys()
+        removed = known - current
+        added = current - known
+        for pid in removed:
+            self._remove(pid)
+        for pid in added:
+            self._add(pid, self._resolve(pid))
+        return added, removed
+
+    def is_running(self, process_name):
+        """
+        Checks if a process with the given name is in the cached process table.
+
+        Args:
+            process_name (str): The process name to look up (case insensitive).
+
+        Returns:
+            bool: True if at least one process with this name is running.
+        """
+        return process_name.lower() in self._name_pids
+
+    def running_games(self):
+        """
+        Returns the watched games that are running, without scanning the process table.
+
+        Returns:
+            list[str]: The keys of the running watched games, in the order they are watched.
+        """
+        found = set()
+        if len(self._alias_to_game) < len(self._name_pids):
+            for name, games in self._alias_to_game.items():
+                if name in self._name_pids:
+                    found.update(games)
+        else:
+            for name in self._name_pids:
+                games = self._alias_to_game.get(name)
+                if games:
+                    found.update(games)
+        return sorted(found, key=self._game_order.__getitem__)
+
+    def scan_running_games(self):
+        """
+        Scans the process table and returns every watched game that is running.
+
+        Returns:
+            list[str]: The keys of the running watched games, in the order they are watched.
+        """
+        self.scan()
+        return self.running_games()
+
+    def first_running_game(self):
+        """
+        Scans the process table and returns the first watched game that is running.
+
+        Returns:
+            str or None: The key of the first running watched game, or None if no game is running.
+        """
+        games = self.scan_running_games()
+        return games[0] if games else None
+
+    def game_pids(self, game):
+        """
+        Returns the PIDs of the running processes of a watched game.
+
+        Args:
+            game (str): The key of the watched game.
+
+        Returns:
+            set[int]: The PIDs whose process name is one of the game names.
+        """
+        pids = set()
+        for name in self._game_aliases.get(game, ()):
+            pids.update(self._name_pids.get(name, ()))
+        return pids
+
+    def _refresh_sample_pids(self, state, roots):
+        pids = set(roots)
+        handles = state["handles"]
+        for pid in roots:
+            handle = handles.get(pid)
+            try:
+                if handle is None:
+                    handle = handles[pid] = psutil.Process(pid)
+                pids.update(child.pid for child in handle.children(recursive=True))
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        state["roots"] = roots
+        state["pids"] = pids
+
+    def _drop_unused_handles(self, state):
+        for pid in list(state["handles"]):
+            if pid not in state["pids"]:
+                del state["handles"][pid]
+                state["io"].pop(pid, None)
+                state["cpu_ready"].discard(pid)
+
+    def forget_game(self, game):
+        """
+        Drops the sampling state and the process handles of a game that stopped.
+
+        Args:
+            game (str): The key of the watched game.
+        """
+        self._sampling.pop(game, None)
+
+    def sample_game(self, game):
+        """
+        Samples the resource usage of a watched game, including its child processes.
+
+        The `psutil.Process` handles are cached between calls, so the CPU percentage is measured
+        since the previous sample of the game. The first `cpu_percent` call of a new handle only
+        sets its baseline and always returns 0, so a process is left out of the CPU sum until its
+        second sample. The children are looked up again when the game processes change and every
+        `children_refresh_every` samples of the game.
+
+        Args:
+            game (str): The key of the watched game.
+
+        Returns:
+            dict or None: The CPU usage as a percentage of the whole machine ("cpu"), the resident
+            memory in bytes ("rss") and the read and write rates in bytes per second ("read_rate",
+            "write_rate", None when I/O counters are not available), or None if the game is not running.
+            The CPU usage is None while no process of the game has a CPU baseline yet.
+        """
+        roots = self.game_pids(game)
+        if not roots:
+            self.forget_game(game)
+            return None
+
+        state = self._sampling.setdefault(game, {"roots": None, "pids": set(), "samples": 0, "last": None, "handles": {}, "io": {}, "cpu_ready": set()})
+        state["samples"] += 1
+        if roots != state["roots"] or (self.children_refresh_every and state["samples"] % self.children_refresh_every == 0):
+            self._refresh_sample_pids(state, roots)
+
+        now = time.monotonic()
+        elapsed = now - state["last"] if state["last"] is not None else None
+        state["last"] = now
+
+        handles = state["handles"]
+        cpu = None
+        rss = 0
+        read_bytes = None
+        write_bytes = None
+        alive = set()
+        for pid in state["pids"]:
+            handle = handles.get(pid)
+            try:
+                if handle is None:
+                    handle = handles[pid] = psutil.Process(pid)
+                with handle.oneshot():
+                    percent = handle.cpu_percent(None)
+                    rss += handle.memory_info().rss
+                    try:
+                        io = handle.io_counters()
+                    except (AttributeError, psutil.AccessDenied):
+                        io = None
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            alive.add(pid)
+            if pid in state["cpu_ready"]:
+                cpu = (cpu or 0.0) + percent
+            else:
+                state["cpu_ready"].add(pid)
+            if io is not None:
+                last = state["io"].get(pid)
+                state["io"][pid] = (io.read_bytes, io.write_bytes)
+                if last is not None:
+                    read_bytes = (read_bytes or 0) + max(0, io.read_bytes - last[0])
+                    write_bytes = (write_bytes or 0) + max(0, io.write_bytes - last[1])
+
+        state["pids"] &= alive
+        self._drop_unused_handles(state)
+
+        return {
+            "cpu": cpu / (psutil.cpu_count() or 1) if cpu is not None else None,
+            "rss": rss,
+            "read_rate": read_bytes / elapsed if read_bytes is not None and elapsed else None,
+            "write_rate": write_bytes / elapsed if write_bytes is not None and elapsed else None,
+        }
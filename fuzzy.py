@@ -0,0 +1,249 @@
+"""
+Typo-tolerant lookup of game names, for `add_game`.
+
+Every alias of the catalog is split into padded trigrams ("$va", "val", ..., "nt$") once, and
+an inverted index maps each trigram to the aliases that contain it. A query is answered in
+two steps:
+
+1. Candidate pruning: the aliases sharing the most trigrams with the query are counted from
+   the posting lists. Only the aliases whose length is close to the query are counted, and
+   the ones sharing too few trigrams to be within the edit distance limit are dropped as soon
+   as the remaining trigrams cannot make up for it.
+2. Ranking: the remaining best candidates are ranked by their edit distance to the query
+   (Damerau-Levenshtein, a transposition counts as one edit), computed with a cut-off.
+
+With large catalogs the index can be built in a background thread. No name is suggested until
+the index is published.
+"""
+
+
+import heapq
+import threading
+from operator import itemgetter
+
+from catalog import normalize
+
+
+DEFAULT_MAX_DISTANCE = 3
+DEFAULT_CANDIDATES = 24
+COMMON_GRAM_RATIO = 0.05
+
+
+def padded_trigrams(text):
+    """
+    Returns the distinct trigrams of a text padded with "$" on both sides.
+
+    Args:
+        text (str): The normalized text.
+
+    Returns:
+        set[str]: The trigrams. A one-letter text gives "$a$".
+    """
+    padded = "$" + text + "$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Damerau-Levenshtein (optimal string alignment) distance between two strings.
+
+    Only the cells within `limit` of the diagonal are computed, since any path leaving this
+    band costs more than the limit.
+
+    Args:
+        a (str): The first string.
+        b (str): The second string.
+        limit (int): Stop as soon as the distance is known to exceed this value.
+
+    Returns:
+        int: The distance, or limit + 1 if it is greater than the limit.
+    """
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [over] * (len_b + 1)
+        if i <= limit:
+            current[0] = i
+        ca = a[i - 1]
+        best = current[0]
+        for j in range(max(1, i - limit), min(len_b, i + limit) + 1):
+            value = previous[j - 1] if ca == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if previous2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value
+            if value < best:
+                best = value
+        if best > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[len_b], over)
+
+
+def distance_limit(query, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    Returns the number of typos tolerated for a query: one per three characters, up to `max_distance`.
+
+    Args:
+        query (str): The normalized query.
+        max_distance (int): The largest edit distance accepted.
+
+    Returns:
+        int: The edit distance limit, at least 1.
+    """
+    return max(1, min(max_distance, len(query) // 3))
+
+
+class FuzzyMatcher:
+    """
+    Trigram index over every alias of the catalog, ranking its suggestions by edit distance.
+
+    Args:
+        catalog_index (CatalogIndex): The game catalog.
+        background (bool): Build the trigram index in a background thread instead of right away.
+    """
+
+    def __init__(self, catalog_index, background=False):
+        self.aliases = []
+        self.alias_keys = []
+        self._postings = None
+        self._common = 32
+        if background:
+            threading.Thread(target=self._build, args=(catalog_index,), name="fuzzy-index", daemon=True).start()
+        else:
+            self._build(catalog_index)
+
+    @property
+    def ready(self):
+        """True once the trigram index is built."""
+        return self._postings is not None
+
+    def _build(self, catalog_index):
+        aliases = []
+        alias_keys = []
+        postings = {}
+        for alias, key in catalog_index.aliases():
+            position = len(aliases)
+            aliases.append(alias)
+            alias_keys.append(key)
+            length = len(alias)
+            for gram in padded_trigrams(alias):
+                postings.setdefault(gram, {}).setdefault(length, []).append(position)
+        self.aliases, self.alias_keys = aliases, alias_keys
+        self._common = max(32, int(len(aliases) * COMMON_GRAM_RATIO))
+        self._postings = postings
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def candidates(self, query, max_distance=DEFAULT_MAX_DISTANCE, max_candidates=None):
+        """
+        Returns the aliases sharing trigrams with the query, the most shared trigrams first.
+
+        Only the aliases whose length is within `max_distance` of the query are counted. When the query is
+        long enough for every match to share at least one of its trigrams, the rarest trigrams alone bring
+        in the candidates, the others only add to their counts (prefix filtering), and the candidates sharing
+        too few trigrams to be within `max_distance` are dropped. A trigram whose posting lists are longer
+        than the candidates found so far is looked up in the candidates instead. Otherwise the trigrams found
+        in a large part of the catalog are skipped.
+
+        Args:
+            query (str): The normalized query.
+            max_distance (int): The largest edit distance accepted.
+            max_candidates (int, optional): Only return this number of best candidates.
+
+        Returns:
+            tuple[list[tuple[int, int]], int]: The alias positions with their number of shared trigrams, and
+            the number of query trigrams they were counted over. Each edit changes at most three trigrams, so
+            an alias sharing `shared` of these `total` trigrams is at least (total - shared) / 3 edits away.
+        """
+        length = len(query)
+        lengths = range(length - max_distance, length + max_distance + 1)
+        postings = []
+        for gram in padded_trigrams(query):
+            buckets = self._postings.get(gram, {})
+            lists = [buckets[size] for size in lengths if size in buckets]
+            postings.append((sum(len(posting) for posting in lists), gram, lists))
+        postings.sort(key=lambda item: item[0])
+
+        required = len(postings) - 3 * max_distance
+        if required > 0:
+            seeding, used = len(postings) - required + 1, postings
+        else:
+            used = [item for item in postings if item[0] <= self._common] or postings
+            seeding = len(used)
+
+        counts = {}
+        for rank, (size, gram, lists) in enumerate(used):
+            if rank < seeding:
+                for posting in lists:
+                    for position in posting:
+                        counts[position] = counts.get(position, 0) + 1
+                continue
+            if size > len(counts):
+                aliases = self.aliases
+                for position in counts:
+                    if gram in "$" + aliases[position] + "$":
+                        counts[position] += 1
+            else:
+                for posting in lists:
+                    for position in posting:
+                        if position in counts:
+                            counts[position] += 1
+            # The aliases that cannot share `required` trigrams even with all the remaining ones are dropped.
+            least = required - (len(used) - rank - 1)
+            if least > 1:
+                counts = {position: count for position, count in counts.items() if count >= least}
+        if required > 0:
+            ranked = [item for item in counts.items() if item[1] >= required]
+        else:
+            ranked = counts.items()
+        if max_candidates is None:
+            return sorted(ranked, key=lambda item: -item[1]), len(used)
+        return heapq.nlargest(max_candidates, ranked, key=itemgetter(1)), len(used)
+
+    def suggest(self, name, k=5, max_distance=DEFAULT_MAX_DISTANCE, max_candidates=DEFAULT_CANDIDATES):
+        """
+        Returns the games whose aliases are closest to a name.
+
+        The candidates are checked in the order of their shared trigrams. The search stops as soon as the
+        trigram bound proves that the remaining candidates cannot beat the current k-th suggestion, or after
+        `max_candidates` edit distances.
+
+        Args:
+            name (str): The name typed by the user.
+            k (int): The maximum number of suggestions.
+            max_distance (int): The largest edit distance accepted, see `distance_limit`.
+            max_candidates (int): The maximum number of edit distances computed.
+
+        Returns:
+            list[tuple[str, str, int]]: The game key, the matching alias and the edit distance of each
+            suggestion, closest first, with at most one suggestion per game. Empty until the index is built.
+        """
+        query = normalize(name)
+        if not query or not self.ready:
+            return []
+        limit = distance_limit(query, max_distance)
+        ranked, total = self.candidates(query, limit, max_candidates)
+        best = {}
+        for checked, (position, shared) in enumerate(ranked):
+            if checked == max_candidates or (total - shared + 2) // 3 > limit:
+                break
+            alias = self.aliases[position]
+            distance = edit_distance(query, alias, limit)
+            if distance > limit:
+                continue
+            key = self.alias_keys[position]
+            if key not in best or (distance, len(alias)) < best[key][:2]:
+                best[key] = (distance, len(alias), alias)
+            if len(best) >= k:
+                limit = sorted(value[0] for value in best.values())[k - 1]
+        suggestions = sorted(best.items(), key=lambda item: item[1])[:k]
+        return [(key, alias, distance) for key, (distance, _, alias) in suggestions]
@@ -0,0 +1,207 @@
+"""
+Background GPU usage sampling.
+
+Reading the GPU load used to spawn `nvidia-smi` from inside the asyncio loop on every tick.
+The `GPUSampler` reads it from a backend in a daemon thread at its own cadence and publishes
+the latest value, which the monitor reads without blocking.
+
+Backends:
+- `NVMLBackend`: keeps NVML loaded in-process through `pynvml`, when it is installed.
+- `NvidiaSmiBackend`: runs `nvidia-smi` as a subprocess.
+- `NullBackend`: used when no NVIDIA GPU is available, always returns None.
+- `FakeBackend`: returns predefined values, for testing without a GPU.
+"""
+
+
+import itertools
+import logging
+import shutil
+import subprocess
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class GPUBackend:
+    """Interface of the GPU backends."""
+
+    name = "base"
+
+    def read(self):
+        """
+        Reads the current GPU usage.
+
+        Returns:
+            float or None: The load of the busiest GPU as a percentage, or None if unavailable.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases the resources held by the backend."""
+
+
+class NullBackend(GPUBackend):
+    """Backend for machines without a supported GPU."""
+
+    name = "null"
+
+    def read(self):
+        return None
+
+
+class FakeBackend(GPUBackend):
+    """
+    Backend returning predefined values in a loop.
+
+    Args:
+        values (list[float or None]): The values to return.
+    """
+
+    name = "fake"
+
+    def __init__(self, values):
+        self._values = itertools.cycle(values)
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return next(self._values)
+
+
+class NvidiaSmiBackend(GPUBackend):
+    """
+    Backend running `nvidia-smi` as a subprocess.
+
+    Args:
+        executable (str): The path of the nvidia-smi executable.
+        timeout (float): Seconds to wait for nvidia-smi.
+    """
+
+    name = "nvidia-smi"
+
+    def __init__(self, executable="nvidia-smi", timeout=5):
+        self.executable = executable
+        self.timeout = timeout
+
+    def read(self):
+        output = subprocess.run(
+            [self.executable, "--query-gpu=utilization.gpu", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, timeout=self.timeout, check=True,
+        ).stdout
+        loads = [float(line) for line in output.split() if line.strip()]
+        return max(loads) if loads else None
+
+
+class NVMLBackend(GPUBackend):
+    """Backend keeping NVML loaded in-process through pynvml."""
+
+    name = "nvml"
+
+    def __init__(self):
+        import pynvml
+        self._nvml = pynvml
+        pynvml.nvmlInit()
+        self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+
+    def read(self):
+        loads = [self._nvml.nvmlDeviceGetUtilizationRates(handle).gpu for handle in self._handles]
+        return float(max(loads)) if loads else None
+
+    def close(self):
+        self._nvml.nvmlShutdown()
+
+
+def select_backend():
+    """
+    Selects the best available GPU backend: NVML, then nvidia-smi, then the null backend.
+
+    Returns:
+        GPUBackend: The selected backend.
+    """
+    try:
+        backend = NVMLBackend()
+        if backend._handles:
+            return backend
+        backend.close()
+    except Exception:
+        pass
+    executable = shutil.which("nvidia-smi")
+    if executable:
+        return NvidiaSmiBackend(executable)
+    return NullBackend()
+
+
+class GPUSampler:
+    """
+    Reads the GPU usage from a backend in a background thread.
+
+    The latest reading is published as a single (value, timestamp) tuple, which is replaced
+    atomically, so `latest` never takes a lock or waits for the backend.
+
+    Args:
+        backend (GPUBackend): The backend to read from.
+        interval (float): Seconds between two readings.
+    """
+
+    def __init__(self, backend, interval=10):
+        self.backend = backend
+        self.interval = interval
+        self.errors = 0
+        self._latest = (None, None)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the sampling thread. The null backend does not need one."""
+        if isinstance(self.backend, NullBackend) or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gpu-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the sampling thread and closes the backend."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+        self.backend.close()
+
+    def sample_once(self):
+        """
+        Reads the backend once and publishes the value.
+
+        Returns:
+            float or None: The value read.
+        """
+        try:
+            value = self.backend.read()
+        except Exception as e:
+            self.errors += 1
+            value = None
+            if self.errors == 1:
+                logger.warning(f"GPU usage could not be read with {self.backend.name}: {e}")
+        self._latest = (value, time.time())
+        return value
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample_once()
+            self._stop.wait(self.interval)
+
+    def latest(self, max_age=None):
+        """
+        Returns the latest published GPU usage.
+
+        Args:
+            max_age (float, optional): Ignore readings older than this many seconds.
+
+        Returns:
+            float or None: The GPU usage as a percentage, or None if unavailable.
+        """
+        value, timestamp = self._latest
+        if timestamp is None or (max_age is not None and time.time() - timestamp > max_age):
+            return None
+        return value
@@ -38,51 +38,48 @@ Usage:
 6. Click the "Start" button to begin monitoring and updating your Telegram status.
 
 Note: This application requires a Telegram account and API credentials to function correctly.
+
+Run `python gui.py --daemon` (or `python daemon.py`) to monitor without the window, see daemon.py.
 """
 
 
-import asyncio
-from turtle import color
-import psutil
 import sys
-import time
+
+if __name__ == "__main__" and "--daemon" in sys.argv[1:]:
+    import daemon
+    sys.exit(daemon.main([arg for arg in sys.argv[1:] if arg != "--daemon"]))
+
+from startup import StartupTimer
+startup_timer = StartupTimer()
+
+import asyncio
 import tkinter as tk
 from tkinter import messagebox
 import tkinter.font as tkfont
 from telethon import TelegramClient
-from telethon.tl.functions.account import UpdateProfileRequest
-import json
 from dotenv import load_dotenv
 import os
-import platform
-from PIL import Image, ImageTk
-import requests
 import sv_ttk
 import logging
-from datetime import datetime
-import GPUtil
+from monitor import GameMonitor, setup_logging, is_supported_os, mapping_file_for_os, load_process_mapping
+from search import GameSearchIndex
+from fuzzy import FuzzyMatcher
+from catalog import capitalize_first_letters
+from virtual_list import VirtualList
+from stats_store import StatsStore
+from version_check import VersionCache, check_in_background, is_newer
+import atexit
+startup_timer.mark("imports")
 
 """
-Configures the logging system for the application.
-
-Adds a console handler and a file handler to the root logger, both set to log at the DEBUG level. The console handler and file handler use a common formatter that includes the timestamp, log level, and log message.
-
-The root logger is also set to log at the DEBUG level, ensuring that all log messages at or above the DEBUG level will be captured by the configured handlers.
+Configures the logging system for the application, see `monitor.setup_logging`. The application logger is set to log at the DEBUG level.
 """
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-file_handler = logging.FileHandler('./debug/debug.log')
-file_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(formatter)
-file_handler.setFormatter(formatter)
+setup_logging()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
 
 load_dotenv()
-added_games = []
+added_games = set()
 default_bio = os.getenv("DEFAULT_BIO")
 start = False
 default_start = False
@@ -90,144 +87,36 @@ me_welcome = None
 api_id = os.getenv("API_ID")
 api_hash = os.getenv("API_HASH")
 app_icon = os.getenv("APP_ICON")
-ACTION_EMOJI_LESS_10_MIN = os.getenv("ACTION_EMOJI_LESS_10_MIN")
-ACTION_EMOJI_10_TO_60_MIN = os.getenv("ACTION_EMOJI_10_TO_60_MIN")
-ACTION_EMOJI_60_TO_120_MIN = os.getenv("ACTION_EMOJI_60_TO_120_MIN")
-ACTION_EMOJI_MORE_120_MIN = os.getenv("ACTION_EMOJI_MORE_120_MIN")
 global latest_version
 global local_version
 STATS_FILE = os.getenv("STATS_FILE")
-game_stats = json.load(open('./game_stats.json'))
+VERSION_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(STATS_FILE)), "version_cache.json")
+stats_store = StatsStore(STATS_FILE)
+atexit.register(stats_store.close)
+game_stats = stats_store.stats
+settings = stats_store.settings
 notification_usernames = []
-global playing_game
-playing_game = None
-notification_message_text_global = None
 
-if "notification_usernames" in game_stats:
-    notification_usernames = game_stats["notification_usernames"]
+if "notification_usernames" in settings:
+    notification_usernames = settings["notification_usernames"]
 else:
-    game_stats["notification_usernames"] = []
+    settings["notification_usernames"] = []
 
-if "notification_message" in game_stats:
-    notification_message_text_global_str = game_stats["notification_message"]
+if "notification_message" in settings:
+    notification_message_text_global_str = settings["notification_message"]
 else:
-    game_stats["notification_message"] = os.getenv("NOTIFICATION_MESSAGE")
+    settings["notification_message"] = os.getenv("NOTIFICATION_MESSAGE")
     notification_message_text_global_str = os.getenv("NOTIFICATION_MESSAGE")
 
-if "default_bio" in game_stats:
-    default_bio = game_stats["default_bio"]
+if "default_bio" in settings:
+    default_bio = settings["default_bio"]
 else:
-    game_stats["default_bio"] = os.getenv("DEFAULT_BIO")
+    settings["default_bio"] = os.getenv("DEFAULT_BIO")
     default_bio = os.getenv("DEFAULT_BIO")
 
-
-def get_cpu_usage():
-    """
-    Gets the current CPU usage as a percentage.
-
-    Args:
-        process_name (str): The name of the process to get the CPU usage for.
-
-    Returns:
-        float: The current CPU usage as a percentage.
-    """
-    return psutil.cpu_percent()
-
-def get_gpu_usage():
-    """
-    Gets the current GPU usage as a percentage.
-
-    Returns:
-        float: The current GPU usage as a percentage.
-    """
-    return (max(GPUtil.getGPUs(), key=lambda gpu: gpu.load).load) * 100
-
-def log_game_start(game_name):
-    """
-    Logs the start of a game session in the game_stats dictionary.
-
-    Args:
-        game_name (str): The name of the game being played.
-
-    Notes:
-        The start time is recorded in ISO format using datetime.now().isoformat().
-        If the game is not already in the daily stats dictionary, a new entry is created with a start time and total duration of 0.
-    """
-    current_time = datetime.now().isoformat()
-    if game_name not in game_stats["daily"]:
-        game_stats["daily"][game_name] = {"start_time": current_time, "total_duration": 1}
-
-def log_game_end(game_name):
-    """
-    Logs the end of a game session in the game_stats dictionary.
-
-    Args:
-        game_name (str): The name of the game being played.
-
-    Notes:
-        The end time is recorded in ISO format using datetime.now().isoformat().
-        The duration of the session is calculated by taking the difference between the start and end times.
-        The total duration of all sessions for the game is incremented by the duration of this session.
-        The updated game_stats dictionary is written to the file specified by STATS_FILE by calling _save_stats_to_file.
-    """
-    if game_name in game_stats["daily"]:
-        start_time = datetime.fromisoformat(game_stats["daily"][game_name]["start_time"])
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds() / 60
-        game_stats["daily"][game_name]["total_duration"] += duration
-        game_stats["daily"][game_name]["total_duration"] = game_stats["daily"][game_name]["total_duration"] / 10
-        _save_stats_to_file()
-
-
-def _save_stats_to_file():
-    """Writes the game_stats dictionary to the file specified by STATS_FILE in JSON format."""
-    with open(STATS_FILE, 'w') as f:
-        json.dump(game_stats, f, indent=4)
-
-async def get_first_name(username):
-    """
-    Asynchronously retrieves the first name of a Telegram user given their username.
-
-    Args:
-        username (str): The Telegram username of the user.
-
-    Returns:
-        str: The first name of the user, or None if the user is not found or an error occurs.
-    """
-    try:
-        user = await client.get_entity(username)
-        return user.first_name
-    except Exception as e:
-        logger.warning(f"Could not get first name for {username}: {e}")
-        return False
-
-
-def get_latest_version():
-    """
-    Retrieves the latest version information from a remote source.
-
-    Returns:
-        dict: A dictionary containing the latest version and update message, or None if an error occurred.
-    """
-    try:
-        response = requests.get("https://raw.githubusercontent.com/phaticusthiccy/Telegram-Activity/master/sample.env")
-        response.raise_for_status()
-        message_payload = {
-            "version": "",
-            "message": ""
-        }
-        for line in response.text.split("\n"):
-            if line.startswith("VERSION="):
-                message_payload["version"] = line.split("=")[1].strip('"')
-            if line.startswith("UPDATE_MESSAGE="):
-                message_payload["message"] = line.split("=")[1].strip('"')
-        return message_payload
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Error retrieving latest version: {e}")
-    return {
-        "version": "",
-        "message": ""
-    }
+def _save_settings():
+    """Writes the settings (default bio, theme, notifications) to their own file."""
+    stats_store.save_settings()
 
 async def print_me():
     """
@@ -264,6 +153,7 @@ logger.info(os.getenv("DEBUG_ON")) if os.getenv("DEBUG") == "true" else None
 
 local_version = os.getenv("VERSION")
 logger.info(os.getenv("DEBUG_VERSION") + local_version) if os.getenv("DEBUG") == "true" else None
+startup_timer.mark("settings")
 
 def toggle_debug_mode(fromTheme):
     """
@@ -305,33 +195,6 @@ def toggle_hint_mode(fromTheme):
     else:
         return hint_mode_button.configure(selectcolor="white")
 
-def is_supported_os():
-    """
-    Returns the current system platform as a lowercase string.
-
-    This function checks the current system platform and returns it as a lowercase string. If the DEBUG environment variable is set to "true", it will also log the system platform to the logger.
-
-    Returns:
-        str: The current system platform as a lowercase string.
-    """
-    system = platform.system().lower()
-    logger.info(os.getenv("DEBUG_SYSTEM") + system) if os.getenv("DEBUG") == "true" else None
-    return system
-
-def load_process_mapping(file_path):
-    """
-    The function `load_process_mapping` reads and loads a JSON file from the specified file path.
-
-    :param file_path: The `file_path` parameter in the `load_process_mapping` function is a string that
-    represents the path to the file containing the process mapping data that you want to load and
-    process. This file should be in a format that can be loaded using the `json.load()` function, such
-    as a JSON
-    :return: The function `load_process_mapping` reads a JSON file located at the `file_path` and
-    returns the contents of the file as a Python dictionary after loading it using `json.load()`.
-    """
-    with open(file_path, 'r') as file:
-        return json.load(file)
-
 def handle_exit(signum, frame):
     """
     Handles the exit signal for the application.
@@ -346,20 +209,6 @@ def handle_exit(signum, frame):
     logger.info(os.getenv("DEBUG_LOGOUT") + local_version) if os.getenv("DEBUG") == "true" else None
     sys.exit()
 
-def capitalize_first_letters(text):
-    """
-    Capitalizes the first letter of each word in the given text.
-
-    Args:
-        text (str): The input text to capitalize.
-
-    Returns:
-        str: The input text with the first letter of each word capitalized.
-    """
-    words = text.split()
-    capitalized_words = [word.capitalize() for word in words]
-    return ' '.join(capitalized_words)
-
 def show_stats():
     """
     Creates a new window to show game statistics.
@@ -369,171 +218,27 @@ def show_stats():
 
     time_frame = tk.StringVar(value="daily")
     tk.Radiobutton(stats_window, text=os.getenv("DAILY"), variable=time_frame, value="daily", selectcolor="gray").pack()
+    tk.Radiobutton(stats_window, text=os.getenv("WEEKLY"), variable=time_frame, value="weekly", selectcolor="gray").pack()
+    tk.Radiobutton(stats_window, text=os.getenv("MONTHLY"), variable=time_frame, value="monthly", selectcolor="gray").pack()
 
     tk.Button(stats_window, text=os.getenv("GENERATE_REPORT"), command=lambda: _generate_report(time_frame.get())).pack()
 
 def _generate_report(time_frame):
     """
-    Generates a bar chart with the total durations of each game in the given time frame.
+    Shows the pie chart of the game durations and the resource usage of each game in the given time frame.
+
+    The report data and the figure are cached by the report module, so opening the report again with unchanged stats reuses them.
+    The report module, with NumPy and matplotlib, is only imported the first time a report is shown.
 
     Args:
-        time_frame (str): The time frame to generate the report for, either "daily" or "weekly".
+        time_frame (str): The time frame to generate the report for, either "daily", "weekly" or "monthly".
 
     Returns:
         None
     """
-    import matplotlib.pyplot as plt
-    import numpy as np
-    from matplotlib.patches import ConnectionPatch
-    from matplotlib.widgets import Button
-
-    data = game_stats["daily"] 
-
-    labels = list(data.keys())
-    total_durations = [v['total_duration'] for v in data.values()]
-    sum_total = sum(total_durations)
-    overall_ratios = [dur / sum_total for dur in total_durations]
-
-    fig = plt.figure(figsize=(12, 6))
-    ax1 = fig.add_axes([0.3, 0.1, 0.35, 0.8])
-    ax2 = fig.add_axes([0.7, 0.1, 0.25, 0.8])
-
-    def draw_plots(selected_label):
-        idx = labels.index(selected_label)
-        explode = [0] * len(labels)
-        explode[idx] = 0.1
-        ax1.clear()
-        ax2.clear()
-
-        angle = -180 * overall_ratios[idx]
-        wedges, texts, autotexts = ax1.pie(overall_ratios, autopct='%1.1f%%',
-                                        startangle=angle, labels=labels,
-                                        explode=explode, textprops={'fontsize': 8})
-        
-        game_data = data[selected_label]
-        played_time = game_data['total_duration']
-        ax1.text(0, -1.5, f'{os.getenv("PLAYED_TIME")} {played_time:.2f} {os.getenv("DURATION")}', 
-                ha='center', fontsize=10, bbox=dict(facecolor='white', alpha=0.5))
-        
-        wedge = wedges[idx]
-        theta1, theta2 = wedge.theta1, wedge.theta2
-        center, r = wedge.center, wedge.r
-        
-        game_data = data[selected_label]
-        cpu = game_data['avgCPUusage'] / 100
-        gpu = game_data['avgGPUusage'] / 100
-        age_ratios = [cpu, gpu]
-        age_labels = ['CPU', 'GPU']
-        
-        bottom = 1
-        width = 0.2
-        colors = ['#1f77b4', '#ff7f0e']
-        
-        for j, (height, label) in enumerate(reversed(list(zip(age_ratios, age_labels)))): 
-            bottom -= height
-            bars = ax2.bar(0, height, width, bottom=bottom, color=colors[j],
-                        label=label, alpha=0.7)
-            ax2.bar_label(bars, labels=[f"{height*100:.0f}%"],
-                        label_type='center', color='white')
-        
-        
-        ax2.set_title(f'{os.getenv("COMPUTE_USAGE")} ({selected_label})', pad=20)
-        ax2.legend(loc='upper right')
-        ax2.axis('off')
-        ax2.set_xlim(-2.5 * width, 2.5 * width)
-        
-        bar_top = 1.0
-        bar_bottom = 1.0 - sum(age_ratios)
-        
-        x_top = r * np.cos(np.pi / 180 * theta2) + center[0]
-        y_top = r * np.sin(np.pi / 180 * theta2) + center[1]
-        con_top = ConnectionPatch(xyA=(-width/2, bar_top), coordsA=ax2.transData,
-                                xyB=(x_top, y_top), coordsB=ax1.transData, color='gray')
-        ax2.add_artist(con_top)
-        
-        x_bot = r * np.cos(np.pi / 180 * theta1) + center[0]
-        y_bot = r * np.sin(np.pi / 180 * theta1) + center[1]
-        con_bot = ConnectionPatch(xyA=(-width/2, bar_bottom), coordsA=ax2.transData,
-                                xyB=(x_bot, y_bot), coordsB=ax1.transData, color='gray')
-        ax2.add_artist(con_bot)
-        
-        fig.canvas.draw_idle()
-
-    try:
-        current_selection = labels[0]
-    except:
+    import report
+    if not report.show_report(stats_store.rollup(time_frame)):
         messagebox.showinfo("Error", os.getenv("NO_GAME_DATA"))
-        return
-        
-    draw_plots(current_selection)
-
-    menu_start_pos = [-0.25, 0.1, 0.2, 0.8]
-    menu_end_pos = [0.05, 0.1, 0.2, 0.8]
-
-    menu_ax = fig.add_axes(menu_start_pos)
-    menu_ax.set_xlim(0, 1)
-    menu_ax.set_ylim(0, 1)
-    menu_ax.set_clip_on(True)
-    menu_ax.axis('off')
-    menu_texts = []
-
-    n = len(labels)
-    for i, lab in enumerate(labels):
-        y = 0.9 - i * (0.8 / n)
-        txt = menu_ax.text(0.1, y, lab, fontsize=12, picker=True,
-                        bbox=dict(boxstyle="round", fc="white", ec="black"))
-        txt.set_clip_on(True)
-        menu_texts.append(txt)
-
-    global menu_visible
-    menu_visible = False
-
-    def slide_menu(show=True):
-        start = menu_start_pos[0] if show else menu_end_pos[0]
-        end = menu_end_pos[0] if show else menu_start_pos[0]
-        steps = 20
-        delta = (end - start) / steps
-        for i in range(steps):
-            new_x = start + delta * (i + 1)
-            pos = [new_x, menu_end_pos[1], menu_end_pos[2], menu_end_pos[3]]
-            menu_ax.set_position(pos)
-            fig.canvas.draw_idle()
-            plt.pause(0.01)
-
-    def on_menu_click(event):
-        global current_selection, menu_visible
-        if menu_visible and event.inaxes != menu_ax:
-            slide_menu(show=False)
-            menu_visible = False
-
-    def on_menu_pick(event):
-        global current_selection, menu_visible
-        artist = event.artist
-        if artist in menu_texts:
-            selected = artist.get_text()
-            current_selection = selected
-            draw_plots(selected)
-            slide_menu(show=False)
-            menu_visible = False
-
-    fig.canvas.mpl_connect('pick_event', on_menu_pick)
-    fig.canvas.mpl_connect('button_press_event', on_menu_click)
-
-    ax_button = fig.add_axes([0.01, 0.9, 0.1, 0.05])
-    menu_button = Button(ax_button, 'Menu')
-
-    def toggle_menu(event):
-        global menu_visible
-        if not menu_visible:
-            slide_menu(show=True)
-            menu_visible = True
-        else:
-            slide_menu(show=False)
-            menu_visible = False
-
-    menu_button.on_clicked(toggle_menu)
-
-    plt.show()
 
 
 
@@ -547,11 +252,8 @@ def find_process_name(name):
     Returns:
         str or False: The matching process name, or False if no match is found.
     """
-    name_lower = name.lower()
-    for key, value in process_name_mapping.items():
-        if name_lower in [item.lower() for item in value]:
-            return key
-    return False
+    key = catalog_index.key_for(name)
+    return key if key is not None else False
 
 def get_process_name(friendly_name):
     """
@@ -563,7 +265,29 @@ def get_process_name(friendly_name):
     Returns:
         str: The process name for the given friendly name, or the original friendly name if no mapping is found.
     """
-    return friendly_name_mapping.get(friendly_name, friendly_name)
+    return catalog_index.key_for(friendly_name) or friendly_name
+
+def suggest_game(friendly_name):
+    """
+    Offers the closest game of the catalog for a name that was not found, allowing for typos.
+
+    The fuzzy index is built in the background at startup. Until it is ready, nothing is suggested.
+
+    Args:
+        friendly_name (str): The name entered by the user.
+
+    Returns:
+        str or None: The process name of the suggested game if the user accepted it, otherwise None.
+    """
+    suggestions = fuzzy_matcher.suggest(friendly_name, k=1)
+    if not suggestions:
+        return None
+    process_name = suggestions[0][0]
+    game_name = capitalize_first_letters(catalog_index.display_name(process_name))
+    logger.info(os.getenv("DEBUG_DID_YOU_MEAN") + " - " + friendly_name + " -> " + process_name) if os.getenv("DEBUG") == "true" else None
+    if messagebox.askyesno(os.getenv("WARNING"), os.getenv("DID_YOU_MEAN").replace("#game_name", game_name)):
+        return process_name
+    return None
 
 def get_friendly_name(process_name):
     """
@@ -577,202 +301,27 @@ def get_friendly_name(process_name):
         str: The friendly name for the given process name, or the original process name
         if no friendly name mapping is available.
     """
-    return friendly_name_mapping.get(process_name, process_name)
+    return catalog_index.key_for(process_name) or process_name
 
-def is_any_game_running(game_names):
+def _on_monitor_fatal(error):
     """
-    Checks if any of the specified games are currently running.
+    Shows the connection error and exits when the monitor cannot send its start message.
 
     Args:
-        game_names (list[str]): A list of game names to check.
-
-    Returns:
-        str or None: The name of the first game found to be running, or None if no games are running.
+        error (Exception): The error raised while sending the start message.
     """
-    running_processes = [proc.info['name'].lower() for proc in psutil.process_iter(['name'])]
-    for game_name in game_names:
-        if any(name.lower() in running_processes for name in game_name):
-            return game_name[0]
-    return None
-
-
-async def update_status(game_name, elapsed_time, games):
-    global start
-    global notification_usernames
-    global playing_game
-    global notification_message_text_global
-
-    if game_name:
-        log_game_start(game_name)
-    else:
-        for game in list(game_stats["daily"].keys()):
-            log_game_end(game)
-
-    if game_name is False and elapsed_time is False:
-        try:
-            await client(UpdateProfileRequest(about=default_bio))
-            playing_game = None
-        except Exception as e:
-            logger.warning(os.getenv("ERROR_UPDATE_DEFAULT_BIO"))
-            logger.critical(e) if os.getenv("DEBUG") == "true" else None
-
-        if not start:
-            start = True
-            text_start = ""
-            for item in games:
-                game_name2 = item[0]
-                friendly_game_name2 = get_friendly_name(game_name2)
-                process_name2 = find_process_name(friendly_game_name2)
-                if any(process_name2 is not False and key.lower() == process_name2.lower() for key in process_name_mapping):
-                    friendly_game_name2 = capitalize_first_letters(process_name_mapping[process_name2][0])
-                    text_start += friendly_game_name2.replace("`", "").replace("_", "").replace("*", "") + "\n"
-
-            if len(text_start) > 3800:
-                text_start = text_start[:3800] + "..."
-            try:
-                await client.send_message("me", (os.getenv("START_MESSAGE").replace("#local_version", local_version)) + text_start, parse_mode="Markdown")
-                logger.info(os.getenv("DEBUG_START")) if os.getenv("DEBUG") == "true" else None
-            except Exception as e:
-                await client.log_out()
-                messagebox.showerror(os.getenv("ERROR"), os.getenv("CANT_CONNECT"))
-                logger.warning(os.getenv("ERROR_START_MESSAGE")) if os.getenv("DEBUG") == "true" else None
-                logger.critical(e) if os.getenv("DEBUG") == "true" else None
-                return handle_exit(None, None)
-    else:
-        friendly_game_name = get_friendly_name(game_name)
-        friendly_game_name_cap = capitalize_first_letters(process_name_mapping[find_process_name(friendly_game_name)][0])
-
-        if not start:
-            start = True
-            text_start = ""
-            for item in games:
-                game_name2 = item[0]
-                friendly_game_name2 = get_friendly_name(game_name2)
-                process_name2 = find_process_name(friendly_game_name2)
-                if any(process_name2 is not False and key.lower() == process_name2.lower() for key in process_name_mapping):
-                    friendly_game_name2 = capitalize_first_letters(process_name_mapping[process_name2][0])
-                    text_start += friendly_game_name2.replace("`", "").replace("_", "").replace("*", "") + "\n"
-
-            if len(text_start) > 3800:
-                text_start = text_start[:3800] + "..."
-            try:
-                await client.send_message("me", (os.getenv("START_MESSAGE").replace("#local_version", local_version)) + text_start, parse_mode="Markdown")
-                logger.info(os.getenv("DEBUG_START")) if os.getenv("DEBUG") == "true" else None
-            except Exception as e:
-                await client.log_out()
-                messagebox.showerror(os.getenv("ERROR"), os.getenv("CANT_CONNECT"))
-                logger.warning(os.getenv("ERROR_START_MESSAGE")) if os.getenv("DEBUG") == "true" else None
-                logger.critical(e) if os.getenv("DEBUG") == "true" else None
-                return handle_exit(None, None)
-
-
-        action_emoji = ""
-
-        if elapsed_time < 10:
-            action_emoji = ACTION_EMOJI_LESS_10_MIN
-        elif 9 < elapsed_time < 60:
-            action_emoji = ACTION_EMOJI_10_TO_60_MIN
-        elif 59 < elapsed_time < 120:
-            action_emoji = ACTION_EMOJI_60_TO_120_MIN
-        else:
-            action_emoji = ACTION_EMOJI_MORE_120_MIN
-
-        new_status = (os.getenv("ACTION_STATUS").replace("#action_emoji", action_emoji).replace("#game_name", friendly_game_name_cap).replace("#elapsed_time", str(elapsed_time + 1))).replace(" (Steam)", "").replace(" (Non-Steam)", "").replace(" (x86)", "").replace(" (steam)", "").replace(" (non-steam)", "").replace(" (Retail)", "").replace(" (retail)", "").replace(" (Release)", "").replace(" (release)", "").replace(" (Dev)", "").replace(" (dev)", "").replace(" (x64)", "").replace(" (dx11)", "").replace(" (dx12)", "")
-        try:
-            await client(UpdateProfileRequest(about=new_status))
-            if playing_game != friendly_game_name_cap:
-                if notification_usernames:
-                    notification_message_template = notification_message_text_global.get("1.0", tk.END).strip()
-                    if not notification_message_template:
-                        notification_message_template = os.getenv("NOTIFICATION_MESSAGE")
-
-                    now = datetime.now()
-                    current_time_str = now.strftime("%H:%M")
-
-
-                    for username in notification_usernames:
-                        first_name = await get_first_name(username)
-                        if first_name != False:
-                            notification_message = notification_message_template.replace("#game_name", friendly_game_name_cap).replace("#name", first_name).replace("#time", current_time_str)
-                            try:
-                                await client.send_message(username, notification_message)
-                                logger.info(os.getenv("DEBUG_NOTIFICATION_SENT").replace("#name", first_name).replace("#game_name", friendly_game_name_cap)) if os.getenv("DEBUG") == "true" else None
-                            except Exception as e:
-                                logger.warning(os.getenv("ERROR_NOTIFICATION_FAILED").replace("#name", first_name).replace("#game_name", friendly_game_name_cap)) if os.getenv("DEBUG") == "true" else None
-                                logger.critical(e) if os.getenv("DEBUG") == "true" else None
-                        
-
-            playing_game = friendly_game_name_cap
-            logger.info(os.getenv("DEBUG_PLAYING") + friendly_game_name_cap + os.getenv("DEBUG_PLAYTIME") + str(elapsed_time + 1)) if os.getenv("DEBUG") == "true" else None
-        except Exception as e:
-            messagebox.showerror(os.getenv("ERROR"), os.getenv("TOO_LONG"))
-            logger.warning(os.getenv("TOO_LONG")) if os.getenv("DEBUG") == "true" else None
-            logger.critical(e) if os.getenv("DEBUG") == "true" else None
-            root.quit()
-            sys.exit()
-
-current_game = None
-
-async def main(games):
-    """
-    Continuously monitors a list of games and updates the status of the currently running game.
-    """
-    global current_game
-
-    for proc in psutil.process_iter(['name', 'exe', 'username']):
-        if proc.info['name'] == 'python.exe':
-            try:
-                proc.nice(psutil.IDLE_PRIORITY_CLASS)
-                logger.debug(os.getenv("DEBUG_SET_LOW_PRIORITY")) if os.getenv("DEBUG") == "true" else None
-                break
-            except:
-                False
-
-    start_time = None
-    check_interval = int(os.getenv("INTERVAL_TIME"))
-    while True:
-        try:
-            await client.connect()
-        except:
-            pass
-        game_name = is_any_game_running(games)
-        if game_name:
-            if current_game != game_name:
-                current_game_before_update = current_game
-                current_game = game_name
-                start_time = time.time()
-            elapsed_time = int((time.time() - start_time) / check_interval)
-            await update_status(game_name, elapsed_time, games)
-
-            cpu_usage = get_cpu_usage()
-            gpu_usage = get_gpu_usage()
-
-            if game_name in game_stats["daily"]:
-                game_stats["daily"][game_name]["avgCPUusage"] = cpu_usage if cpu_usage is not None else 1
-                game_stats["daily"][game_name]["avgGPUusage"] = gpu_usage if gpu_usage is not None else 1
-                _save_stats_to_file()
-
-        else:
-            current_game = None
-            await update_status(False, False, games)
-            start_time = None
-        try:
-            await client.disconnect()
-        except:
-            pass
-        await asyncio.sleep(check_interval)
-
+    messagebox.showerror(os.getenv("ERROR"), os.getenv("CANT_CONNECT"))
+    handle_exit(None, None)
 
 def start_monitoring(games):
     """
-    Starts the main event loop and creates a task to run the main application logic.
+    Starts the game monitor with the settings entered in the window and runs it forever.
 
     Args:
         games (list): A list of game objects to monitor.
     """
-    loop = asyncio.get_event_loop()
-    loop.create_task(main(games))
-    loop.run_forever()
+    monitor = GameMonitor(client, catalog_index, stats_store, default_bio, notification_usernames, settings.get("notification_message"), local_version, on_fatal=_on_monitor_fatal)
+    monitor.run(games)
 
 def add_game(event=None):
     """
@@ -795,9 +344,13 @@ def add_game(event=None):
             return
         findgame = find_process_name(process_names)
         if findgame == False:
-            logger.debug(os.getenv("NOT_IN_DATABASE") + " - " + process_names) if os.getenv("DEBUG") == "true" else None
-            return messagebox.showwarning(os.getenv("WARNING"), os.getenv("NOT_IN_DATABASE"))
-        added_games.append(process_names)
+            process_names = suggest_game(friendly_name)
+            if process_names is None:
+                logger.debug(os.getenv("NOT_IN_DATABASE") + " - " + friendly_name) if os.getenv("DEBUG") == "true" else None
+                return messagebox.showwarning(os.getenv("WARNING"), os.getenv("NOT_IN_DATABASE"))
+            if process_names in added_games:
+                return messagebox.showerror(os.getenv("ERROR"), os.getenv("ALREADY_ADDED"))
+        added_games.add(process_names)
         games_listbox.insert(tk.END, process_names)
         game_entry.delete(0, tk.END)
         logger.info(os.getenv("DEBUG_GAME_ADDED") + " - " + process_names) if os.getenv("DEBUG") == "true" else None
@@ -807,7 +360,7 @@ def add_game(event=None):
 
 def remove_game(arg=None):
     """
-    Removes the selected game from the games_listbox and the added_games list.
+    Removes the selected game from the games_listbox and the added_games set.
 
     If no game is selected, displays a warning message.
     """
@@ -816,7 +369,7 @@ def remove_game(arg=None):
         game_to_remove = games_listbox.get(selected_game)
         games_listbox.delete(selected_game)
         if game_to_remove in added_games:
-            added_games.remove(game_to_remove)
+            added_games.discard(game_to_remove)
             logger.info(os.getenv("DEBUG_GAME_REMOVED") + " - " + game_to_remove) if os.getenv("DEBUG") == "true" else None
     else:
         messagebox.showwarning(os.getenv("WARNING"), os.getenv("SELECT_GAME_TO_DEL"))
@@ -833,7 +386,6 @@ def start_button_click():
     if games:
         global default_bio
         global notification_usernames
-        global notification_message_text_global
 
         default_bio = default_bio_text.get("1.0", tk.END).strip()
         if len(default_bio) > 70:
@@ -842,17 +394,18 @@ def start_button_click():
             return
 
         usernames_str = notification_usernames_entry.get()
+        notification_message_text_global_str = notification_message_text.get("1.0", tk.END).strip()
         if usernames_str != os.getenv("NOTIFICATION_USERNAMES_PLACEHOLDER"):
             notification_usernames = [uname.strip() for uname in usernames_str.replace(',', ' ').split() if uname.strip()]
-            notification_message_text_global_str = notification_message_text.get("1.0", tk.END).strip()
-            game_stats["notification_usernames"] = notification_usernames
+            settings["notification_usernames"] = notification_usernames
 
         try:
-            game_stats["default_bio"] = default_bio
-            game_stats["notification_message"] = notification_message_text_global_str
+            settings["default_bio"] = default_bio
+            settings["notification_message"] = notification_message_text_global_str
+            settings["watched_games"] = [game[0] for game in games]
         except:
             pass
-        _save_stats_to_file()
+        _save_settings()
 
 
         messagebox.showinfo(os.getenv("STARTED"), os.getenv("STARTED_MESSAGE"))
@@ -886,7 +439,7 @@ def add_game_to_list(process_name, list_window):
             return
         else:
             logger.info(os.getenv("DEBUG_GAME_ADDED") + " - " + process_name) if os.getenv("DEBUG") == "true" else None
-            added_games.append(process_name)
+            added_games.add(process_name)
             games_listbox.insert(tk.END, process_name)
             list_window.destroy()
 
@@ -921,7 +474,7 @@ def add_placeholder(entry, placeholder):
 
 def remove_all_games():
     """
-    Removes all games from the games_listbox and the added_games list.
+    Removes all games from the games_listbox and the added_games set.
     If there are no games in the list, it shows a toast message.
     """
     if not games_listbox.size():
@@ -933,6 +486,8 @@ def remove_all_games():
         show_toast(os.getenv("DEBUG_ALL_GAMES_REMOVED"))
         logger.info(os.getenv("DEBUG_ALL_GAMES_REMOVED")) if os.getenv("DEBUG") == "true" else None
 
+SEARCH_DEBOUNCE_MS = 150
+
 def show_list():
     """
     Displays a list of games in a separate window, allowing the user to search and add games to a list.
@@ -940,65 +495,73 @@ def show_list():
     The `show_list()` function creates a new window with a list of games, a search field, and buttons to add selected games to a list and close the window.
 
     The list of games is retrieved from the `process_name_mapping` dictionary, which maps game names to their corresponding process names. The list is filtered based on the user's search input, and the matching games are displayed in a listbox.
+    The display strings and the trigram index of the catalog are built once at startup (see search.py), the search runs once the user stops typing for SEARCH_DEBOUNCE_MS,
+    and the listbox only renders its visible rows (see virtual_list.py), so the window stays responsive with very large catalogs.
 
-    When the user selects a game from the listbox and presses the "Add" button, the selected game is added to the `added_games` list and displayed in the main application's games listbox.
+    When the user selects a game from the listbox and presses the "Add" button, the selected game is added to the `added_games` set and displayed in the main application's games listbox.
     """
-    def filter_list(event):
+    index = game_search_index
+    pending_filter = None
+
+    def refresh_list():
         """
-        Filters the listbox display based on the search term entered by the user.
+        Shows the games matching the search term, except the ones already added.
+        """
+        search_term = search_var.get().lower()
+        if search_term == os.getenv("FRAME_HINT_PLACEHOLDER").lower():
+            search_term = ""
+        logger.debug(os.getenv("DEBUG_SEARCH_QUERY") + " - " + search_term) if (os.getenv("DEBUG") == "true" and search_term) else None
+        matches = index.search(search_term)
+        if added_games:
+            matches = [i for i in matches if index.keys[i] not in added_games]
+        listbox.set_items(matches, index.displays.__getitem__)
 
-        This function is called whenever the user types into the search box. It updates the listbox to only display items that match the search term, either in the key (game name) or the process name mapping.
+    def filter_list(event):
+        """
+        Schedules the search when the user types into the search box, replacing the search scheduled by the previous keystroke.
 
         Args:
             event (tkinter.Event): The event object passed to the function by the Tkinter event handler.
         """
-        search_term = search_var.get().lower()
-        if search_term == os.getenv("FRAME_HINT_PLACEHOLDER").lower():
-            search_term = None
-        listbox.delete(0, tk.END)
-        logger.debug(os.getenv("DEBUG_SEARCH_QUERY") + " - " + search_term) if (os.getenv("DEBUG") == "true" and search_term is not None) else None
-        for key in sorted_keys:
-            if key in added_games:
-                continue
-            if not search_term or search_term in key.lower() or search_term in process_name_mapping[key][0].lower():
-                display_text = f"{capitalize_first_letters(process_name_mapping[key][0])} :: {key}"
-                listbox.insert(tk.END, display_text)
-
-
-    def add_on_double_click(event):
+        nonlocal pending_filter
+        if pending_filter is not None:
+            list_window.after_cancel(pending_filter)
+        pending_filter = list_window.after(SEARCH_DEBOUNCE_MS, run_filter)
+
+    def run_filter():
+        nonlocal pending_filter
+        pending_filter = None
+        refresh_list()
+
+    def add_to_list(arg=None):
         """
-        Adds the double-clicked game from the listbox to the list of added games, and updates the games listbox accordingly.
+        Adds the selected game from the listbox to the list of added games, and updates the games listbox accordingly.
+
+        Args:
+            arg (Optional[Any]): Unused argument, required for the Tkinter event handler.
         """
-        try:
-            selected_game = listbox.get(listbox.curselection())
-        except:
-            return;
-        if selected_game:
-            try:
-                selected_game = selected_game.split(":: ")[1]
-            except:
-                return
-
-            if selected_game in added_games:
-                logger.debug(os.getenv("DEBUG_ALREADY_ADDED") + " - " + selected_game) if os.getenv("DEBUG") == "true" else None
-                messagebox.showerror(os.getenv("ERROR"), os.getenv("ALREADY_ADDED"))
-                return
-            else:
-                logger.info(os.getenv("DEBUG_GAME_ADDED") + " - " + selected_game) if os.getenv("DEBUG") == "true" else None
-                added_games.append(selected_game)
-                games_listbox.insert(tk.END, selected_game)
-                listbox.selection_clear(0, tk.END)
-                filter_list(None)
+        position = listbox.selected_item()
+        if position is None:
+            return
+        selected_game = index.keys[position]
+        if selected_game in added_games:
+            logger.debug(os.getenv("DEBUG_ALREADY_ADDED") + " - " + selected_game) if os.getenv("DEBUG") == "true" else None
+            messagebox.showerror(os.getenv("ERROR"), os.getenv("ALREADY_ADDED"))
+            return
+        logger.info(os.getenv("DEBUG_GAME_ADDED") + " - " + selected_game) if os.getenv("DEBUG") == "true" else None
+        added_games.add(selected_game)
+        games_listbox.insert(tk.END, selected_game)
+        refresh_list()
 
     def add_all_games():
         """
-        Adds all games from the process_name_mapping to the added_games list and the games_listbox.
+        Adds all games from the process_name_mapping to the added_games set and the games_listbox.
         """
-        for game in sorted_keys:
-            if game not in added_games:
-                added_games.append(game)
-                games_listbox.insert(tk.END, game)
-        logger.debug(os.getenv("DEBUG_ALL_GAMES") + " - " + str(len(sorted_keys))) if os.getenv("DEBUG") == "true" else None
+        new_games = [game for game in index.keys if game not in added_games]
+        added_games.update(new_games)
+        if new_games:
+            games_listbox.insert(tk.END, *new_games)
+        logger.debug(os.getenv("DEBUG_ALL_GAMES") + " - " + str(len(index))) if os.getenv("DEBUG") == "true" else None
         list_window.destroy()
 
     list_window = tk.Toplevel(root)
@@ -1019,51 +582,12 @@ def show_list():
     label = tk.Label(list_frame, text=label_Text_Found_Games, font=(poppins_font, 12))
     label.grid(row=1, column=0, columnspan=2, pady=10)
 
-    listbox = tk.Listbox(list_frame, width=60, height=20, selectmode=tk.SINGLE, cursor="hand2")
+    listbox = VirtualList(list_frame, rows=20, width=60, cursor="hand2")
     listbox.grid(row=2, column=0, columnspan=2, pady=10)
-
-    unique_keys = set()
-    sorted_keys = sorted(process_name_mapping.keys())
-
-    for key in sorted_keys:
-        if key in added_games:
-            continue
-        if key not in unique_keys:
-            unique_keys.add(key)
-            display_text = f"{capitalize_first_letters(process_name_mapping[key][0])} :: {key}"
-            listbox.insert(tk.END, display_text)
-
-
-    def add_to_list(arg=None):
-        """
-        Adds the selected game from the listbox to the list of added games, and updates the games listbox accordingly.
-
-        Args:
-            arg (Optional[Any]): Unused argument, required for the Tkinter event handler.
-
-        Raises:
-            None
-        """
-        selected_game = listbox.get(tk.ANCHOR)
-        if selected_game:
-            try:
-                selected_game = selected_game.split(":: ")[1]
-            except:
-                return
-
-            if selected_game in added_games:
-                logger.debug(os.getenv("DEBUG_ALREADY_ADDED") + " - " + selected_game) if os.getenv("DEBUG") == "true" else None
-                messagebox.showerror(os.getenv("ERROR"), os.getenv("ALREADY_ADDED"))
-                return
-            else:
-                logger.info(os.getenv("DEBUG_GAME_ADDED") + " - " + selected_game) if os.getenv("DEBUG") == "true" else None
-                added_games.append(selected_game)
-                games_listbox.insert(tk.END, selected_game)
-                listbox.selection_clear(0, tk.END)
-                filter_list(None)
+    refresh_list()
 
     listbox.bind("<Return>", add_to_list)
-    listbox.bind("<Double-1>", add_on_double_click)
+    listbox.bind("<Double-1>", add_to_list)
     add_button = tk.Button(list_frame, text=os.getenv("ADD"), command=add_to_list, cursor="hand2")
     add_button.grid(row=3, column=0, padx=10, pady=10)
 
@@ -1102,8 +626,8 @@ def change_theme():
     toggle_debug_mode(True)
     toggle_hint_mode(True)
 
-    game_stats["theme"] = theme
-    _save_stats_to_file()
+    settings["theme"] = theme
+    _save_settings()
 
 
 toast_window = None
@@ -1158,12 +682,13 @@ if current_os != 'windows' and current_os != 'linux':
     logger.critical(os.getenv("UNSUPPORTED_OS"))
     handle_exit(None, None)
 
-if current_os == "windows":
-    mapping_file_path = os.getenv("GAME_DATA_JSON_WINDOWS")
-elif current_os == "linux":
-    mapping_file_path = os.getenv("GAME_DATA_JSON_LINUX")
+mapping_file_path = mapping_file_for_os(current_os)
 
-process_name_mapping = load_process_mapping(mapping_file_path)
+catalog_index = load_process_mapping(mapping_file_path)
+process_name_mapping = catalog_index.mapping
+game_search_index = GameSearchIndex(process_name_mapping, background=True)
+fuzzy_matcher = FuzzyMatcher(catalog_index, background=True)
+startup_timer.mark("catalog")
 
 """
 Initializes a Telegram client and starts the client session.
@@ -1175,20 +700,13 @@ The client session is required for making API calls to Telegram, such as sending
 client = TelegramClient(os.getenv("SESSION_NAME"), int(api_id), api_hash)
 client.start()
 
-"""
-Builds a mapping of friendly names to process names by converting all process names to lowercase and creating a dictionary that maps each friendly name to its corresponding process name.
-
-The `process_name_mapping` dictionary is used to store the mapping of process names to their friendly names. The `friendly_name_mapping` dictionary is then created by iterating over the `process_name_mapping` and creating a new dictionary that maps each friendly name to its corresponding process name.
-"""
-for key, value in process_name_mapping.items():
-    process_name_mapping[key] = [name.lower() for name in value]
-friendly_name_mapping = {name: process_name for process_name, names in process_name_mapping.items() for name in names}
-
 loop = asyncio.get_event_loop()
 loop.run_until_complete(print_me())
+startup_timer.mark("telegram")
 
 root = tk.Tk()
 root.title(f"{os.getenv('APP_TITLE')} v{local_version}")
+from PIL import Image, ImageTk
 icon_image = Image.open(str(app_icon))
 icon_image = icon_image.convert('RGBA')
 icon = ImageTk.PhotoImage(icon_image)
@@ -1278,7 +796,6 @@ notification_message_label.grid(row=7, column=0, sticky="nw", padx=5, pady=5)
 notification_message_text = tk.Text(frame, width=50, height=3, font=(poppins_font, 12), cursor="xterm")
 notification_message_text.insert(tk.END, notification_message_text_global_str)
 notification_message_text.grid(row=7, column=1, columnspan=3, padx=5, pady=5)
-notification_message_text_global = notification_message_text
 
 notification_variables_label = tk.Label(frame, text=os.getenv("NOTIFICATION_VARIABLES_LABEL"), font=(poppins_font, 10), justify=tk.LEFT)
 notification_variables_label.grid(row=8, column=1, columnspan=3, sticky="nw", padx=5, pady=0)
@@ -1303,8 +820,8 @@ if os.getenv("DEBUG") == "true":
 if os.getenv("HINTS") == "true":
     hint_mode_var.set(True)
 
-if "theme" in game_stats:
-    if game_stats["theme"] == 1:
+if "theme" in settings:
+    if settings["theme"] == 1:
         change_theme()
 
 
@@ -1364,14 +881,32 @@ emoji_font2 = tkfont.Font(family="Noto Color Emoji", size=12)
 default_bio_text.configure(font=emoji_font)
 default_bio_text.configure(font=emoji_font2)
 
-latest_version = get_latest_version()
+def check_for_update():
+    """
+    Displays a warning message to the user if a newer version of the application is available.
 
-"""
-Displays a warning message to the user if a newer version of the application is available.
+    The message includes the latest version number and the current version number, and is displayed using the Tkinter messagebox.showwarning() function.
+    The version is checked in a background thread with a short timeout and a disk cache (see version_check.py). The window
+    polls the result and shows the message once the check completes, so a slow network never blocks the UI.
+    """
+    future = check_in_background(VersionCache(VERSION_CACHE_FILE))
 
-The message includes the latest version number and the current version number, and is displayed using the Tkinter messagebox.showwarning() function.
-"""
-if latest_version["version"] != "" and local_version and str(latest_version["version"]) != str(local_version):
-    messagebox.showwarning(os.getenv("UPDATE_AVAILABLE"), os.getenv("UPDATE_AVAILABLE_MESSAGE").replace("#latest_version", latest_version["version"]).replace("#current_version", local_version).replace("#update_message", latest_version["message"]))
+    def show_result():
+        global latest_version
+        if not future.done():
+            try:
+                root.after(200, show_result)
+            except tk.TclError:
+                pass
+            return
+        latest_version = future.result()
+        if is_newer(latest_version, local_version):
+            messagebox.showwarning(os.getenv("UPDATE_AVAILABLE"), os.getenv("UPDATE_AVAILABLE_MESSAGE").replace("#latest_version", latest_version["version"]).replace("#current_version", local_version).replace("#update_message", latest_version["message"]))
+
+    show_result()
+
+check_for_update()
+startup_timer.mark("window")
+startup_timer.report()
 
 root.mainloop()
\ No newline at end of file
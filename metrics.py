@@ -0,0 +1,323 @@
+"""
+Metrics of the running monitor, in the Prometheus text format.
+
+Every tick of the monitor records how long the process scan and the stats flush took, and
+how much later than planned the loop woke up. The request scheduler records the round trip
+time of every Telegram call by method. Counters track the bio updates that were sent or
+suppressed and the errors, and the reconnections and FloodWait pauses are read from the
+connection manager and the request scheduler.
+
+The metrics can be served on a local HTTP endpoint (METRICS_PORT, bound to 127.0.0.1 only)
+and written periodically to a snapshot file (METRICS_SNAPSHOT_FILE) in the same format, which
+the node_exporter textfile collector picks up. Both are disabled unless configured.
+"""
+
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+PREFIX = "telegram_activity_"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HISTOGRAMS = {
+    "tick_seconds": "Duration of a monitor tick.",
+    "scan_seconds": "Duration of the process scan of a tick.",
+    "stats_flush_seconds": "Duration of a stats journal flush.",
+    "sleep_drift_seconds": "How much later than planned the monitor woke up between two ticks.",
+    "telegram_rtt_seconds": "Round trip time of the Telegram calls, by method.",
+}
+COUNTERS = {
+    "ticks_total": "Monitor ticks.",
+    "bio_updates_total": "Bio updates queued for Telegram.",
+    "bio_updates_suppressed_total": "Bio refreshes skipped because the bio did not change.",
+    "errors_total": "Errors, by kind.",
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values.
+
+    Args:
+        buckets (tuple[float]): The upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """
+        Records a value.
+
+        Args:
+            value (float): The observed value.
+        """
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """
+        Returns the cumulative bucket counts.
+
+        Returns:
+            list[tuple[float, int]]: The upper bound and the number of values below it, ending with +Inf.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float("inf"), self.count))
+        return result
+
+
+class MonitorMetrics:
+    """
+    Registry of the monitor metrics.
+
+    Args:
+        snapshot_file (str, optional): The file the metrics are written to. Disabled if None.
+        snapshot_interval (float): Seconds between two snapshots.
+        port (int, optional): The port of the local metrics endpoint. Disabled if None.
+    """
+
+    def __init__(self, snapshot_file=None, snapshot_interval=60, port=None):
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self.port = port
+        self.connection_manager = None
+        self.request_scheduler = None
+        self._histograms = {name: {} for name in HISTOGRAMS}
+        self._counters = {name: {} for name in COUNTERS}
+        self._lock = threading.Lock()
+        self._last_snapshot = None
+        self._server = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Creates the metrics from the METRICS_PORT, METRICS_SNAPSHOT_FILE and METRICS_SNAPSHOT_INTERVAL
+        environment variables. The endpoint and the snapshot file are disabled when they are empty.
+
+        Returns:
+            MonitorMetrics: The metrics.
+        """
+        port = os.getenv("METRICS_PORT")
+        interval = os.getenv("METRICS_SNAPSHOT_INTERVAL")
+        return cls(
+            snapshot_file=os.getenv("METRICS_SNAPSHOT_FILE") or None,
+            snapshot_interval=float(interval) if interval else 60,
+            port=int(port) if port else None,
+        )
+
+    def attach(self, connection_manager=None, request_scheduler=None):
+        """
+        Reports the counters of the connection manager and the request scheduler along with the metrics.
+
+        Args:
+            connection_manager (ConnectionManager, optional): The Telegram connection.
+            request_scheduler (RequestScheduler, optional): The Telegram request scheduler.
+        """
+        self.connection_manager = connection_manager
+        self.request_scheduler = request_scheduler
+
+    def observe(self, name, value, **labels):
+        """
+        Records a value in a histogram.
+
+        Args:
+            name (str): The histogram, one of `HISTOGRAMS`.
+            value (float): The observed value, in seconds.
+            **labels: The labels of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The counter, one of `COUNTERS`.
+            amount (int): The increment.
+            **labels: The labels of the series.
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def timer(self, name, **labels):
+        """
+        Returns a context manager recording its duration in a histogram.
+
+        Args:
+            name (str): The histogram, one of `HISTOGRAMS`.
+            **labels: The labels of the series.
+
+        Returns:
+            contextlib.AbstractContextManager: The timer.
+        """
+        return _Timer(self, name, labels)
+
+    def _collected(self):
+        """Returns the counters read from the attached connection manager and request scheduler."""
+        collected = []
+        if self.connection_manager is not None:
+            stats = self.connection_manager.stats()
+            collected += [
+                ("reconnects_total", "counter", "Telegram reconnections.", (), stats["reconnects"]),
+                ("connection_failures_total", "counter", "Failed Telegram connection attempts.", (), stats["failed_attempts"]),
+                ("health_check_failures_total", "counter", "Failed Telegram health checks.", (), stats["failed_health_checks"]),
+                ("connected", "gauge", "1 while the Telegram connection is open.", (), int(stats["state"] == "connected")),
+            ]
+        if self.request_scheduler is not None:
+            stats = self.request_scheduler.stats()
+            collected += [("telegram_requests_total", "counter", "Telegram calls sent, by method.", (("method", method),), count) for method, count in sorted(stats["sent"].items())]
+            collected += [
+                ("telegram_queued_requests", "gauge", "Telegram calls waiting in the scheduler.", (), stats["queued"]),
+                ("flood_waits_total", "counter", "FloodWait errors returned by Telegram.", (), stats["flood_waits"]),
+                ("bio_updates_coalesced_total", "counter", "Queued bio updates replaced by a newer one.", (), stats["coalesced"]),
+            ]
+        return collected
+
+    def render(self):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+        with self._lock:
+            for name, help_text in COUNTERS.items():
+                lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} counter"]
+                series = self._counters[name] or ({(): 0} if name != "errors_total" else {})
+                lines += [f"{PREFIX}{name}{_labels(key)} {_number(value)}" for key, value in sorted(series.items())]
+            for name, help_text in HISTOGRAMS.items():
+                lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} histogram"]
+                for key, histogram in sorted(self._histograms[name].items()):
+                    lines += [f"{PREFIX}{name}_bucket{_labels(key, [('le', _number(bound))])} {count}" for bound, count in histogram.cumulative()]
+                    lines += [f"{PREFIX}{name}_sum{_labels(key)} {_number(histogram.sum)}", f"{PREFIX}{name}_count{_labels(key)} {histogram.count}"]
+
+        described = set()
+        for name, kind, help_text, labels, value in self._collected():
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}"]
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot_due(self):
+        """
+        Checks if the snapshot file should be written.
+
+        Returns:
+            bool: True if a snapshot file is configured and `snapshot_interval` has passed since the last one.
+        """
+        return self.snapshot_file is not None and (self._last_snapshot is None or time.monotonic() - self._last_snapshot >= self.snapshot_interval)
+
+    def write_snapshot(self):
+        """Replaces the snapshot file atomically with the current metrics."""
+        self._last_snapshot = time.monotonic()
+        temp_path = self.snapshot_file + ".tmp"
+        with open(temp_path, 'w') as file:
+            file.write(self.render())
+        os.replace(temp_path, self.snapshot_file)
+
+    def start_server(self):
+        """
+        Serves the metrics on http://127.0.0.1:<port>/metrics from a background thread, if a port is set.
+
+        Returns:
+            bool: True if the endpoint is running.
+        """
+        if self.port is None:
+            return False
+        if self._server is None:
+            metrics = self
+
+            class Handler(MetricsHandler):
+                registry = metrics
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        return True
+
+    def stop_server(self):
+        """Stops the metrics endpoint."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.monotonic() - self.start, **self.labels)
+        return False
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics with the metrics of `registry`."""
+
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
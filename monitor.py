@@ -0,0 +1,514 @@
+"""
+The game monitor, without any user interface.
+
+This module holds everything the monitoring loop needs: the logging setup, the catalog
+loading, the session journal, the bio updates and the notifications. It never imports
+tkinter, PIL, sv_ttk or matplotlib, so the same loop runs behind the GUI (gui.py) and in
+the headless daemon (daemon.py).
+"""
+
+
+import asyncio
+import logging
+import os
+import platform
+import sys
+from datetime import datetime
+
+import psutil
+from telethon.errors import AboutTooLongError
+
+from catalog import capitalize_first_letters, load_catalog
+from connection import ConnectionManager
+from detector import ProcessDetector
+from gpu_sampler import GPUSampler, select_backend
+from metrics import MonitorMetrics
+from notifier import EntityCache, send_notifications
+from polling import PollScheduler
+from scheduler import RequestScheduler
+from sessions import SessionTracker
+from status import StatusRenderer
+
+
+logger = logging.getLogger(__name__)
+
+
+def setup_logging(log_file='./debug/debug.log'):
+    """
+    Configures the logging system for the application.
+
+    Adds a console handler and a file handler to the root logger, both using a common formatter that includes the timestamp, log level, and log message.
+    The helper modules (connection, scheduler, ...) log through the root logger at the INFO level, the monitor logs at the DEBUG level, and Telethon is limited to warnings.
+
+    Args:
+        log_file (str): The path of the log file.
+    """
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setLevel(logging.DEBUG)
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    console_handler.setFormatter(formatter)
+    file_handler.setFormatter(formatter)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(console_handler)
+    root_logger.addHandler(file_handler)
+    logging.getLogger("telethon").setLevel(logging.WARNING)
+    logger.setLevel(logging.DEBUG)
+
+
+def is_supported_os():
+    """
+    Returns the current system platform as a lowercase string.
+
+    This function checks the current system platform and returns it as a lowercase string. If the DEBUG environment variable is set to "true", it will also log the system platform to the logger.
+
+    Returns:
+        str: The current system platform as a lowercase string.
+    """
+    system = platform.system().lower()
+    logger.info(os.getenv("DEBUG_SYSTEM") + system) if os.getenv("DEBUG") == "true" else None
+    return system
+
+
+def mapping_file_for_os(system):
+    """
+    Returns the path of the game catalog for the given platform.
+
+    Args:
+        system (str): The platform, as returned by `is_supported_os`.
+
+    Returns:
+        str or None: The catalog path from the environment, or None if the platform is not supported.
+    """
+    if system == "windows":
+        return os.getenv("GAME_DATA_JSON_WINDOWS")
+    if system == "linux":
+        return os.getenv("GAME_DATA_JSON_LINUX")
+    return None
+
+
+def load_process_mapping(file_path):
+    """
+    The function `load_process_mapping` reads the JSON file from the specified file path and builds the catalog index once.
+
+    :param file_path: The `file_path` parameter in the `load_process_mapping` function is a string that
+    represents the path to the file containing the process mapping data that you want to load and
+    process.
+    :return: A `CatalogIndex` whose `mapping` attribute holds the normalized catalog and which resolves
+    every alias and executable name to its canonical key with a single lookup. Aliases shared by several
+    games are logged in debug mode.
+    """
+    index = load_catalog(file_path)
+    if os.getenv("DEBUG") == "true":
+        for alias, keys in index.collisions.items():
+            logger.warning(f"Alias collision: '{alias}' -> {', '.join(keys)} (using {index.key_for(alias)})")
+    return index
+
+
+def _exit_on_fatal(error):
+    logger.critical(os.getenv("CANT_CONNECT"))
+    sys.exit(1)
+
+
+class GameMonitor:
+    """
+    Watches the games, keeps the Telegram bio up to date and records the sessions.
+
+    Args:
+        client (TelegramClient): The started Telegram client.
+        catalog_index (CatalogIndex): The game catalog.
+        stats_store (StatsStore): The stats journal the sessions and samples are recorded in.
+        default_bio (str): The bio shown while no game is running.
+        notification_usernames (list[str]): The users to notify when a game starts.
+        notification_message (str, optional): The notification template. Defaults to NOTIFICATION_MESSAGE.
+        local_version (str): The application version, shown in the start message.
+        entity_cache_file (str, optional): The path of the entity cache. Defaults to entity_cache.json next to the stats file.
+        on_fatal (callable, optional): Called with the exception when the start message cannot be sent.
+            Defaults to logging the error and exiting with status 1.
+        poll_scheduler (PollScheduler, optional): Chooses the poll delays and the refresh cadence.
+            Defaults to `PollScheduler.from_env()`.
+        session_tracker (SessionTracker, optional): Times the running games and chooses the one shown in
+            the bio. Defaults to `SessionTracker.from_env()`.
+        metrics (MonitorMetrics, optional): Records the tick timings and counters. Defaults to
+            `MonitorMetrics.from_env()`.
+    """
+
+    def __init__(self, client, catalog_index, stats_store, default_bio, notification_usernames=(), notification_message=None, local_version="", entity_cache_file=None, on_fatal=None, poll_scheduler=None, session_tracker=None, metrics=None):
+        self.client = client
+        self.catalog_index = catalog_index
+        self.stats_store = stats_store
+        self.default_bio = default_bio
+        self.notification_usernames = list(notification_usernames)
+        self.notification_message = notification_message
+        self.local_version = local_version or ""
+        self.on_fatal = on_fatal or _exit_on_fatal
+        if entity_cache_file is None:
+            entity_cache_file = os.path.join(os.path.dirname(os.path.abspath(stats_store.stats_path)), "entity_cache.json")
+
+        self.metrics = metrics or MonitorMetrics.from_env()
+        self.connection_manager = ConnectionManager(client, metrics=self.metrics)
+        self.request_scheduler = RequestScheduler(client, metrics=self.metrics)
+        self.metrics.attach(self.connection_manager, self.request_scheduler)
+        self.entity_cache = EntityCache(entity_cache_file)
+        self.process_detector = ProcessDetector()
+        self.status_renderer = StatusRenderer(os.getenv("ACTION_STATUS"), (os.getenv("ACTION_EMOJI_LESS_10_MIN"), os.getenv("ACTION_EMOJI_10_TO_60_MIN"), os.getenv("ACTION_EMOJI_60_TO_120_MIN"), os.getenv("ACTION_EMOJI_MORE_120_MIN")))
+        self.gpu_sampler = GPUSampler(select_backend())
+        self.poll_scheduler = poll_scheduler or PollScheduler.from_env()
+        self.session_tracker = session_tracker or SessionTracker.from_env(resolve=catalog_index.key_for)
+        self.open_sessions = set()
+        self.notification_tasks = set()
+        self.started = False
+        self.playing_game = None
+        self.current_game = None
+
+    def display_name(self, game_name):
+        """
+        Returns the capitalized display name of a game, as shown in the bio and the messages.
+
+        Args:
+            game_name (str): A game key, alias or executable name.
+
+        Returns:
+            str or None: The display name, or None if the game is not in the catalog.
+        """
+        key = self.catalog_index.key_for(game_name)
+        if key is None:
+            return None
+        return capitalize_first_letters(self.catalog_index.display_name(key))
+
+    def get_gpu_usage(self):
+        """
+        Gets the latest GPU usage published by the background GPU sampler, without blocking.
+
+        Returns:
+            float or None: The GPU usage as a percentage, or None if no GPU usage is available.
+        """
+        return self.gpu_sampler.latest(max_age=self.gpu_sampler.interval * 3)
+
+    def is_any_game_running(self, game_names):
+        """
+        Checks if any of the specified games are currently running.
+
+        Args:
+            game_names (list[str]): A list of game names to check.
+
+        Returns:
+            str or None: The name of the first game found to be running, or None if no games are running.
+        """
+        self.process_detector.set_games(game_names)
+        return self.process_detector.first_running_game()
+
+    def running_games(self, game_names):
+        """
+        Finds all the specified games that are currently running, with a single scan of the processes.
+
+        Args:
+            game_names (list[tuple[str]]): The watched games.
+
+        Returns:
+            list[str]: The keys of the running games, in the order of the game list.
+        """
+        self.process_detector.set_games(game_names)
+        return self.process_detector.scan_running_games()
+
+    def log_game_start(self, game_name):
+        """
+        Logs the start of a game session in the stats journal.
+
+        Args:
+            game_name (str): The name of the game being played.
+
+        Notes:
+            Nothing is recorded while the session of this game is already open.
+            Each session gets its own resource aggregator, see `StatsStore.apply`.
+        """
+        if game_name in self.open_sessions:
+            return
+        self.open_sessions.add(game_name)
+        self.stats_store.append("start", game_name)
+
+    def log_game_end(self, game_name, elapsed):
+        """
+        Logs the end of a game session in the stats journal.
+
+        Args:
+            game_name (str): The name of the game being played.
+            elapsed (float): The length of the session in seconds, from its monotonic `SessionClock`,
+                so that clock changes (NTP, DST) do not corrupt the recorded duration.
+
+        Notes:
+            Nothing is recorded if no session of this game is open.
+            The total duration of all sessions for the game is incremented by the duration of this session.
+        """
+        if game_name not in self.open_sessions:
+            return
+        self.open_sessions.discard(game_name)
+        games = self.stats_store.stats["games"]
+        if game_name in games:
+            self.stats_store.append("end", game_name, duration=elapsed / 60)
+            self.flush_stats()
+
+    def end_sessions(self):
+        """
+        Ends the sessions of the games still running, e.g. when the monitor shuts down, and writes the
+        stats journal right away.
+        """
+        _, ended = self.session_tracker.update([])
+        for game_name in ended:
+            self.log_game_end(game_name, self.session_tracker.ended_elapsed[game_name])
+        self.stats_store.flush(force=True)
+
+    def flush_stats(self):
+        """Flushes the stats journal, recording how long it took."""
+        with self.metrics.timer("stats_flush_seconds"):
+            self.stats_store.flush()
+
+    def queue_bio_update(self, about, error_message):
+        """
+        Queues a bio update on the request scheduler without waiting for it to be sent.
+
+        The bio is recorded as sent right away so that identical bios are not queued again. If the
+        update fails, the record is cleared so that the next tick retries it, except when the bio is
+        too long, which would fail again.
+
+        Args:
+            about (str): The new bio.
+            error_message (str): The name of the environment variable holding the warning to log on failure.
+        """
+        def on_done(future):
+            if future.cancelled():
+                return
+            e = future.exception()
+            if e is None:
+                return
+            self.metrics.inc("errors_total", kind="bio_update")
+            if isinstance(e, AboutTooLongError):
+                logger.warning(os.getenv("TOO_LONG") + " - " + about)
+            else:
+                logger.warning(os.getenv(error_message))
+                if self.status_renderer.last_sent == about:
+                    self.status_renderer.reset()
+            logger.critical(e) if os.getenv("DEBUG") == "true" else None
+
+        self.request_scheduler.update_profile(about).add_done_callback(on_done)
+        self.status_renderer.mark_sent(about)
+        self.metrics.inc("bio_updates_total")
+
+    async def send_start_message(self, games):
+        """
+        Sends the list of the watched games to the Saved Messages once, when the monitoring starts.
+
+        If the message cannot be sent, the session is logged out and `on_fatal` is called.
+
+        Args:
+            games (list[tuple[str]]): The watched games.
+
+        Returns:
+            bool: False if the message could not be sent.
+        """
+        if self.started:
+            return True
+        self.started = True
+        text_start = ""
+        for item in games:
+            display_name = self.display_name(item[0])
+            if display_name is not None:
+                text_start += display_name.replace("`", "").replace("_", "").replace("*", "") + "\n"
+
+        if len(text_start) > 3800:
+            text_start = text_start[:3800] + "..."
+        try:
+            await self.request_scheduler.send_message("me", (os.getenv("START_MESSAGE").replace("#local_version", self.local_version)) + text_start, parse_mode="Markdown")
+            logger.info(os.getenv("DEBUG_START")) if os.getenv("DEBUG") == "true" else None
+            return True
+        except Exception as e:
+            self.metrics.inc("errors_total", kind="start_message")
+            await self.client.log_out()
+            logger.warning(os.getenv("ERROR_START_MESSAGE")) if os.getenv("DEBUG") == "true" else None
+            logger.critical(e) if os.getenv("DEBUG") == "true" else None
+            self.on_fatal(e)
+            return False
+
+    def queue_notification(self, display_name):
+        """
+        Sends the notification message in the background without waiting for it to be sent.
+
+        Entity lookups and FloodWait pauses can take minutes, so the monitoring loop does not wait
+        for the notifications, the same way it does not wait for the bio updates. Only the start
+        message is awaited. The task is kept in `notification_tasks` until it is done.
+
+        Args:
+            display_name (str): The display name of the game that started.
+        """
+        def on_done(task):
+            self.notification_tasks.discard(task)
+            if task.cancelled():
+                return
+            e = task.exception()
+            if e is None:
+                return
+            self.metrics.inc("errors_total", kind="notification")
+            logger.warning(os.getenv("ERROR_NOTIFICATION_FAILED").replace("#name", "").replace("#game_name", display_name))
+            logger.critical(e) if os.getenv("DEBUG") == "true" else None
+
+        task = asyncio.ensure_future(self.notify(display_name))
+        self.notification_tasks.add(task)
+        task.add_done_callback(on_done)
+
+    async def notify(self, display_name):
+        """
+        Sends the notification message to the notification usernames.
+
+        Args:
+            display_name (str): The display name of the game that started.
+        """
+        notification_message_template = self.notification_message or os.getenv("NOTIFICATION_MESSAGE")
+        current_time_str = datetime.now().strftime("%H:%M")
+
+        results = await send_notifications(self.request_scheduler, self.entity_cache, self.notification_usernames, lambda first_name: notification_message_template.replace("#game_name", display_name).replace("#name", first_name).replace("#time", current_time_str))
+        for username, first_name, e in results:
+            if e is not None:
+                self.metrics.inc("errors_total", kind="notification")
+            if first_name is None:
+                logger.warning(f"Could not get first name for {username}: {e}")
+            elif e is None:
+                logger.info(os.getenv("DEBUG_NOTIFICATION_SENT").replace("#name", first_name).replace("#game_name", display_name)) if os.getenv("DEBUG") == "true" else None
+            else:
+                logger.warning(os.getenv("ERROR_NOTIFICATION_FAILED").replace("#name", first_name).replace("#game_name", display_name)) if os.getenv("DEBUG") == "true" else None
+                logger.critical(e) if os.getenv("DEBUG") == "true" else None
+
+    async def update_status(self, game_name, elapsed_time, games):
+        """
+        Updates the bio for the current tick. The sessions are recorded by `tick`.
+
+        Args:
+            game_name (str or False): The game shown in the bio, or False if no game is running.
+            elapsed_time (int or False): The number of whole minutes the game has been running for.
+            games (list[tuple[str]]): The watched games.
+        """
+        if game_name is False and elapsed_time is False:
+            if self.status_renderer.is_changed(self.default_bio):
+                self.queue_bio_update(self.default_bio, "ERROR_UPDATE_DEFAULT_BIO")
+            else:
+                self.metrics.inc("bio_updates_suppressed_total")
+            self.playing_game = None
+            await self.send_start_message(games)
+            return
+
+        friendly_game_name_cap = self.display_name(game_name) or game_name
+        if not await self.send_start_message(games):
+            return
+
+        new_status = self.status_renderer.render(friendly_game_name_cap, elapsed_time)
+        if self.status_renderer.is_changed(new_status):
+            self.queue_bio_update(new_status, "TOO_LONG")
+        else:
+            self.metrics.inc("bio_updates_suppressed_total")
+        if self.playing_game != friendly_game_name_cap and self.notification_usernames:
+            self.queue_notification(friendly_game_name_cap)
+        self.playing_game = friendly_game_name_cap
+        logger.info(os.getenv("DEBUG_PLAYING") + friendly_game_name_cap + os.getenv("DEBUG_PLAYTIME") + str(elapsed_time + 1)) if os.getenv("DEBUG") == "true" else None
+
+    async def main(self, games):
+        """
+        Continuously monitors a list of games and updates the status of the currently running game.
+
+        Each tick is timed, and so is the gap between the planned and the actual end of the sleep
+        that follows it. The metrics snapshot file is written when it is due.
+
+        Args:
+            games (list[tuple[str]]): The watched games.
+        """
+        for proc in psutil.process_iter(['name', 'exe', 'username']):
+            if proc.info['name'] == 'python.exe':
+                try:
+                    proc.nice(psutil.IDLE_PRIORITY_CLASS)
+                    logger.debug(os.getenv("DEBUG_SET_LOW_PRIORITY")) if os.getenv("DEBUG") == "true" else None
+                    break
+                except:
+                    False
+
+        self.request_scheduler.start()
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.connection_manager.ensure_connected()
+            with self.metrics.timer("tick_seconds"):
+                await self.tick(games)
+            self.metrics.inc("ticks_total")
+            if self.metrics.snapshot_due():
+                try:
+                    self.metrics.write_snapshot()
+                except OSError as e:
+                    self.metrics.inc("errors_total", kind="metrics_snapshot")
+                    logger.warning(f"Could not write the metrics snapshot: {e}")
+            delay = self.poll_scheduler.update(self.session_tracker.running)
+            slept_from = loop.time()
+            await asyncio.sleep(delay)
+            self.metrics.observe("sleep_drift_seconds", max(0, loop.time() - slept_from - delay))
+
+    async def tick(self, games):
+        """
+        Polls the watched games once.
+
+        Every running game has its own session, and samples are recorded for each of them. The bio
+        shows the game chosen by the session tracker. A game starting or stopping is handled right
+        away. Otherwise the bio and the resource samples are only refreshed when the poll scheduler
+        says they are due, whatever the poll interval is.
+
+        Args:
+            games (list[tuple[str]]): The watched games.
+        """
+        with self.metrics.timer("scan_seconds"):
+            running = self.running_games(games)
+        started, ended = self.session_tracker.update(running)
+        for game_name in ended:
+            self.log_game_end(game_name, self.session_tracker.ended_elapsed[game_name])
+            self.process_detector.forget_game(game_name)
+        for game_name in started:
+            self.log_game_start(game_name)
+        self.current_game = self.session_tracker.subject()
+        if not started and not ended and not self.poll_scheduler.refresh_due():
+            return
+        self.poll_scheduler.mark_refreshed()
+
+        if not self.current_game:
+            await self.update_status(False, False, games)
+            return
+
+        await self.update_status(self.current_game, self.session_tracker.elapsed_minutes(self.current_game), games)
+        gpu_usage = self.get_gpu_usage()
+        sampled = False
+        for game_name in running:
+            usage = self.process_detector.sample_game(game_name)
+            if game_name in self.stats_store.stats["games"] and usage is not None:
+                self.stats_store.append("sample", game_name, gpu=gpu_usage, **usage)
+                sampled = True
+        if sampled:
+            self.flush_stats()
+
+    def run(self, games):
+        """
+        Starts the GPU sampler and the metrics endpoint, and runs the monitoring loop forever.
+
+        When the loop is stopped (SIGTERM, exit from the GUI, Ctrl+C), the sessions still running are ended
+        and the stats journal is flushed.
+
+        Args:
+            games (list[tuple[str]]): The watched games.
+        """
+        self.gpu_sampler.start()
+        try:
+            if self.metrics.start_server():
+                logger.info(f"Serving metrics on http://127.0.0.1:{self.metrics.port}/metrics")
+        except OSError as e:
+            logger.warning(f"Could not start the metrics endpoint on port {self.metrics.port}: {e}")
+        loop = asyncio.get_event_loop()
+        loop.create_task(self.main(games))
+        try:
+            loop.run_forever()
+        finally:
+            self.end_sessions()
+            self.metrics.stop_server()
+            self.gpu_sampler.stop()
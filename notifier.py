@@ -0,0 +1,178 @@
+"""
+Game start notifications sent to the users listed in the notification settings.
+
+Usernames are resolved once and kept in a small JSON cache next to the stats file, with
+their first name and input entity (user id and access hash), so later sessions do not call
+`get_entity` again for known users. Notifications are sent concurrently, bounded by a
+semaphore, through the request scheduler. The monitor sends them from a background task, so
+a game starting again while the previous notifications still wait for their lookups shares
+the lookups in progress instead of queuing new ones.
+"""
+
+
+import asyncio
+import json
+import logging
+import os
+import time
+
+from telethon.tl.types import InputPeerUser
+
+
+logger = logging.getLogger(__name__)
+
+
+class EntityCache:
+    """
+    Persistent username -> (first name, input entity) cache with a time to live.
+
+    Args:
+        file_path (str): The path of the JSON cache file.
+        ttl (float): How long a resolved user stays valid, in seconds.
+    """
+
+    def __init__(self, file_path, ttl=7 * 24 * 3600):
+        self.file_path = file_path
+        self.ttl = ttl
+        self._entries = {}
+        self._pending = {}
+        self._dirty = False
+        try:
+            with open(file_path, 'r') as file:
+                self._entries = json.load(file)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def _key(username):
+        return username.lstrip("@").lower()
+
+    def get(self, username):
+        """
+        Returns the cached user for a username, if it is still valid.
+
+        Args:
+            username (str): The Telegram username.
+
+        Returns:
+            tuple[str, InputPeerUser] or None: The first name and input entity, or None.
+        """
+        entry = self._entries.get(self._key(username))
+        if entry is None or time.time() - entry["cached_at"] > self.ttl:
+            return None
+        return entry["first_name"], InputPeerUser(entry["id"], entry["access_hash"])
+
+    def put(self, username, user):
+        """
+        Caches a resolved user.
+
+        Args:
+            username (str): The Telegram username.
+            user (telethon.tl.types.User): The user returned by `get_entity`.
+        """
+        self._entries[self._key(username)] = {
+            "first_name": user.first_name,
+            "id": user.id,
+            "access_hash": user.access_hash,
+            "cached_at": time.time(),
+        }
+        self._dirty = True
+
+    async def resolve(self, username, fetch):
+        """
+        Returns the cached user for a username, or looks it up and caches it.
+
+        Concurrent lookups of the same username share a single call to `fetch`. A caller that is
+        cancelled does not cancel the lookup shared with the others.
+
+        Args:
+            username (str): The Telegram username.
+            fetch (callable): Coroutine function returning the `telethon.tl.types.User` of a username.
+
+        Returns:
+            tuple[str, InputPeerUser]: The first name and input entity.
+        """
+        cached = self.get(username)
+        if cached is not None:
+            return cached
+        key = self._key(username)
+        lookup = self._pending.get(key)
+        if lookup is None:
+            lookup = self._pending[key] = asyncio.ensure_future(fetch(username))
+            lookup.add_done_callback(lambda _: self._pending.pop(key, None))
+        user = await asyncio.shield(lookup)
+        self.put(username, user)
+        return self.get(username)
+
+    def invalidate(self, username):
+        """
+        Removes a username from the cache.
+
+        Args:
+            username (str): The Telegram username.
+        """
+        if self._entries.pop(self._key(username), None) is not None:
+            self._dirty = True
+
+    def save(self):
+        """Writes the cache file if it changed, replacing it atomically."""
+        if not self._dirty:
+            return
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(self._entries, file)
+        os.replace(temp_path, self.file_path)
+        self._dirty = False
+
+
+async def resolve_user(scheduler, cache, username):
+    """
+    Resolves a username to its first name and input entity, using the cache when possible.
+
+    Args:
+        scheduler (RequestScheduler): The scheduler used for `get_entity`.
+        cache (EntityCache): The entity cache.
+        username (str): The Telegram username.
+
+    Returns:
+        tuple[str, InputPeerUser]: The first name and input entity.
+    """
+    return await cache.resolve(username, scheduler.get_entity)
+
+
+async def send_notifications(scheduler, cache, usernames, render_message, concurrency=5):
+    """
+    Sends a notification to every username concurrently.
+
+    Args:
+        scheduler (RequestScheduler): The scheduler used for `get_entity` and `send_message`.
+        cache (EntityCache): The entity cache, saved once all notifications are done.
+        usernames (list[str]): The Telegram usernames to notify.
+        render_message (callable): Returns the message text for a first name.
+        concurrency (int): The maximum number of notifications in progress at the same time.
+
+    Returns:
+        list[tuple[str, str or None, Exception or None]]: For each username, the first name (None if
+        the user could not be resolved) and the error, None if the notification was sent.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def notify(username):
+        async with semaphore:
+            try:
+                first_name, entity = await resolve_user(scheduler, cache, username)
+            except Exception as e:
+                return username, None, e
+            try:
+                await scheduler.send_message(entity, render_message(first_name))
+                return username, first_name, None
+            except Exception as e:
+                cache.invalidate(username)
+                return username, first_name, e
+
+    results = await asyncio.gather(*(notify(username) for username in usernames))
+    try:
+        cache.save()
+    except OSError as e:
+        logger.warning(f"Could not save the entity cache: {e}")
+    return results
@@ -0,0 +1,148 @@
+"""
+Adaptive polling of the watched games.
+
+The monitor used to sleep INTERVAL_TIME between two ticks, so a game start was noticed up to
+a minute late and the playing time was counted in ticks, which only gave minutes when the
+interval was 60 seconds. The `PollScheduler` polls at `min_interval` right after the running
+game changed, backs off geometrically to `max_interval` while a session is stable and polls
+at `idle_interval` while no game runs. The bio and the resource samples are refreshed on their
+own cadence, `refresh_interval`, whatever the poll interval is.
+
+The `SessionClock` measures the playing time with `time.monotonic()`, so it neither depends on
+the poll interval nor jumps when the wall clock is changed.
+"""
+
+
+import os
+import time
+
+
+class SessionClock:
+    """
+    Monotonic clock of the current game session.
+
+    Args:
+        clock (callable): Returns the current time in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.game = None
+        self.started = None
+
+    def start(self, game):
+        """
+        Starts timing a game session. Nothing changes if this game is already being timed.
+
+        Args:
+            game (str): The game key.
+        """
+        if game != self.game:
+            self.game = game
+            self.started = self._clock()
+
+    def stop(self):
+        """Stops timing the current session."""
+        self.game = None
+        self.started = None
+
+    def elapsed(self):
+        """
+        Returns the length of the current session.
+
+        Returns:
+            float: The elapsed time in seconds, 0 if no session is being timed.
+        """
+        if self.started is None:
+            return 0.0
+        return self._clock() - self.started
+
+    def elapsed_minutes(self):
+        """
+        Returns the number of whole minutes played in the current session.
+
+        Returns:
+            int: The elapsed time in minutes.
+        """
+        return int(self.elapsed() // 60)
+
+
+class PollScheduler:
+    """
+    Chooses the delay before the next poll from the observed game state.
+
+    Args:
+        idle_interval (float): Seconds between two polls while no game runs.
+        min_interval (float): Seconds before the first poll after the running game changed.
+        max_interval (float): The longest delay between two polls while a session is stable.
+        backoff (float): The factor applied to the delay after each poll with an unchanged state.
+        refresh_interval (float): Seconds between two bio and sample refreshes.
+        clock (callable): Returns the current time in seconds. Defaults to time.monotonic.
+    """
+
+    def __init__(self, idle_interval=5, min_interval=2, max_interval=60, backoff=2.0, refresh_interval=60, clock=time.monotonic):
+        self.idle_interval = idle_interval
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = backoff
+        self.refresh_interval = refresh_interval
+        self.transitions = 0
+        self.interval = min_interval
+        self._clock = clock
+        self._state = None
+        self._last_refresh = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Creates a scheduler from the POLL_IDLE_INTERVAL, POLL_MIN_INTERVAL, INTERVAL_TIME (the longest
+        delay) and BIO_REFRESH_INTERVAL environment variables, with the defaults for the missing ones.
+
+        Returns:
+            PollScheduler: The scheduler.
+        """
+        def seconds(name, default):
+            value = os.getenv(name)
+            return float(value) if value else default
+
+        return cls(
+            idle_interval=seconds("POLL_IDLE_INTERVAL", 5),
+            min_interval=seconds("POLL_MIN_INTERVAL", 2),
+            max_interval=seconds("INTERVAL_TIME", 60),
+            refresh_interval=seconds("BIO_REFRESH_INTERVAL", 60),
+        )
+
+    def update(self, game):
+        """
+        Records the games found by the last poll and returns the delay before the next one.
+
+        Args:
+            game (str, tuple[str] or None): The running game or games, falsy if no game is running.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if game != self._state:
+            self._state = game
+            self.transitions += 1
+            self.interval = self.min_interval
+            return self.interval
+        target = self.max_interval if game else self.idle_interval
+        if self.interval < target:
+            self.interval = min(target, self.interval * self.backoff)
+        else:
+            self.interval = target
+        return self.interval
+
+    def refresh_due(self):
+        """
+        Checks if the bio and the resource samples should be refreshed.
+
+        Returns:
+            bool: True if they were never refreshed or `refresh_interval` has passed since the last refresh.
+        """
+        return self._last_refresh is None or self._clock() - self._last_refresh >= self.refresh_interval
+
+    def mark_refreshed(self):
+        """Records a refresh of the bio and the resource samples."""
+        self._last_refresh = self._clock()
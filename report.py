@@ -0,0 +1,484 @@
+"""
+Game statistics reports.
+
+The report data (durations, ratios and mean resource usage of every game) is computed as
+NumPy arrays in one pass and cached by a hash of the underlying stats. The interactive
+figure is drawn once per stats hash: switching between games only moves the exploded wedge
+and updates the existing bar, text and connection artists, and opening the report again
+with unchanged stats reuses the open figure.
+
+matplotlib is loaded the first time a report is shown and kept for the later ones.
+
+The same charts can be exported without a display or the Tk application, with the Agg
+canvas, to PNG or SVG files, together with CSV summaries:
+
+    python report.py --stats game_stats.json --period daily weekly monthly --format png csv --out reports
+"""
+
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+
+ReportData = namedtuple("ReportData", ["key", "labels", "durations", "ratios", "cpu", "gpu", "total"])
+
+BAR_WIDTH = 0.2
+BAR_COLORS = ('#1f77b4', '#ff7f0e')
+
+_matplotlib = None
+
+
+def load_matplotlib():
+    """
+    Imports the matplotlib modules used by the reports once.
+
+    Returns:
+        tuple: pyplot, ConnectionPatch and Button.
+    """
+    global _matplotlib
+    if _matplotlib is None:
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import ConnectionPatch
+        from matplotlib.widgets import Button
+        _matplotlib = (plt, ConnectionPatch, Button)
+    return _matplotlib
+
+
+def stats_hash(data):
+    """
+    Returns a hash of the stats used by a report.
+
+    Args:
+        data (dict): The per-game stats, e.g. `StatsStore.rollup(...)`.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def compute_report(data, key=None):
+    """
+    Computes the report arrays of all games in one pass.
+
+    Args:
+        data (dict): The per-game stats with "total_duration", "avgCPUusage" and "avgGPUusage".
+        key (str, optional): The stats hash, computed if omitted.
+
+    Returns:
+        ReportData: The labels and the duration, ratio, CPU and GPU arrays.
+    """
+    labels = list(data)
+    values = np.array(
+        [(item.get("total_duration", 0), item.get("avgCPUusage", 0), item.get("avgGPUusage", 0)) for item in data.values()],
+        dtype=float,
+    ).reshape(-1, 3)
+    durations, cpu, gpu = values.T
+    total = durations.sum()
+    ratios = durations / total if total else np.zeros_like(durations)
+    return ReportData(key or stats_hash(data), labels, durations, ratios, cpu, gpu, total)
+
+
+class ReportCache:
+    """
+    Small LRU cache of computed report data, keyed by stats hash.
+
+    Args:
+        size (int): The maximum number of reports kept.
+    """
+
+    def __init__(self, size=8):
+        self.size = size
+        self._items = OrderedDict()
+
+    def get(self, data):
+        """
+        Returns the report data of the stats, computing it only if the stats changed.
+
+        Args:
+            data (dict): The per-game stats.
+
+        Returns:
+            ReportData: The report data.
+        """
+        key = stats_hash(data)
+        report = self._items.get(key)
+        if report is None:
+            report = self._items[key] = compute_report(data, key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(key)
+        return report
+
+
+class ReportFigure:
+    """
+    The pie of the durations and the resource usage bar of the selected game.
+
+    The artists are created once; `select` only updates them. The report must have a non-zero
+    total duration, matplotlib cannot draw a pie of zero wedges.
+
+    Args:
+        report (ReportData): The report data.
+        fig (matplotlib.figure.Figure): The figure to draw into.
+        interactive (bool): Whether the figure is shown on screen (redraws lazily).
+    """
+
+    def __init__(self, report, fig, interactive=True):
+        from matplotlib.patches import ConnectionPatch
+        self.report = report
+        self.fig = fig
+        self.interactive = interactive
+        self.selected = None
+        self.ax1 = fig.add_axes([0.3, 0.1, 0.35, 0.8])
+        self.ax2 = fig.add_axes([0.7, 0.1, 0.25, 0.8])
+
+        self.wedges, self.texts, self.autotexts = self.ax1.pie(
+            report.ratios, autopct='%1.1f%%', labels=report.labels, textprops={'fontsize': 8})
+        self._text_positions = [(text.get_position(), autotext.get_position()) for text, autotext in zip(self.texts, self.autotexts)]
+        self.played_text = self.ax1.text(0, -1.5, "", ha='center', fontsize=10, bbox=dict(facecolor='white', alpha=0.5))
+
+        self.bars = []
+        self.bar_texts = []
+        for color, label in zip(BAR_COLORS, ('GPU', 'CPU')):
+            bar = self.ax2.bar(0, 0, BAR_WIDTH, bottom=1, color=color, label=label, alpha=0.7)[0]
+            self.bars.append(bar)
+            self.bar_texts.append(self.ax2.text(0, 1, "", ha='center', va='center', color='white'))
+        self.ax2.legend(loc='upper right')
+        self.ax2.axis('off')
+        self.ax2.set_xlim(-2.5 * BAR_WIDTH, 2.5 * BAR_WIDTH)
+        self.ax2.set_ylim(0, 1)
+
+        self.connections = []
+        for _ in range(2):
+            connection = ConnectionPatch(xyA=(0, 0), coordsA=self.ax2.transData, xyB=(0, 0), coordsB=self.ax1.transData, color='gray')
+            self.ax2.add_artist(connection)
+            self.connections.append(connection)
+
+    def select(self, label):
+        """
+        Shows the details of a game: explodes its wedge and updates the bar and the connections.
+
+        Args:
+            label (str): The game key.
+        """
+        report = self.report
+        idx = report.labels.index(label)
+        self.selected = label
+
+        for i, wedge in enumerate(self.wedges):
+            offset = (0.0, 0.0)
+            if i == idx:
+                angle = np.deg2rad((wedge.theta1 + wedge.theta2) / 2)
+                offset = (0.1 * np.cos(angle), 0.1 * np.sin(angle))
+            wedge.set_center(offset)
+            for artist, position in zip((self.texts[i], self.autotexts[i]), self._text_positions[i]):
+                artist.set_position((position[0] + offset[0], position[1] + offset[1]))
+
+        self.played_text.set_text(f'{os.getenv("PLAYED_TIME")} {report.durations[idx]:.2f} {os.getenv("DURATION")}')
+
+        bottom = 1.0
+        for bar, text, height in zip(self.bars, self.bar_texts, (report.gpu[idx] / 100, report.cpu[idx] / 100)):
+            bottom -= height
+            bar.set_y(bottom)
+            bar.set_height(height)
+            text.set_position((0, bottom + height / 2))
+            text.set_text(f"{height * 100:.0f}%" if height else "")
+
+        self.ax2.set_title(f'{os.getenv("COMPUTE_USAGE")} ({label})', pad=20)
+
+        wedge = self.wedges[idx]
+        center, r = wedge.center, wedge.r
+        for connection, theta, y in zip(self.connections, (wedge.theta2, wedge.theta1), (1.0, bottom)):
+            connection.xy1 = (-BAR_WIDTH / 2, y)
+            connection.xy2 = (r * np.cos(np.deg2rad(theta)) + center[0], r * np.sin(np.deg2rad(theta)) + center[1])
+
+        if self.interactive:
+            self.fig.canvas.draw_idle()
+
+
+_report_cache = ReportCache()
+_open_figures = {}
+
+
+def show_report(data):
+    """
+    Shows the interactive report of the given stats, with a sliding menu to select the game.
+
+    Opening the report again while the stats did not change brings back the open figure.
+
+    Args:
+        data (dict): The per-game stats, e.g. `StatsStore.rollup(...)`.
+
+    Returns:
+        bool: False if there is no game data to show (including when no played time is recorded), True otherwise.
+    """
+    report = _report_cache.get(data)
+    if not report.labels or not report.total:
+        return False
+
+    plt, _, Button = load_matplotlib()
+    figure = _open_figures.get(report.key)
+    if figure is not None and plt.fignum_exists(figure.fig.number):
+        plt.figure(figure.fig.number)
+        figure.fig.canvas.draw_idle()
+        plt.show()
+        return True
+
+    fig = plt.figure(figsize=(12, 6))
+    figure = ReportFigure(report, fig)
+    figure.select(report.labels[0])
+    _open_figures.clear()
+    _open_figures[report.key] = figure
+
+    menu_start_pos = [-0.25, 0.1, 0.2, 0.8]
+    menu_end_pos = [0.05, 0.1, 0.2, 0.8]
+
+    menu_ax = fig.add_axes(menu_start_pos)
+    menu_ax.set_xlim(0, 1)
+    menu_ax.set_ylim(0, 1)
+    menu_ax.set_clip_on(True)
+    menu_ax.axis('off')
+    menu_texts = []
+
+    n = len(report.labels)
+    for i, lab in enumerate(report.labels):
+        y = 0.9 - i * (0.8 / n)
+        txt = menu_ax.text(0.1, y, lab, fontsize=12, picker=True,
+                        bbox=dict(boxstyle="round", fc="white", ec="black"))
+        txt.set_clip_on(True)
+        menu_texts.append(txt)
+
+    menu_state = {"visible": False}
+
+    def slide_menu(show=True):
+        start = menu_start_pos[0] if show else menu_end_pos[0]
+        end = menu_end_pos[0] if show else menu_start_pos[0]
+        steps = 20
+        delta = (end - start) / steps
+        for i in range(steps):
+            new_x = start + delta * (i + 1)
+            pos = [new_x, menu_end_pos[1], menu_end_pos[2], menu_end_pos[3]]
+            menu_ax.set_position(pos)
+            fig.canvas.draw_idle()
+            plt.pause(0.01)
+        menu_state["visible"] = show
+
+    def on_menu_click(event):
+        if menu_state["visible"] and event.inaxes != menu_ax:
+            slide_menu(show=False)
+
+    def on_menu_pick(event):
+        if event.artist in menu_texts:
+            figure.select(event.artist.get_text())
+            slide_menu(show=False)
+
+    fig.canvas.mpl_connect('pick_event', on_menu_pick)
+    fig.canvas.mpl_connect('button_press_event', on_menu_click)
+
+    ax_button = fig.add_axes([0.01, 0.9, 0.1, 0.05])
+    menu_button = Button(ax_button, 'Menu')
+    menu_button.on_clicked(lambda event: slide_menu(show=not menu_state["visible"]))
+    figure.menu_button = menu_button
+
+    plt.show()
+    return True
+
+
+def write_csv(report, file_path, data=None):
+    """
+    Writes the summary of a report as CSV.
+
+    Args:
+        report (ReportData): The report data.
+        file_path (str): The CSV file to write.
+        data (dict, optional): The per-game stats, used for the session counts.
+    """
+    with open(file_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Game", "Total Duration (min)", "Share (%)", "Sessions", "Avg CPU (%)", "Avg GPU (%)"])
+        order = np.argsort(-report.durations, kind="stable")
+        for i in order:
+            label = report.labels[i]
+            sessions = (data or {}).get(label, {}).get("sessions", "")
+            writer.writerow([label, f"{report.durations[i]:.2f}", f"{report.ratios[i] * 100:.2f}", sessions, f"{report.cpu[i]:.2f}", f"{report.gpu[i]:.2f}"])
+
+
+def render_figure(report, file_path, label=None):
+    """
+    Renders the report chart with the Agg canvas, without pyplot or a display.
+
+    Args:
+        report (ReportData): The report data.
+        file_path (str): The image file to write, its extension selects the format (png, svg, ...).
+        label (str, optional): The game to select. Defaults to the game with the longest duration.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    figure = ReportFigure(report, fig, interactive=False)
+    figure.select(label if label is not None else report.labels[int(np.argmax(report.durations))])
+    fig.savefig(file_path)
+
+
+def export_report(data, out_dir, name, formats=("png", "csv"), per_game=False):
+    """
+    Exports the report of the given stats to files.
+
+    Args:
+        data (dict): The per-game stats, e.g. `StatsStore.rollup(...)`.
+        out_dir (str): The output directory, created if needed.
+        name (str): The base name of the files.
+        formats (tuple[str]): Any of "png", "svg" and "csv".
+        per_game (bool): Render one chart per game instead of one for the longest played game.
+
+    Returns:
+        list[str]: The written files. Empty if there is no game data. Only the CSV summary is written
+        when no played time is recorded, since the pie chart needs a non-zero total.
+    """
+    report = _report_cache.get(data)
+    if not report.labels:
+        return []
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for fmt in formats:
+        if fmt == "csv":
+            file_path = os.path.join(out_dir, f"{name}.csv")
+            write_csv(report, file_path, data)
+            written.append(file_path)
+            continue
+        if not report.total:
+            continue
+        labels = report.labels if per_game else [None]
+        for label in labels:
+            suffix = "" if label is None else "_" + "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+            file_path = os.path.join(out_dir, f"{name}{suffix}.{fmt}")
+            render_figure(report, file_path, label)
+            written.append(file_path)
+    return written
+
+
+def machine_folders(stats_paths):
+    """
+    Returns the output folder of every stats file when several machines are exported at once.
+
+    The folder is the path of the file relative to the directory shared by all of them, without
+    its extension (pc1.json and pc2.json give pc1 and pc2). When every file has the same name,
+    as with one game_stats.json per machine directory, the directories are used instead.
+
+    Args:
+        stats_paths (list[str]): The stats files.
+
+    Returns:
+        list[str]: The folder names, in the same order.
+
+    Raises:
+        ValueError: If two stats files would be exported into the same folder.
+    """
+    paths = [os.path.abspath(path) for path in stats_paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    names = [os.path.splitext(os.path.relpath(path, root))[0] for path in paths]
+    if len({os.path.basename(path) for path in paths}) == 1:
+        names = [os.path.dirname(name) or name for name in names]
+    names = [name.replace(os.sep, "_") for name in names]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"several stats files would be exported to {', '.join(duplicates)}")
+    return names
+
+
+def bucket_keys(values, periods):
+    """
+    Returns the bucket key to export for every period, from the --key arguments.
+
+    Each value is "period=key" (weekly=2024-W22). A bare key is only accepted when a single period is
+    exported, since a day, a week and a month do not share their keys.
+
+    Args:
+        values (list[str]): The --key arguments.
+        periods (list[str]): The periods to export.
+
+    Returns:
+        dict[str, str or None]: The key of every period, None for the current bucket.
+
+    Raises:
+        ValueError: If a key is given for a period that is not exported, twice for the same period, or
+            without its period while several periods are exported.
+    """
+    keys = dict.fromkeys(periods)
+    given = set()
+    for value in values:
+        period, separator, key = value.partition("=")
+        if not separator:
+            if len(periods) > 1:
+                raise ValueError(f"--key {value} needs its period, as in period=key, when several periods are exported")
+            period, key = periods[0], value
+        if period not in keys:
+            raise ValueError(f"--key {value}: the {period} period is not exported")
+        if period in given:
+            raise ValueError(f"--key is given twice for the {period} period")
+        given.add(period)
+        keys[period] = key
+    return keys
+
+
+def main(argv=None):
+    """
+    Command line entry point of the headless report export.
+
+    Args:
+        argv (list[str], optional): The arguments, defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit code.
+    """
+    from rollups import PERIODS
+    from stats_store import StatsStore
+
+    parser = argparse.ArgumentParser(description="Export game statistics reports without the GUI.")
+    parser.add_argument("--stats", nargs="+", default=[os.getenv("STATS_FILE") or "game_stats.json"], help="stats files, one per machine")
+    parser.add_argument("--period", nargs="+", choices=PERIODS, default=list(PERIODS), help="periods to export")
+    parser.add_argument("--key", nargs="+", default=[], help="bucket key to export per period (e.g. daily=2024-05-31 weekly=2024-W22 monthly=2024-05), defaults to the current one; the period can be left out when a single period is exported")
+    parser.add_argument("--all-buckets", action="store_true", help="export every bucket of each period")
+    parser.add_argument("--format", nargs="+", choices=("png", "svg", "csv"), default=["png", "csv"], help="output formats")
+    parser.add_argument("--per-game", action="store_true", help="render one chart per game")
+    parser.add_argument("--out", default="reports", help="output directory")
+    args = parser.parse_args(argv)
+    try:
+        period_keys = bucket_keys(args.key, args.period)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out_dirs = [args.out]
+    if len(args.stats) > 1:
+        try:
+            out_dirs = [os.path.join(args.out, folder) for folder in machine_folders(args.stats)]
+        except ValueError as e:
+            parser.error(str(e))
+
+    for stats_path, out_dir in zip(args.stats, out_dirs):
+        store = StatsStore(stats_path, read_only=True)
+        for period in args.period:
+            keys = store.rollups.keys(period) if args.all_buckets else [period_keys[period]]
+            for key in keys:
+                data = store.rollup(period, key)
+                name = f"{period}_{key or 'current'}"
+                written = export_report(data, out_dir, name, tuple(args.format), args.per_game)
+                print(f"{stats_path} {name}: " + (", ".join(written) if written else "no game data"))
+    return 0
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Daily, weekly and monthly rollups of the game sessions.
+
+When a session closes, its duration is split at local midnights and added to the day, ISO
+week and month buckets it overlaps, together with the resource sums of the session. Only
+the buckets touched by that session are updated, so a period is answered with a single
+dictionary lookup instead of rescanning the session history.
+"""
+
+
+from datetime import datetime, timedelta
+
+
+PERIODS = ("daily", "weekly", "monthly")
+
+
+def bucket_key(period, moment):
+    """
+    Returns the bucket key of a moment for a period.
+
+    Args:
+        period (str): "daily", "weekly" or "monthly".
+        moment (datetime): The local time.
+
+    Returns:
+        str: "2024-05-31" for a day, "2024-W22" for an ISO week, "2024-05" for a month.
+    """
+    if period == "daily":
+        return moment.strftime("%Y-%m-%d")
+    if period == "weekly":
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return moment.strftime("%Y-%m")
+    raise ValueError(f"Unknown period: {period}")
+
+
+def split_by_day(start, end):
+    """
+    Splits a time range at local midnights.
+
+    Args:
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+
+    Returns:
+        list[tuple[datetime, float]]: The start of each part and its length in minutes.
+    """
+    parts = []
+    while start < end:
+        midnight = datetime.combine(start.date() + timedelta(days=1), datetime.min.time())
+        part_end = min(end, midnight)
+        parts.append((start, (part_end - start).total_seconds() / 60))
+        start = part_end
+    return parts
+
+
+class Rollups:
+    """
+    Time-bucketed totals of the game sessions, stored in a plain dict.
+
+    Args:
+        state (dict): The rollup state to update in place, e.g. stats["rollups"].
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, state):
+        for period in PERIODS:
+            state.setdefault(period, {})
+        self.state = state
+
+    def add_session(self, game, start, end, metrics=None):
+        """
+        Adds a closed session to the buckets it overlaps.
+
+        Args:
+            game (str): The game key.
+            start (datetime): The start of the session.
+            end (datetime): The end of the session.
+            metrics (dict, optional): The StreamingStats states of the session by metric name. Their
+                sums are spread over the buckets in proportion to the time spent in each of them.
+        """
+        parts = split_by_day(start, end) or [(start, 0.0)]
+        total = sum(minutes for _, minutes in parts)
+        touched = set()
+        for part_start, minutes in parts:
+            share = minutes / total if total else 1.0
+            for period in PERIODS:
+                key = bucket_key(period, part_start)
+                entry = self.state[period].setdefault(key, {}).setdefault(game, {"duration": 0, "sessions": 0, "sums": {}, "counts": {}})
+                entry["duration"] += minutes
+                if (period, key) not in touched:
+                    touched.add((period, key))
+                    entry["sessions"] += 1
+                for name, metric in (metrics or {}).items():
+                    if metric.get("count"):
+                        entry["sums"][name] = entry["sums"].get(name, 0) + metric["mean"] * metric["count"] * share
+                        entry["counts"][name] = entry["counts"].get(name, 0) + metric["count"] * share
+
+    def bucket(self, period, key=None):
+        """
+        Returns the raw bucket of a period.
+
+        Args:
+            period (str): "daily", "weekly" or "monthly".
+            key (str, optional): The bucket key. Defaults to the current day, week or month.
+
+        Returns:
+            dict: The bucket entries by game key.
+        """
+        if key is None:
+            key = bucket_key(period, datetime.now())
+        return self.state[period].get(key, {})
+
+    def query(self, period, key=None):
+        """
+        Returns the totals of a period by game, in the format the reports use.
+
+        Args:
+            period (str): "daily", "weekly" or "monthly".
+            key (str, optional): The bucket key. Defaults to the current day, week or month.
+
+        Returns:
+            dict: For each game, its "total_duration" in minutes, "sessions" and the mean resource
+            usage ("avgCPUusage", "avgGPUusage", ...).
+        """
+        result = {}
+        for game, entry in self.bucket(period, key).items():
+            item = {"total_duration": entry["duration"], "sessions": entry["sessions"]}
+            for name, total in entry["sums"].items():
+                count = entry["counts"].get(name)
+                item[name] = total / count if count else 0
+            item["avgCPUusage"] = item.get("cpu", 0)
+            item["avgGPUusage"] = item.get("gpu", 0)
+            result[game] = item
+        return result
+
+    def keys(self, period):
+        """
+        Returns the bucket keys of a period, oldest first.
+
+        Args:
+            period (str): "daily", "weekly" or "monthly".
+
+        Returns:
+            list[str]: The bucket keys.
+        """
+        return sorted(self.state[period])
@@ -0,0 +1,292 @@
+"""
+Scheduler for every outgoing Telegram call of the monitor.
+
+Profile updates, messages and entity lookups are queued here instead of calling the
+client directly. Each method has its own token bucket, FloodWait errors pause the method
+for the requested time and retry the request, profile updates are served before
+notifications, and only the latest queued profile update is sent. The round trip time of
+every call is recorded in the monitor metrics when they are given.
+"""
+
+
+import asyncio
+import itertools
+import logging
+import time
+
+from telethon.errors import FloodWaitError
+from telethon.tl.functions.account import UpdateProfileRequest
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE = "profile"
+ENTITY = "entity"
+MESSAGE = "message"
+
+PRIORITIES = {PROFILE: 0, ENTITY: 1, MESSAGE: 2}
+
+DEFAULT_LIMITS = {
+    PROFILE: (2, 1 / 30),
+    ENTITY: (5, 1 / 2),
+    MESSAGE: (20, 1),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter that can also be blocked for a while (e.g. after a FloodWait).
+
+    Args:
+        capacity (float): The maximum number of tokens, i.e. the allowed burst.
+        rate (float): The number of tokens added per second.
+    """
+
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.blocked_until = 0
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now=None):
+        """
+        Returns how long to wait before a token is available.
+
+        Args:
+            now (float, optional): The current monotonic time.
+
+        Returns:
+            float: The wait time in seconds, 0 if a token is available now.
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        wait = max(0, self.blocked_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        return wait
+
+    def take(self):
+        """Consumes one token."""
+        self.tokens -= 1
+
+    def block(self, seconds):
+        """
+        Blocks the bucket for the given number of seconds.
+
+        Args:
+            seconds (float): How long to block the bucket.
+        """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class _Request:
+    __slots__ = ("method", "call", "futures", "seq")
+
+    def __init__(self, method, call, seq):
+        self.method = method
+        self.call = call
+        self.futures = []
+        self.seq = seq
+
+
+class RequestScheduler:
+    """
+    Queues Telegram calls and sends them under per-method rate limits.
+
+    Args:
+        client (TelegramClient): The Telegram client.
+        limits (dict, optional): Per-method (capacity, tokens per second) overrides of DEFAULT_LIMITS.
+        max_in_flight (int): The maximum number of requests sent concurrently.
+        metrics (MonitorMetrics, optional): Records the round trip time of the calls and their errors.
+    """
+
+    def __init__(self, client, limits=None, max_in_flight=4, metrics=None):
+        self.client = client
+        self.metrics = metrics
+        limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.buckets = {method: TokenBucket(capacity, rate) for method, (capacity, rate) in limits.items()}
+        self.flood_waits = 0
+        self.coalesced = 0
+        self.sent = {method: 0 for method in self.buckets}
+        self._queue = []
+        self._profile_request = None
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._sending = set()
+        self._task = None
+
+    def start(self):
+        """Starts the scheduler worker on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stops the scheduler worker. Queued and in-flight requests are cancelled."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._sending):
+            task.cancel()
+        await asyncio.gather(*self._sending, return_exceptions=True)
+        for request in self._queue:
+            for future in request.futures:
+                future.cancel()
+        self._queue.clear()
+        self._profile_request = None
+
+    def _submit(self, method, call):
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        if method == PROFILE and self._profile_request is not None:
+            self._profile_request.call = call
+            self._profile_request.futures.append(future)
+            self.coalesced += 1
+        else:
+            request = _Request(method, call, next(self._seq))
+            request.futures.append(future)
+            self._queue.append(request)
+            if method == PROFILE:
+                self._profile_request = request
+        self._wakeup.set()
+        return future
+
+    def update_profile(self, about):
+        """
+        Queues a bio update. A profile update that is still queued is replaced by this one.
+
+        Args:
+            about (str): The new bio.
+
+        Returns:
+            asyncio.Future: Resolved when the latest queued bio is sent.
+        """
+        return self._submit(PROFILE, lambda: self.client(UpdateProfileRequest(about=about)))
+
+    def send_message(self, entity, message, **kwargs):
+        """
+        Queues a message.
+
+        Args:
+            entity: The receiver, as accepted by `TelegramClient.send_message`.
+            message (str): The message text.
+            **kwargs: Extra arguments for `TelegramClient.send_message`.
+
+        Returns:
+            asyncio.Future: Resolved with the sent message.
+        """
+        return self._submit(MESSAGE, lambda: self.client.send_message(entity, message, **kwargs))
+
+    def get_entity(self, entity):
+        """
+        Queues an entity lookup.
+
+        Args:
+            entity: The entity to resolve, as accepted by `TelegramClient.get_entity`.
+
+        Returns:
+            asyncio.Future: Resolved with the entity.
+        """
+        return self._submit(ENTITY, lambda: self.client.get_entity(entity))
+
+    def _next_request(self):
+        now = time.monotonic()
+        wait = None
+        for request in sorted(self._queue, key=lambda request: (PRIORITIES.get(request.method, len(PRIORITIES)), request.seq)):
+            bucket_wait = self.buckets[request.method].wait_time(now)
+            if bucket_wait == 0:
+                return request, 0
+            wait = bucket_wait if wait is None else min(wait, bucket_wait)
+        return None, wait
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            request, wait = self._next_request()
+            if request is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._in_flight.acquire()
+            self._queue.remove(request)
+            if request is self._profile_request:
+                self._profile_request = None
+            self.buckets[request.method].take()
+            task = asyncio.ensure_future(self._send(request))
+            self._sending.add(task)
+            task.add_done_callback(self._sent)
+
+    def _sent(self, task):
+        self._sending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Telegram request failed unexpectedly: {task.exception()!r}")
+
+    def _record(self, request, started, error=None):
+        if self.metrics is None:
+            return
+        self.metrics.observe("telegram_rtt_seconds", time.monotonic() - started, method=request.method)
+        if error is not None and not isinstance(error, FloodWaitError):
+            self.metrics.inc("errors_total", kind="telegram_" + request.method)
+
+    async def _send(self, request):
+        started = time.monotonic()
+        try:
+            result = await request.call()
+        except asyncio.CancelledError:
+            for future in request.futures:
+                future.cancel()
+            raise
+        except FloodWaitError as e:
+            self._record(request, started, e)
+            self.flood_waits += 1
+            logger.warning(f"FloodWait on {request.method} requests, waiting {e.seconds} seconds")
+            self.buckets[request.method].block(e.seconds)
+            self._requeue(request)
+        except Exception as e:
+            self._record(request, started, e)
+            for future in request.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            self._record(request, started)
+            self.sent[request.method] += 1
+            for future in request.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight.release()
+            self._wakeup.set()
+
+    def _requeue(self, request):
+        if request.method == PROFILE and self._profile_request is not None:
+            self._profile_request.futures[:0] = request.futures
+            return
+        self._queue.append(request)
+        if request.method == PROFILE:
+            self._profile_request = request
+
+    def stats(self):
+        """
+        Returns the scheduler counters.
+
+        Returns:
+            dict: The queued and sent requests per method, the FloodWait and coalesced counts.
+        """
+        return {
+            "queued": len(self._queue),
+            "sent": dict(self.sent),
+            "flood_waits": self.flood_waits,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,130 @@
+"""
+Substring search over the game catalog, for the Game List window.
+
+The display string of every game ("Counter-strike 2 :: cs2.sh") and its lowercased search
+text are computed once when the index is created. Queries of three characters or more are
+answered from a trigram index: the posting lists of the query trigrams are intersected,
+smallest first, and only the remaining candidates are checked with a substring test. Shorter
+queries scan the precomputed search texts.
+
+The results of the recent queries are kept, so while the user types, a query is answered by
+checking the results of its longest cached prefix again, and erasing characters is answered
+from the cache.
+
+With large catalogs the trigram index can be built in a background thread. The search scans
+the texts until the index is published.
+"""
+
+
+import threading
+from array import array
+from collections import OrderedDict
+
+from catalog import capitalize_first_letters
+
+
+RECENT_QUERIES = 64
+
+
+def trigrams(text):
+    """
+    Returns the distinct trigrams of a text.
+
+    Args:
+        text (str): The text, already lowercased.
+
+    Returns:
+        set[str]: The trigrams, empty if the text is shorter than three characters.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class GameSearchIndex:
+    """
+    Trigram index over the keys and display names of the catalog.
+
+    Args:
+        mapping (Mapping[str, tuple[str]]): The catalog, as in `CatalogIndex.mapping`.
+        background (bool): Build the trigram index in a background thread instead of right away.
+    """
+
+    def __init__(self, mapping, background=False):
+        self.keys = sorted(mapping)
+        self.displays = [f"{capitalize_first_letters(mapping[key][0])} :: {key}" for key in self.keys]
+        self._texts = [key.lower() + "\n" + mapping[key][0].lower() for key in self.keys]
+        self._postings = None
+        self._recent = OrderedDict()
+        if background:
+            threading.Thread(target=self._build, name="search-index", daemon=True).start()
+        else:
+            self._build()
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def ready(self):
+        """True once the trigram index is built."""
+        return self._postings is not None
+
+    def _build(self):
+        postings = {}
+        for i, text in enumerate(self._texts):
+            for gram in trigrams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = array('i', (i,))
+                else:
+                    posting.append(i)
+        self._postings = postings
+
+    def search(self, query):
+        """
+        Returns the games whose key or display name contains the query.
+
+        Args:
+            query (str): The search term, case insensitive. An empty query matches every game.
+
+        Returns:
+            list[int]: The positions of the matching games in `keys` and `displays`, in key order.
+        """
+        query = query.lower()
+        if not query:
+            return list(range(len(self.keys)))
+        result = self._recent.get(query)
+        if result is not None:
+            self._recent.move_to_end(query)
+            return result
+
+        texts = self._texts
+        for end in range(len(query) - 1, 0, -1):
+            previous = self._recent.get(query[:end])
+            if previous is not None:
+                result = [i for i in previous if query in texts[i]]
+                break
+        else:
+            if len(query) < 3 or self._postings is None:
+                result = [i for i, text in enumerate(texts) if query in text]
+            else:
+                result = self._search_trigrams(query)
+
+        self._recent[query] = result
+        if len(self._recent) > RECENT_QUERIES:
+            self._recent.popitem(last=False)
+        return result
+
+    def _search_trigrams(self, query):
+        lists = []
+        for gram in trigrams(query):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for posting in lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        texts = self._texts
+        return [i for i in sorted(candidates) if query in texts[i]]
@@ -0,0 +1,122 @@
+"""
+Sessions of the watched games that are running at the same time.
+
+The monitor used to follow only the first watched game found running, so the game shown in the
+bio depended on the order of the game list, and an application that stays open all day (an
+editor added to the list, for instance) hid the game actually being played. The
+`SessionTracker` follows every running game with its own `SessionClock` and picks the game
+shown in the bio with a priority rule:
+
+- "recent": the game started last (the default),
+- "longest": the game running for the longest time,
+- "order": the first game of the game list.
+
+Background games, set with BIO_BACKGROUND_GAMES, are only shown when no other game runs.
+"""
+
+
+import os
+import time
+
+from polling import SessionClock
+
+
+PRIORITY_RULES = ("recent", "longest", "order")
+
+
+class SessionTracker:
+    """
+    Times the sessions of all the running games and chooses the one shown in the bio.
+
+    Args:
+        rule (str): The priority rule, one of `PRIORITY_RULES`.
+        background_games (Iterable[str]): The games that are only shown when no other game runs.
+        clock (callable): Returns the current time in seconds. Defaults to time.monotonic.
+
+    Raises:
+        ValueError: If the rule is not one of `PRIORITY_RULES`.
+    """
+
+    def __init__(self, rule="recent", background_games=(), clock=time.monotonic):
+        if rule not in PRIORITY_RULES:
+            raise ValueError(f"Unknown priority rule: {rule}")
+        self.rule = rule
+        self.background_games = set(background_games)
+        self.running = ()
+        self.ended_elapsed = {}
+        self._clock = clock
+        self._clocks = {}
+        self._started = {}
+
+    @classmethod
+    def from_env(cls, resolve=None):
+        """
+        Creates a tracker from the BIO_PRIORITY and BIO_BACKGROUND_GAMES environment variables.
+
+        Args:
+            resolve (callable, optional): Turns a game name from BIO_BACKGROUND_GAMES into its game key,
+                or returns None for an unknown name. Defaults to using the names as they are.
+
+        Returns:
+            SessionTracker: The tracker. An unknown rule falls back to "recent".
+        """
+        rule = (os.getenv("BIO_PRIORITY") or "recent").strip().lower()
+        names = [name.strip() for name in (os.getenv("BIO_BACKGROUND_GAMES") or "").split(",") if name.strip()]
+        if resolve is not None:
+            names = [resolve(name) or name for name in names]
+        return cls(rule if rule in PRIORITY_RULES else "recent", names)
+
+    def update(self, running):
+        """
+        Records the games found by the last scan, starting and stopping their sessions.
+
+        The length of the sessions that ended, measured with their monotonic clocks, is kept in
+        `ended_elapsed` (in seconds) until the next update.
+
+        Args:
+            running (list[str]): The keys of the running games, in the order of the game list.
+
+        Returns:
+            tuple[list[str], list[str]]: The games whose session started and the games whose session ended.
+        """
+        self.running = tuple(running)
+        ended = [game for game in self._clocks if game not in self.running]
+        self.ended_elapsed = {game: self._clocks[game].elapsed() for game in ended}
+        for game in ended:
+            del self._clocks[game]
+            del self._started[game]
+        started = [game for game in self.running if game not in self._clocks]
+        for game in started:
+            clock = self._clocks[game] = SessionClock(self._clock)
+            clock.start(game)
+            self._started[game] = clock.started
+        return started, ended
+
+    def subject(self):
+        """
+        Returns the game shown in the bio.
+
+        Returns:
+            str or None: The running game chosen by the priority rule, or None if no game is running.
+        """
+        candidates = [game for game in self.running if game not in self.background_games] or list(self.running)
+        if not candidates:
+            return None
+        if self.rule == "recent":
+            return max(candidates, key=self._started.__getitem__)
+        if self.rule == "longest":
+            return min(candidates, key=self._started.__getitem__)
+        return candidates[0]
+
+    def elapsed_minutes(self, game):
+        """
+        Returns the number of whole minutes played in the current session of a game.
+
+        Args:
+            game (str): The game key.
+
+        Returns:
+            int: The elapsed time in minutes, 0 if the game is not running.
+        """
+        clock = self._clocks.get(game)
+        return clock.elapsed_minutes() if clock is not None else 0
@@ -0,0 +1,69 @@
+"""
+Startup phase timings.
+
+The entry points mark the end of each startup phase (imports, settings, catalog, Telegram login,
+window, ...). The duration of every phase is measured from the previous mark, so the phases add
+up to the total startup time, which is logged in debug mode once the application is ready.
+"""
+
+
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Records the duration of the consecutive startup phases.
+
+    Args:
+        started (float, optional): The `time.perf_counter()` value the startup began at. Defaults to now.
+    """
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases = {}
+        self._last = self.started
+
+    def mark(self, name):
+        """
+        Ends a phase.
+
+        Args:
+            name (str): The name of the phase that ended.
+
+        Returns:
+            float: The duration of the phase in milliseconds.
+        """
+        now = time.perf_counter()
+        duration = (now - self._last) * 1000
+        self.phases[name] = self.phases.get(name, 0) + duration
+        self._last = now
+        return duration
+
+    def total(self):
+        """
+        Returns the time since the startup began.
+
+        Returns:
+            float: The duration in milliseconds, up to the last mark.
+        """
+        return (self._last - self.started) * 1000
+
+    def summary(self):
+        """
+        Returns the phase durations as a single line.
+
+        Returns:
+            str: e.g. "imports=120.4ms, catalog=1.2ms, total=121.6ms".
+        """
+        parts = [f"{name}={duration:.1f}ms" for name, duration in self.phases.items()]
+        parts.append(f"total={self.total():.1f}ms")
+        return ", ".join(parts)
+
+    def report(self):
+        """Logs the phase durations in debug mode."""
+        logger.info("Startup: " + self.summary()) if os.getenv("DEBUG") == "true" else None
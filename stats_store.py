@@ -0,0 +1,229 @@
+"""
+Storage of the game statistics and the user settings.
+
+The statistics are kept in memory and every change is appended as a compact record to a
+JSONL journal next to the stats file. Journal writes are batched and fsynced at most every
+`flush_interval` seconds. From time to time the whole statistics are written to the stats
+file as a snapshot, replaced atomically, and the journal is truncated. On load, the journal
+records that are newer than the snapshot are replayed on top of it.
+
+The per-game totals and the running sessions are kept under "games", and the closed sessions
+are rolled up by day, ISO week and month under "rollups" (see rollups.py).
+
+The settings (default bio, theme, notification usernames and message, watched games) live in their own
+small JSON file, which is only rewritten when a setting changes.
+"""
+
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from aggregates import SessionAggregator, StreamingStats
+from rollups import Rollups
+
+
+SETTINGS_KEYS = ("default_bio", "theme", "notification_usernames", "notification_message")
+SAMPLE_METRICS = ("cpu", "gpu", "rss", "read_rate", "write_rate")
+
+
+def _fsync_write(file_path, data):
+    temp_path = file_path + ".tmp"
+    with open(temp_path, 'w') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, file_path)
+
+
+def _read_json(file_path, default):
+    try:
+        with open(file_path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return default
+
+
+class StatsStore:
+    """
+    Journaled store for the game statistics, with a separate settings file.
+
+    Args:
+        stats_path (str): The path of the stats snapshot (STATS_FILE).
+        flush_interval (float): Seconds between two journal flushes (write + fsync).
+        snapshot_interval (float): Seconds between two snapshots of the statistics.
+        read_only (bool): Never write to the files, e.g. for reports on a copy of the stats.
+    """
+
+    def __init__(self, stats_path, flush_interval=30, snapshot_interval=3600, read_only=False):
+        base, _ = os.path.splitext(stats_path)
+        directory = os.path.dirname(os.path.abspath(stats_path))
+        self.stats_path = stats_path
+        self.journal_path = base + ".journal.jsonl"
+        self.settings_path = os.path.join(directory, "settings.json")
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.read_only = read_only
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._last_snapshot = time.monotonic()
+        self._seq = 0
+        self.load()
+
+    def load(self):
+        """Loads the snapshot, replays the journal and moves legacy settings out of the stats file."""
+        self.stats = _read_json(self.stats_path, {})
+        migrated = False
+        if "daily" in self.stats and "games" not in self.stats:
+            self.stats["games"] = self.stats.pop("daily")
+            migrated = True
+        self.stats.setdefault("games", {})
+        self.rollups = Rollups(self.stats.setdefault("rollups", {}))
+        self.settings = _read_json(self.settings_path, {})
+        self._seq = self.stats.pop("journal_seq", 0)
+
+        for key in SETTINGS_KEYS:
+            if key in self.stats:
+                self.settings.setdefault(key, self.stats.pop(key))
+                migrated = True
+        if migrated and not self.read_only:
+            self.save_settings()
+
+        replayed = self._replay()
+        if (migrated or replayed) and not self.read_only:
+            self.snapshot()
+
+    def _replay(self):
+        """
+        Replays the journal records newer than the snapshot. The journal is cut after its last valid
+        record, so that the records appended later do not follow a line torn by a crash.
+        """
+        replayed = 0
+        valid_size = 0
+        try:
+            with open(self.journal_path, 'rb') as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_size += len(line)
+                    if record.get("seq", 0) <= self._seq:
+                        continue
+                    self.apply(record)
+                    self._seq = record["seq"]
+                    replayed += 1
+            if valid_size < os.path.getsize(self.journal_path) and not self.read_only:
+                os.truncate(self.journal_path, valid_size)
+        except OSError:
+            pass
+        return replayed
+
+    def apply(self, record):
+        """
+        Applies a journal record to the in-memory statistics.
+
+        Args:
+            record (dict): The record, with a "type" of "start", "end" or "sample".
+        """
+        games = self.stats["games"]
+        game = record["game"]
+        if record["type"] == "start":
+            entry = games.setdefault(game, {"start_time": record["time"], "total_duration": 0})
+            entry["start_time"] = record["time"]
+            entry["session"] = {"start_time": record["time"]}
+        elif record["type"] == "end":
+            if game in games:
+                entry = games[game]
+                entry["total_duration"] += record["duration"]
+                session = entry.pop("session", None)
+                if session is not None:
+                    session["duration"] = record["duration"]
+                    entry["last_session"] = session
+                    end = datetime.fromisoformat(record["time"])
+                    self.rollups.add_session(game, end - timedelta(minutes=record["duration"]), end, session.get("metrics"))
+        elif record["type"] == "sample":
+            if game in games:
+                entry = games[game]
+                values = {name: record.get(name) for name in SAMPLE_METRICS}
+                SessionAggregator(entry.setdefault("session", {"start_time": record["time"]})).add(record["time"], **values)
+                for name, value in values.items():
+                    if value is not None:
+                        StreamingStats(entry.setdefault(name, {})).add(value)
+                entry["avgCPUusage"] = StreamingStats(entry.setdefault("cpu", {})).mean
+                entry["avgGPUusage"] = StreamingStats(entry.setdefault("gpu", {})).mean
+
+    def append(self, record_type, game, **fields):
+        """
+        Applies a record to the statistics and appends it to the journal buffer.
+
+        Args:
+            record_type (str): "start", "end" or "sample".
+            game (str): The game key.
+            **fields: The other fields of the record.
+
+        Returns:
+            dict: The appended record.
+        """
+        self._seq += 1
+        record = {"seq": self._seq, "type": record_type, "game": game, "time": datetime.now().isoformat()}
+        record.update(fields)
+        self.apply(record)
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        return record
+
+    def flush(self, force=False):
+        """
+        Writes and fsyncs the buffered records when the flush interval has elapsed, and takes a
+        snapshot when the snapshot interval has elapsed.
+
+        Args:
+            force (bool): Flush now, regardless of the interval.
+        """
+        now = time.monotonic()
+        if self._buffer and (force or now - self._last_flush >= self.flush_interval):
+            with open(self.journal_path, 'a') as file:
+                file.write("\n".join(self._buffer) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self._buffer.clear()
+            self._last_flush = now
+        if now - self._last_snapshot >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self):
+        """Replaces the stats file atomically with the current statistics and truncates the journal."""
+        self._buffer.clear()
+        data = dict(self.stats)
+        data["journal_seq"] = self._seq
+        _fsync_write(self.stats_path, json.dumps(data, indent=4))
+        try:
+            with open(self.journal_path, 'w'):
+                pass
+        except OSError:
+            pass
+        self._last_snapshot = time.monotonic()
+
+    def rollup(self, period, key=None):
+        """
+        Returns the totals of a period by game.
+
+        Args:
+            period (str): "daily", "weekly" or "monthly".
+            key (str, optional): The bucket key. Defaults to the current day, week or month.
+
+        Returns:
+            dict: For each game, its total duration, session count and mean resource usage.
+        """
+        return self.rollups.query(period, key)
+
+    def save_settings(self):
+        """Replaces the settings file atomically."""
+        _fsync_write(self.settings_path, json.dumps(self.settings, indent=4))
+
+    def close(self):
+        """Flushes the pending records and takes a final snapshot."""
+        self.snapshot()
@@ -0,0 +1,119 @@
+"""
+Rendering of the Telegram bio shown while a game is running.
+
+The `ACTION_STATUS` template is compiled once into a format string, the edition suffixes
+that the catalog carries in its display names (" (Steam)", " (dx12)", ...) are stripped in
+a single precompiled regex pass, and the last bio that was sent is remembered so that the
+monitor only calls `UpdateProfileRequest` when the visible text changes.
+"""
+
+
+import re
+
+
+STRIPPED_SUFFIXES = (
+    " (Steam)", " (Non-Steam)", " (x86)", " (steam)", " (non-steam)", " (Retail)", " (retail)",
+    " (Release)", " (release)", " (Dev)", " (dev)", " (x64)", " (dx11)", " (dx12)",
+)
+_SUFFIX_PATTERN = re.compile("|".join(re.escape(suffix) for suffix in sorted(STRIPPED_SUFFIXES, key=len, reverse=True)))
+_PLACEHOLDER_PATTERN = re.compile("#(action_emoji|game_name|elapsed_time)")
+
+
+def strip_suffixes(text):
+    """
+    Removes the edition suffixes such as " (Steam)" or " (dx12)" from a text.
+
+    Args:
+        text (str): The text to clean.
+
+    Returns:
+        str: The text without the suffixes.
+    """
+    return _SUFFIX_PATTERN.sub("", text)
+
+
+def compile_template(template):
+    """
+    Compiles a status template using #action_emoji, #game_name and #elapsed_time into a format string.
+
+    Args:
+        template (str): The status template, e.g. the ACTION_STATUS environment variable.
+
+    Returns:
+        str: A format string with {action_emoji}, {game_name} and {elapsed_time} fields.
+    """
+    escaped = template.replace("{", "{{").replace("}", "}}")
+    return _PLACEHOLDER_PATTERN.sub(lambda match: "{" + match.group(1) + "}", escaped)
+
+
+class StatusRenderer:
+    """
+    Renders the playing status and keeps track of the last bio sent to Telegram.
+
+    Args:
+        template (str): The status template, e.g. the ACTION_STATUS environment variable.
+        emojis (tuple[str, str, str, str]): The action emojis for less than 10 minutes, 10 to 60 minutes,
+            60 to 120 minutes and more than 120 minutes.
+    """
+
+    def __init__(self, template, emojis):
+        self._format = compile_template(template)
+        self.emojis = tuple(emoji or "" for emoji in emojis)
+        self.last_sent = None
+
+    def action_emoji(self, elapsed_time):
+        """
+        Returns the action emoji for the elapsed playing time.
+
+        Args:
+            elapsed_time (int): The elapsed playing time in minutes.
+
+        Returns:
+            str: The action emoji.
+        """
+        if elapsed_time < 10:
+            return self.emojis[0]
+        if elapsed_time < 60:
+            return self.emojis[1]
+        if elapsed_time < 120:
+            return self.emojis[2]
+        return self.emojis[3]
+
+    def render(self, game_name, elapsed_time):
+        """
+        Renders the status text for a running game.
+
+        Args:
+            game_name (str): The display name of the game.
+            elapsed_time (int): The elapsed playing time in minutes.
+
+        Returns:
+            str: The status text, without edition suffixes.
+        """
+        text = self._format.format(action_emoji=self.action_emoji(elapsed_time), game_name=game_name, elapsed_time=elapsed_time + 1)
+        return strip_suffixes(text)
+
+    def is_changed(self, text):
+        """
+        Checks if a bio differs from the last one that was sent.
+
+        Args:
+            text (str): The bio that is about to be sent.
+
+        Returns:
+            bool: True if the bio has to be sent.
+        """
+        return text != self.last_sent
+
+    def mark_sent(self, text):
+        """
+        Records the bio that was successfully sent to Telegram.
+
+        Args:
+            text (str): The bio that was sent.
+        """
+        self.last_sent = text
+
+    def reset(self):
+        """Forgets the last sent bio, so that the next update is always sent."""
+        self.last_sent = None
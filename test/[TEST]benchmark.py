@@ -0,0 +1,696 @@
+"""
+Benchmarks for the hot paths of the game monitor.
+
+Run from the repository root or the test folder:
+    python "test/[TEST]benchmark.py"
+
+Run a few benchmarks and keep the results as JSON, e.g. to compare two releases:
+    python "test/[TEST]benchmark.py" hot_paths detector --json bench.json
+
+The hot_paths benchmark runs the monitor on made-up process tables (1k to 20k processes) and
+catalogs (1k to 100k games). The startup benchmark compares its timings with the budget in
+startup_budget.json: the slowest of the timings measured when the budget was set, plus a margin
+(30%) for the noise between runs. The script exits with status 1 when a budget is exceeded. The
+gpu_sampler benchmark drives the GPU sampler with fake backends, so it runs without a GPU. The
+version_check benchmark fails with an AssertionError when the ETag revalidation, the cache TTL
+or the timeout of the background check does not behave as expected.
+"""
+
+
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import psutil
+from detector import ProcessDetector
+from gpu_sampler import FakeBackend, GPUSampler
+import catalog
+import version_check
+from search import GameSearchIndex
+import fuzzy
+
+
+def load_games():
+    with open(os.path.join(ROOT, "games", "process_mapping.json"), "r") as file:
+        mapping = json.load(file)
+    return [(key,) for key in mapping]
+
+
+def timeit(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def legacy_is_any_game_running(game_names, processes=psutil):
+    running_processes = [proc.info['name'].lower() for proc in processes.process_iter(['name'])]
+    for game_name in game_names:
+        if any(name.lower() in running_processes for name in game_name):
+            return game_name[0]
+    return None
+
+
+def bench_detector(repeat=20):
+    games = load_games()
+    detector = ProcessDetector(games)
+    detector.first_running_game()
+
+    legacy = timeit(lambda: legacy_is_any_game_running(games), repeat)
+    incremental = timeit(detector.first_running_game, repeat)
+    return {
+        "processes": len(psutil.pids()),
+        "games": len(games),
+        "legacy_ms": legacy * 1000,
+        "incremental_ms": incremental * 1000,
+        "speedup": legacy / incremental if incremental else None,
+    }
+
+
+def bench_catalog(repeat=20):
+    file_path = os.path.join(ROOT, "games", "process_mapping.json")
+    catalog.load_catalog(file_path)
+    json_load = timeit(lambda: catalog.load_catalog(file_path, use_cache=False), repeat)
+    warm = timeit(lambda: catalog.load_catalog(file_path), repeat)
+    return {
+        "json_ms": json_load * 1000,
+        "warm_cache_ms": warm * 1000,
+        "speedup": json_load / warm if warm else None,
+    }
+
+
+STARTUP_BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+STARTUP_MODULES = ("daemon", "monitor", "stats_store", "catalog", "report", "telethon", "psutil", "dotenv", "requests", "PIL", "sv_ttk", "numpy", "matplotlib.pyplot")
+HEADLESS_FORBIDDEN = ("tkinter", "PIL", "sv_ttk", "matplotlib")
+HEADLESS_START = (
+    "import json, sys, daemon; "
+    f"print(json.dumps({{'phases': daemon.startup_timer.phases, 'loaded': [m for m in {HEADLESS_FORBIDDEN!r} if sys.modules.get(m)]}}))"
+)
+
+
+def import_cost(module):
+    """Returns the cumulative import time of a module imported alone, in milliseconds, or None if it is not installed."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    return None
+
+
+def headless_start(pycache_prefix):
+    """Starts a fresh interpreter that imports the daemon, and returns its wall time in milliseconds and its report."""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", f"pycache_prefix={pycache_prefix}", "-c", HEADLESS_START], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, json.loads(result.stdout.splitlines()[-1])
+
+
+def bench_startup(repeat=5):
+    with open(STARTUP_BUDGET_FILE, "r") as file:
+        budget = json.load(file)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = []
+        for i in range(repeat):
+            elapsed, _ = headless_start(os.path.join(cache_dir, f"cold{i}"))
+            cold.append(elapsed)
+        warm_prefix = os.path.join(cache_dir, "warm")
+        headless_start(warm_prefix)
+        warm = []
+        for _ in range(repeat):
+            elapsed, info = headless_start(warm_prefix)
+            warm.append(elapsed)
+
+    result = {
+        "cold_start_ms": statistics.median(cold),
+        "warm_start_ms": statistics.median(warm),
+    }
+    for name, duration in info["phases"].items():
+        result[f"phase_{name}_ms"] = duration
+    for module in STARTUP_MODULES:
+        result[f"import_{module}_ms"] = import_cost(module)
+
+    limits = {key: measured * (1 + budget["margin"]) for key, measured in budget["measured_ms"].items()}
+    over_budget = [
+        f"{key}={result[key]:.1f}>{limit:.0f}"
+        for key, limit in limits.items()
+        if result.get(key) is not None and result[key] > limit
+    ]
+    result["headless_loaded"] = info["loaded"]
+    result["over_budget"] = over_budget + [f"daemon imports {name}" for name in info["loaded"]]
+    return result
+
+
+def synthetic_mapping(size, seed=1):
+    """Returns a catalog of `size` made-up games with one or two aliases each."""
+    import random
+    rng = random.Random(seed)
+    syllables = [onset + vowel + coda for onset in ("", "b", "d", "dr", "g", "k", "l", "m", "n", "p", "r", "s", "st", "t", "v", "z") for vowel in "aeiou" for coda in ("", "n", "r", "x")]
+    mapping = {}
+    while len(mapping) < size:
+        name = " ".join("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3)))
+        key = name.replace(" ", "") + rng.choice([".exe", "-win64-shipping.exe", ".x86_64"])
+        mapping[key] = [name] + ([name.split()[0]] if rng.random() < 0.5 else [])
+    return mapping
+
+
+def legacy_filter_list(mapping, sorted_keys, search_term):
+    rows = []
+    for key in sorted_keys:
+        if not search_term or search_term in key.lower() or search_term in mapping[key][0].lower():
+            rows.append(f"{catalog.capitalize_first_letters(mapping[key][0])} :: {key}")
+    return rows
+
+
+def bench_search(size=50000, repeat=5):
+    mapping = synthetic_mapping(size)
+    sorted_keys = sorted(mapping)
+    start = time.perf_counter()
+    index = GameSearchIndex(mapping)
+    build = time.perf_counter() - start
+    word = next(iter(mapping.values()))[0].split()[0]
+    keystrokes = [word[:n] for n in range(1, len(word) + 1)]
+
+    def legacy():
+        for query in keystrokes:
+            legacy_filter_list(mapping, sorted_keys, query)
+
+    def fresh():
+        for query in keystrokes:
+            index._recent.clear()
+            index.search(query)
+
+    def typing():
+        index._recent.clear()
+        for query in keystrokes + keystrokes[-2::-1]:
+            index.search(query)
+
+    legacy_time = timeit(legacy, repeat) / len(keystrokes)
+    fresh_time = timeit(fresh, repeat) / len(keystrokes)
+    typing_time = timeit(typing, repeat) / (2 * len(keystrokes) - 1)
+    return {
+        "games": size,
+        "query": word,
+        "build_ms": build * 1000,
+        "legacy_keystroke_ms": legacy_time * 1000,
+        "fresh_query_ms": fresh_time * 1000,
+        "typing_keystroke_ms": typing_time * 1000,
+        "speedup": legacy_time / typing_time if typing_time else None,
+    }
+
+
+def typo(text, rng):
+    """Returns the text with one random deletion, insertion, substitution or transposition."""
+    i = rng.randrange(len(text))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return text[:i] + text[i + 1:]
+    if kind == 1:
+        return text[:i] + rng.choice("aeiourst") + text[i:]
+    if kind == 2:
+        return text[:i] + rng.choice("aeiourst") + text[i + 1:]
+    return text[:i] + text[i + 1:i + 2] + text[i:i + 1] + text[i + 2:]
+
+
+def naive_suggest(catalog_index, name, k=5):
+    query = catalog.normalize(name)
+    limit = fuzzy.distance_limit(query)
+    scored = sorted(
+        (distance, len(alias), alias, key)
+        for alias, key in catalog_index.aliases()
+        for distance in (fuzzy.edit_distance(query, alias, limit),)
+        if distance <= limit
+    )
+    seen = []
+    for _, _, _, key in scored:
+        if key not in seen:
+            seen.append(key)
+    return seen[:k]
+
+
+def bench_fuzzy(size=100000, queries=50, naive_queries=3):
+    import random
+    rng = random.Random(2)
+    mapping = synthetic_mapping(size)
+    catalog_index = catalog.CatalogIndex(mapping)
+    start = time.perf_counter()
+    matcher = fuzzy.FuzzyMatcher(catalog_index)
+    # The full collection caused by the objects of the index belongs to the build, not to the first queries.
+    gc.collect()
+    build = time.perf_counter() - start
+
+    keys = rng.sample(sorted(mapping), queries)
+    typos = [typo(mapping[key][0], rng) for key in keys]
+    start = time.perf_counter()
+    results = [matcher.suggest(name) for name in typos]
+    indexed = (time.perf_counter() - start) / queries
+    found = sum(1 for key, result in zip(keys, results) if key in [suggestion[0] for suggestion in result])
+
+    start = time.perf_counter()
+    for name in typos[:naive_queries]:
+        naive_suggest(catalog_index, name)
+    naive = (time.perf_counter() - start) / naive_queries
+    return {
+        "games": size,
+        "aliases": len(matcher),
+        "build_ms": build * 1000,
+        "naive_query_ms": naive * 1000,
+        "indexed_query_ms": indexed * 1000,
+        "speedup": naive / indexed if indexed else None,
+        "recall": found / queries,
+    }
+
+
+CATALOG_PROBE = """
+import json, sys, time, psutil, catalog
+import compact_catalog
+process = psutil.Process()
+def private():
+    memory = process.memory_info()
+    return memory.rss - getattr(memory, "shared", 0)
+before = private()
+start = time.perf_counter()
+index = catalog.load_catalog(sys.argv[1])
+loaded = time.perf_counter() - start
+after_load = private()
+with open(sys.argv[2]) as file:
+    names = json.load(file)
+start = time.perf_counter()
+for name in names:
+    index.key_for(name)
+lookup = (time.perf_counter() - start) / len(names)
+print(json.dumps({"load_ms": loaded * 1000, "lookup_us": lookup * 1e6, "loaded_mb": (after_load - before) / 2 ** 20, "after_lookups_mb": (private() - before) / 2 ** 20}))
+"""
+
+
+def probe_catalog(file_path, names_path):
+    """Loads a catalog in a fresh interpreter, and returns its load time, lookup latency and private RSS growth (file-backed pages excluded)."""
+    result = subprocess.run([sys.executable, "-c", CATALOG_PROBE, file_path, names_path], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def bench_compact_catalog(sizes=(10000, 100000), lookups=20000):
+    import random
+    import compact_catalog
+    rng = random.Random(3)
+    result = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            mapping = synthetic_mapping(size)
+            json_path = os.path.join(directory, f"catalog{size}.json")
+            with open(json_path, "w") as file:
+                json.dump(mapping, file)
+            compact_path = os.path.join(directory, f"catalog{size}.gcat")
+            compact_catalog.write_compact_catalog(mapping, compact_path)
+            names = [rng.choice([key, *mapping[key]]).upper() for key in rng.choices(sorted(mapping), k=lookups)]
+            names_path = os.path.join(directory, "names.json")
+            with open(names_path, "w") as file:
+                json.dump(names, file)
+
+            catalog.load_catalog(json_path)
+            for label, path in (("dict", json_path), ("compact", compact_path)):
+                for metric, value in probe_catalog(path, names_path).items():
+                    result[f"{label}_{size}_{metric}"] = value
+            result[f"compact_{size}_file_mb"] = os.path.getsize(compact_path) / 2 ** 20
+    return result
+
+
+def bench_catalog_build(size=100000):
+    import catalog_build
+    mapping = {key: names + [key] for key, names in synthetic_mapping(size).items()}
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "catalog.json")
+        outputs = {"csv_output": os.path.join(directory, "games.csv"), "index_output": os.path.join(directory, "catalog.gcat")}
+        with open(source, "w") as file:
+            json.dump(mapping, file)
+        start = time.perf_counter()
+        full = catalog_build.build_catalog(source, **outputs)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        catalog_build.build_catalog(source, **outputs)
+        unchanged_ms = (time.perf_counter() - start) * 1000
+
+        def edit(key, names):
+            # Edits the line of one game in the sorted file written by the previous build, as a contributor would.
+            with open(source, encoding="utf-8") as file:
+                text = file.read()
+            with open(source, "w", encoding="utf-8") as file:
+                file.write(text.replace(catalog_build.json_line(key, mapping[key]), catalog_build.json_line(key, names)))
+            mapping[key] = names
+
+        key = next(iter(mapping))
+        edit(key, [mapping[key][0], "edited alias", key])
+        start = time.perf_counter()
+        edited = catalog_build.build_catalog(source, **outputs)
+        edited_ms = (time.perf_counter() - start) * 1000
+
+        edit(key, [mapping[key][0].upper(), *mapping[key][1:]])
+        start = time.perf_counter()
+        recased = catalog_build.build_catalog(source, **outputs)
+        recased_ms = (time.perf_counter() - start) * 1000
+        state_mb = os.path.getsize(catalog_build.state_path_for(source)) / 1e6
+    return {
+        "games": size,
+        "full_build_ms": full_ms,
+        "full_processed": full["processed"],
+        "unchanged_ms": unchanged_ms,
+        "one_edit_ms": edited_ms,
+        "one_edit_processed": edited["processed"],
+        "one_edit_written": len(edited["written"]),
+        "display_case_edit_ms": recased_ms,
+        "display_case_edit_written": len(recased["written"]),
+        "state_mb": state_mb,
+        "errors": len(full["errors"]),
+    }
+
+
+SYSTEM_PROCESS_NAMES = ("svchost.exe", "chrome.exe", "explorer.exe", "RuntimeBroker.exe", "conhost.exe", "systemd", "bash", "python3", "kworker/0:1", "Discord.exe")
+
+
+class FakeProcess:
+    """A process of a `FakeProcessTable`."""
+
+    def __init__(self, pid, name):
+        self.pid = pid
+        self._name = name
+        self.info = {"name": name}
+
+    def name(self):
+        return self._name
+
+
+class FakeProcessTable:
+    """
+    Stand-in for the parts of the psutil module the detector uses, over a made-up process table.
+
+    Args:
+        size (int): The number of processes.
+        running (list[str]): Process names added to the table, e.g. the running games.
+        churn (float): The share of processes replaced by new ones on each `tick`.
+    """
+
+    NoSuchProcess = psutil.NoSuchProcess
+    AccessDenied = psutil.AccessDenied
+    ZombieProcess = psutil.ZombieProcess
+
+    def __init__(self, size, running=(), churn=0.005, seed=4):
+        import random
+        self._rng = random.Random(seed)
+        self.churn = churn
+        self.names = {}
+        self._next_pid = 1000
+        for name in running:
+            self._spawn(name)
+        while len(self.names) < size:
+            self._spawn(self._rng.choice(SYSTEM_PROCESS_NAMES))
+        self._running = set(running)
+
+    def _spawn(self, name):
+        self.names[self._next_pid] = name
+        self._next_pid += 1 + self._rng.randrange(4)
+
+    def tick(self):
+        """Replaces `churn` of the processes, never the running games, by new processes."""
+        pids = [pid for pid, name in self.names.items() if name not in self._running]
+        for pid in self._rng.sample(pids, int(len(self.names) * self.churn)):
+            del self.names[pid]
+            self._spawn(self._rng.choice(SYSTEM_PROCESS_NAMES))
+
+    def pids(self):
+        return list(self.names)
+
+    def Process(self, pid):
+        if pid not in self.names:
+            raise psutil.NoSuchProcess(pid)
+        return FakeProcess(pid, self.names[pid])
+
+    def process_iter(self, attrs=None):
+        return (self.Process(pid) for pid in list(self.names))
+
+
+def median_time(func, repeat, setup=None):
+    """Returns the median duration of `func` in microseconds, calling `setup` untimed before each run."""
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1e6
+
+
+def bench_hot_paths(process_counts=(1000, 5000, 20000), catalog_sizes=(1000, 10000, 100000), watched=50, repeat=30):
+    """
+    Times the monitor hot paths on synthetic process tables and catalogs:
+    is_any_game_running (incremental detector and the former process_iter scan), find_process_name
+    (CatalogIndex and CompactCatalog lookups), status rendering and the stats save (journal flush and snapshot).
+    """
+    import random
+    import types
+    import compact_catalog
+    import detector
+    import monitor
+    from stats_store import StatsStore
+    from status import StatusRenderer
+
+    rng = random.Random(5)
+    result = {}
+    real_psutil = detector.psutil
+    largest = synthetic_mapping(max(catalog_sizes))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in catalog_sizes:
+            mapping = dict(list(largest.items())[:size])
+            keys = list(mapping)
+            index = catalog.CatalogIndex(mapping)
+            compact_path = os.path.join(directory, f"catalog{size}.gcat")
+            compact_catalog.write_compact_catalog(mapping, compact_path)
+            compact = compact_catalog.CompactCatalog(compact_path)
+            names = [rng.choice([key, *mapping[key]]).upper() for key in rng.choices(keys, k=1000)]
+            misses = [name + " x" for name in names]
+            result[f"find_process_name_{size}_hit_us"] = median_time(lambda: [index.key_for(name) for name in names], repeat) / len(names)
+            result[f"find_process_name_{size}_miss_us"] = median_time(lambda: [index.key_for(name) for name in misses], repeat) / len(misses)
+            result[f"find_process_name_{size}_compact_hit_us"] = median_time(lambda: [compact.key_for(name) for name in names], repeat) / len(names)
+            compact.close()
+
+            watched_games = [(key,) for key in rng.sample(keys, min(watched, size))]
+            all_games = [(key,) for key in keys]
+            for processes in process_counts:
+                for label, games in (("watched", watched_games), ("all", all_games)):
+                    table = FakeProcessTable(processes, running=[games[-1][0].lower()])
+                    detector.psutil = table
+                    try:
+                        stub = types.SimpleNamespace(process_detector=ProcessDetector())
+                        monitor.GameMonitor.is_any_game_running(stub, games)
+                        found = monitor.GameMonitor.is_any_game_running(stub, games)
+                        prefix = f"is_any_game_running_{label}_{size}_games_{processes}_procs"
+                        result[prefix + "_us"] = median_time(lambda: monitor.GameMonitor.is_any_game_running(stub, games), repeat, setup=table.tick)
+                        result[prefix + "_found"] = found == games[-1][0]
+                        if label == "watched":
+                            legacy_games = [(key, *mapping[key]) for key, in games]
+                            result[prefix + "_legacy_us"] = median_time(lambda: legacy_is_any_game_running(legacy_games, table), max(3, repeat // 10))
+                    finally:
+                        detector.psutil = real_psutil
+
+        renderer = StatusRenderer("#action_emoji Playing #game_name for #elapsed_time Minutes", ("🎮", "🕹", "🔥", "👑"))
+        stub = types.SimpleNamespace(catalog_index=index)
+        display_names = [monitor.GameMonitor.display_name(stub, key) + " (Steam)" for key in rng.sample(keys, 1000)]
+        result["status_render_us"] = median_time(lambda: [renderer.is_changed(renderer.render(name, minutes)) for minutes, name in enumerate(display_names)], repeat) / len(display_names)
+        result["display_name_us"] = median_time(lambda: [monitor.GameMonitor.display_name(stub, key) for key in keys[:1000]], repeat) / 1000
+
+        for played in (10, 100, 1000):
+            store = StatsStore(os.path.join(directory, f"stats{played}.json"))
+            for key in keys[:played]:
+                store.append("start", key)
+                store.append("sample", key, cpu=12.5, rss=2 ** 30, read_rate=1e6, write_rate=1e5, gpu=40.0)
+            store.snapshot()
+            sample = lambda: store.append("sample", keys[0], cpu=12.5, rss=2 ** 30, read_rate=1e6, write_rate=1e5, gpu=40.0)
+            result[f"stats_sample_flush_{played}_games_us"] = median_time(lambda: store.flush(force=True), repeat, setup=sample)
+            result[f"stats_snapshot_{played}_games_us"] = median_time(store.snapshot, max(3, repeat // 3))
+    return result
+
+
+class VersionStandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the published sample.env, answering conditional requests with 304."""
+
+    body = b'VERSION="9.9.9"\nUPDATE_MESSAGE="Benchmark release"\n'
+    etag = '"bench-1"'
+    delay = 0
+    requests = []
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        if self.headers.get("If-None-Match") == self.etag:
+            self.requests.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.requests.append(200)
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_version_check(repeat=20, slow_delay=2, timeout=0.5):
+    """
+    Times the version check against a local stand-in server, and checks that a cached answer is revalidated
+    with its ETag (304), that a fresh cache sends no request, and that a slow server is given up on after the timeout.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VersionStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/sample.env"
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_path = os.path.join(cache_dir, "version_cache.json")
+            VersionStandIn.requests.clear()
+            first = timeit(lambda: version_check.get_latest_version(version_check.VersionCache(cache_path, ttl=0), url), 1)
+            conditional = timeit(lambda: version_check.get_latest_version(version_check.VersionCache(cache_path, ttl=0), url), repeat)
+            statuses = list(VersionStandIn.requests)
+            assert statuses == [200] + [304] * repeat, f"expected one 200 and {repeat} 304 responses, got {statuses}"
+            cache = version_check.VersionCache(cache_path)
+            assert cache.etag == VersionStandIn.etag and cache.is_fresh(), "the answer and its ETag must be cached"
+            assert version_check.get_latest_version(cache, url)["version"] == "9.9.9"
+
+            cached = timeit(lambda: version_check.get_latest_version(version_check.VersionCache(cache_path), url), repeat)
+            assert len(VersionStandIn.requests) == len(statuses), "a cache within its TTL must not send any request"
+
+            VersionStandIn.delay = slow_delay
+            start = time.perf_counter()
+            future = version_check.check_in_background(version_check.VersionCache(os.path.join(cache_dir, "slow.json")), url, timeout=timeout)
+            returned = time.perf_counter() - start
+            payload = future.result()
+            resolved = time.perf_counter() - start
+            assert returned < timeout, f"check_in_background waited {returned:.3f} s for the server"
+            assert resolved < slow_delay, f"the slow server was waited for {resolved:.3f} s, with a {timeout} s timeout"
+            assert payload == version_check.empty_payload(), f"a timed out check must give an empty answer, not {payload}"
+    finally:
+        VersionStandIn.delay = 0
+        server.shutdown()
+        server.server_close()
+    return {
+        "first_ms": first * 1000,
+        "conditional_ms": conditional * 1000,
+        "fresh_cache_ms": cached * 1000,
+        "responses_200": statuses.count(200),
+        "responses_304": statuses.count(304),
+        "slow_server_returned_ms": returned * 1000,
+        "slow_server_resolved_ms": resolved * 1000,
+    }
+
+
+class SlowFakeBackend(FakeBackend):
+    """A `FakeBackend` that takes `delay` seconds per reading, like nvidia-smi on a busy machine."""
+
+    def __init__(self, values, delay):
+        super().__init__(values)
+        self.delay = delay
+
+    def read(self):
+        time.sleep(self.delay)
+        return super().read()
+
+
+def bench_gpu_sampler(interval=0.05, delay=0.2, repeat=100000):
+    """Drives the GPU sampler with fake backends: publishing, stale readings, slow readings and stopping."""
+    sampler = GPUSampler(FakeBackend([10.0, 20.0, 30.0]), interval=interval)
+    sampler.start()
+    deadline = time.monotonic() + 5
+    while sampler.backend.reads < 3 and time.monotonic() < deadline:
+        time.sleep(interval / 5)
+    published = sampler.latest(max_age=interval * 3)
+    start = time.perf_counter()
+    sampler.stop()
+    stop = time.perf_counter() - start
+    reads = sampler.backend.reads
+    time.sleep(interval * 2)
+    stale = sampler.latest(max_age=interval)
+
+    slow = GPUSampler(SlowFakeBackend([50.0], delay), interval=interval)
+    slow.sample_once()
+    slow.start()
+    time.sleep(delay / 2)
+    latest = timeit(slow.latest, repeat)
+    slow.stop()
+    return {
+        "published": published,
+        "reads_after_stop": sampler.backend.reads - reads,
+        "stop_ms": stop * 1000,
+        "stale_reading": stale,
+        "latest_during_slow_read_us": latest * 1e6,
+        "slow_value": slow.latest(),
+    }
+
+
+BENCHMARKS = {
+    "detector": bench_detector,
+    "catalog": bench_catalog,
+    "startup": bench_startup,
+    "version_check": bench_version_check,
+    "search": bench_search,
+    "fuzzy": bench_fuzzy,
+    "compact_catalog": bench_compact_catalog,
+    "catalog_build": bench_catalog_build,
+    "hot_paths": bench_hot_paths,
+    "gpu_sampler": bench_gpu_sampler,
+}
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of the game monitor.")
+    parser.add_argument("benchmarks", nargs="*", help=f"The benchmarks to run, among {', '.join(BENCHMARKS)}. Defaults to all of them.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON, to compare releases.")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    return args
+
+
+def write_results(path, results):
+    """Writes the results with the application version and the machine they were measured on."""
+    import platform
+    from dotenv import dotenv_values
+    report = {
+        "version": dotenv_values(os.path.join(ROOT, "sample.env")).get("VERSION"),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(report, file, indent=4)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = {}
+    failed = False
+    for name in args.benchmarks or list(BENCHMARKS):
+        result = results[name] = BENCHMARKS[name]()
+        print(name + ": " + ", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()))
+        failed = failed or bool(result.get("over_budget"))
+    if args.json:
+        write_results(args.json, results)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,108 @@
+"""
+Tests of the GPU sampler, driven by fake backends so they run without a GPU:
+
+    python -m pytest test
+"""
+
+
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from gpu_sampler import FakeBackend, GPUBackend, GPUSampler, NullBackend
+
+
+INTERVAL = 0.01
+
+
+class FailingBackend(GPUBackend):
+    """A backend whose readings always fail, like nvidia-smi timing out."""
+
+    name = "failing"
+
+    def __init__(self):
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        raise RuntimeError("no GPU")
+
+
+def wait_for_reads(backend, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while backend.reads < count and time.monotonic() < deadline:
+        time.sleep(INTERVAL / 5)
+    assert backend.reads >= count, f"only {backend.reads} readings in {timeout} s"
+
+
+def test_publishes_the_backend_value():
+    sampler = GPUSampler(FakeBackend([42.0]), interval=INTERVAL)
+    assert sampler.latest() is None
+    sampler.start()
+    try:
+        wait_for_reads(sampler.backend, 1)
+        assert sampler.latest() == 42.0
+        assert sampler.latest(max_age=60) == 42.0
+    finally:
+        sampler.stop()
+
+
+def test_publishes_the_values_in_turn():
+    backend = FakeBackend([10.0, 20.0])
+    sampler = GPUSampler(backend, interval=INTERVAL)
+    assert sampler.sample_once() == 10.0
+    assert sampler.latest() == 10.0
+    assert sampler.sample_once() == 20.0
+    assert sampler.latest() == 20.0
+    assert backend.reads == 2
+
+
+def test_no_reads_after_stop():
+    sampler = GPUSampler(FakeBackend([10.0, 20.0, 30.0]), interval=INTERVAL)
+    sampler.start()
+    wait_for_reads(sampler.backend, 3)
+    sampler.stop()
+    reads = sampler.backend.reads
+    time.sleep(INTERVAL * 10)
+    assert sampler.backend.reads == reads
+    assert sampler._thread is None
+
+
+def test_latest_ignores_stale_readings():
+    sampler = GPUSampler(FakeBackend([55.0]), interval=INTERVAL)
+    sampler.sample_once()
+    assert sampler.latest(max_age=60) == 55.0
+    time.sleep(0.1)
+    assert sampler.latest(max_age=0.05) is None
+    assert sampler.latest() == 55.0
+
+
+def test_counts_the_backend_errors(caplog):
+    sampler = GPUSampler(FailingBackend(), interval=INTERVAL)
+    with caplog.at_level("WARNING", logger="gpu_sampler"):
+        assert sampler.sample_once() is None
+        assert sampler.sample_once() is None
+    assert sampler.errors == 2
+    assert sampler.latest() is None
+    assert len([record for record in caplog.records if "failing" in record.getMessage()]) == 1
+
+
+def test_errors_do_not_stop_the_thread():
+    sampler = GPUSampler(FailingBackend(), interval=INTERVAL)
+    sampler.start()
+    try:
+        wait_for_reads(sampler.backend, 3)
+    finally:
+        sampler.stop()
+    assert sampler.errors == sampler.backend.reads
+
+
+def test_null_backend_starts_no_thread():
+    sampler = GPUSampler(NullBackend(), interval=INTERVAL)
+    sampler.start()
+    assert sampler._thread is None
+    assert sampler.sample_once() is None
+    sampler.stop()
@@ -0,0 +1,186 @@
+"""
+Update check against the published sample.env.
+
+The latest version is read in a background thread with a short timeout, so a slow network
+never delays the window. The answer is cached on disk together with its ETag: within the TTL
+no request is sent at all, and after it a conditional request is sent, which the server
+answers with an empty 304 response when nothing changed.
+"""
+
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_URL = "https://raw.githubusercontent.com/phaticusthiccy/Telegram-Activity/master/sample.env"
+DEFAULT_TTL = 6 * 3600
+DEFAULT_TIMEOUT = 5
+
+
+def empty_payload():
+    """
+    Returns the payload used when the latest version is unknown.
+
+    Returns:
+        dict: An empty "version" and "message".
+    """
+    return {"version": "", "message": ""}
+
+
+def parse_version_payload(text):
+    """
+    Reads the version and the update message from the contents of a sample.env file.
+
+    Args:
+        text (str): The file contents.
+
+    Returns:
+        dict: The "version" and the update "message", empty when missing.
+    """
+    payload = empty_payload()
+    for line in text.split("\n"):
+        if line.startswith("VERSION="):
+            payload["version"] = line.split("=", 1)[1].strip().strip('"')
+        if line.startswith("UPDATE_MESSAGE="):
+            payload["message"] = line.split("=", 1)[1].strip().strip('"')
+    return payload
+
+
+def is_newer(latest, local_version):
+    """
+    Checks if the latest published version differs from the running one.
+
+    Args:
+        latest (dict): The payload returned by the version check.
+        local_version (str): The running version.
+
+    Returns:
+        bool: True if an update should be offered.
+    """
+    return bool(latest["version"]) and bool(local_version) and str(latest["version"]) != str(local_version)
+
+
+class VersionCache:
+    """
+    The last version check, stored in a small JSON file.
+
+    Args:
+        file_path (str): The path of the cache file.
+        ttl (float): Seconds during which the cached answer is used without any request.
+    """
+
+    def __init__(self, file_path, ttl=DEFAULT_TTL):
+        self.file_path = file_path
+        self.ttl = ttl
+        self.etag = None
+        self.checked_at = 0
+        self.payload = None
+        try:
+            with open(file_path, 'r') as file:
+                data = json.load(file)
+            self.etag = data.get("etag")
+            self.checked_at = data.get("checked_at", 0)
+            self.payload = data.get("payload")
+        except (OSError, ValueError):
+            pass
+
+    def is_fresh(self, now=None):
+        """
+        Checks if the cached answer is recent enough to skip the request.
+
+        Args:
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            bool: True if a payload is cached and younger than the TTL.
+        """
+        now = time.time() if now is None else now
+        return self.payload is not None and 0 <= now - self.checked_at < self.ttl
+
+    def store(self, payload, etag=None):
+        """
+        Records a check and writes the cache file atomically.
+
+        Args:
+            payload (dict): The version payload.
+            etag (str, optional): The ETag of the response.
+        """
+        self.payload = payload
+        self.etag = etag
+        self.checked_at = time.time()
+        temp_path = self.file_path + ".tmp"
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump({"etag": self.etag, "checked_at": self.checked_at, "payload": self.payload}, file)
+            os.replace(temp_path, self.file_path)
+        except OSError as e:
+            logger.warning(f"Could not write the version cache: {e}")
+
+
+def get_latest_version(cache=None, url=VERSION_URL, timeout=DEFAULT_TIMEOUT):
+    """
+    Retrieves the latest version information, using the cache when possible.
+
+    requests is only imported here, the first time the version is checked over the network.
+
+    Args:
+        cache (VersionCache, optional): The cache to read and update.
+        url (str): The URL of the published sample.env.
+        timeout (float): Seconds to wait for the server.
+
+    Returns:
+        dict: The latest "version" and update "message". The cached answer, or an empty one, if the request failed.
+    """
+    if cache is not None and cache.is_fresh():
+        return cache.payload
+
+    import requests
+    headers = {}
+    if cache is not None and cache.etag and cache.payload is not None:
+        headers["If-None-Match"] = cache.etag
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cache is not None:
+            cache.store(cache.payload, cache.etag)
+            return cache.payload
+        response.raise_for_status()
+        payload = parse_version_payload(response.text)
+        if cache is not None:
+            cache.store(payload, response.headers.get("ETag"))
+        return payload
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error retrieving latest version: {e}")
+    if cache is not None and cache.payload is not None:
+        return cache.payload
+    return empty_payload()
+
+
+def check_in_background(cache=None, url=VERSION_URL, timeout=DEFAULT_TIMEOUT):
+    """
+    Runs `get_latest_version` in a daemon thread.
+
+    Args:
+        cache (VersionCache, optional): The cache to read and update.
+        url (str): The URL of the published sample.env.
+        timeout (float): Seconds to wait for the server.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the version payload. It never fails.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(get_latest_version(cache, url, timeout))
+        except Exception as e:
+            logger.error(f"Error retrieving latest version: {e}")
+            future.set_result(empty_payload())
+
+    threading.Thread(target=run, name="version-check", daemon=True).start()
+    return future
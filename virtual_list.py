@@ -0,0 +1,121 @@
+"""
+A Tk list that only renders its visible rows.
+
+A `tk.Listbox` keeps a Tcl string for every row it holds, so filling it with tens of thousands
+of games on every keystroke is slow. `VirtualList` keeps the items in Python and only inserts
+the rows that fit in the window. The scrollbar, the mouse wheel and the arrow keys move the
+window over the items, and the selection is tracked as an item position.
+"""
+
+
+import tkinter as tk
+
+
+class VirtualList:
+    """
+    A listbox and a scrollbar showing a window of `rows` items.
+
+    Args:
+        master (tk.Widget): The parent widget.
+        rows (int): The number of visible rows.
+        **listbox_options: Passed to the `tk.Listbox`.
+    """
+
+    def __init__(self, master, rows=20, **listbox_options):
+        self.frame = tk.Frame(master)
+        self.rows = rows
+        self.listbox = tk.Listbox(self.frame, height=rows, selectmode=tk.SINGLE, exportselection=False, **listbox_options)
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.items = []
+        self.offset = 0
+        self.selected = None
+        self._format = str
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<MouseWheel>", lambda event: self._scroll_units(-1 if event.delta > 0 else 1))
+        self.listbox.bind("<Button-4>", lambda event: self._scroll_units(-1))
+        self.listbox.bind("<Button-5>", lambda event: self._scroll_units(1))
+        self.listbox.bind("<Up>", lambda event: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda event: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda event: self._move_selection(-self.rows))
+        self.listbox.bind("<Next>", lambda event: self._move_selection(self.rows))
+
+    def grid(self, **options):
+        self.frame.grid(**options)
+
+    def bind(self, sequence, func):
+        self.listbox.bind(sequence, func)
+
+    def set_items(self, items, formatter=str):
+        """
+        Replaces the items and scrolls back to the top.
+
+        Args:
+            items (list): The items.
+            formatter (callable): Returns the text of the row of an item.
+        """
+        self.items = items
+        self._format = formatter
+        self.offset = 0
+        self.selected = None
+        self._render()
+
+    def selected_item(self):
+        """
+        Returns the selected item.
+
+        Returns:
+            The selected item, or None if no row is selected.
+        """
+        if self.selected is None or self.selected >= len(self.items):
+            return None
+        return self.items[self.selected]
+
+    def _render(self):
+        end = min(len(self.items), self.offset + self.rows)
+        self.listbox.delete(0, tk.END)
+        if end > self.offset:
+            self.listbox.insert(tk.END, *[self._format(item) for item in self.items[self.offset:end]])
+        if self.selected is not None and self.offset <= self.selected < end:
+            self.listbox.selection_set(self.selected - self.offset)
+            self.listbox.activate(self.selected - self.offset)
+        if self.items:
+            self.scrollbar.set(self.offset / len(self.items), end / len(self.items))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.items) - self.rows))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _scroll_units(self, units):
+        self._scroll_to(self.offset + units)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self._scroll_to(int(float(amount) * len(self.items)))
+        elif action == tk.SCROLL:
+            step = self.rows if unit == tk.PAGES else 1
+            self._scroll_to(self.offset + int(amount) * step)
+
+    def _on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.offset + selection[0]
+
+    def _move_selection(self, delta):
+        if not self.items:
+            return "break"
+        current = self.selected if self.selected is not None else self.offset - 1
+        self.selected = max(0, min(len(self.items) - 1, current + delta))
+        if self.selected < self.offset:
+            self.offset = self.selected
+        elif self.selected >= self.offset + self.rows:
+            self.offset = self.selected - self.rows + 1
+        self._render()
+        return "break"